@@ -0,0 +1,76 @@
+"""Ingest rate and query latency of the analytics store at many sessions.
+
+    python benchmarks/bench_analytics.py --sessions 100 1000 5000
+
+Every session sends ``--seconds`` of 30 fps tracking in the live channel's
+0.5 s batches (15 frames: gaze drifting between directions, a blink every
+~4 s), interleaved across sessions as a server would receive them. Then
+the aggregate queries run over every open session: a 60 s window (per-
+second buckets) and a 1 h window (per-minute rollups).
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from iris_ball.analytics import AnalyticsStore  # noqa: E402
+
+FPS = 30
+BATCH = 15
+
+
+def batches(sessions, seconds, seed=0):
+    """(t, face, direction, ear, blinks) per batch, sessions interleaved."""
+    rng = np.random.default_rng(seed)
+    t0 = 1_700_000_000.0
+    k = np.arange(BATCH)
+    for b in range(int(seconds * FPS / BATCH)):
+        t = t0 + (b * BATCH + k) / FPS
+        for s in range(sessions):
+            face = rng.random(BATCH) > 0.05
+            direction = np.full(BATCH, (b + s) // 8 % 5)
+            ear = 0.28 + 0.02 * rng.standard_normal(BATCH)
+            blinks = (rng.random(BATCH) < 1 / 120).astype(np.int64)
+            yield s, (t, face, direction, ear, blinks)
+
+
+def timed(fn, repeat):
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000)
+    return np.median(out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'sessions':>8} {'frames/s':>12} {'µs/batch':>9} {'q 60s ms':>9} "
+          f"{'q 1h ms':>8} {'MB':>7}")
+    for n in args.sessions:
+        store = AnalyticsStore()
+        data = list(batches(n, args.seconds))
+        t0 = time.perf_counter()
+        for s, rec in data:
+            store.ingest(f"s{s}", *rec)
+        dt = time.perf_counter() - t0
+        frames = len(data) * BATCH
+        q60 = timed(lambda: store.query(60).blink_rate, args.repeat)
+        q1h = timed(lambda: store.query(3600).dwell, args.repeat)
+        print(f"{n:>8} {frames / dt:>12,.0f} {dt / len(data) * 1e6:>9.1f} {q60:>9.2f} "
+              f"{q1h:>8.2f} {store.nbytes / 2**20:>7.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
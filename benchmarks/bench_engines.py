@@ -0,0 +1,115 @@
+"""Inference latency and landmark agreement of the page's two engines.
+
+    pip install playwright && playwright install chromium
+    ffmpeg -i rosto.mp4 -vf scale=640:480 -pix_fmt yuv420p rosto.y4m
+    python benchmarks/bench_engines.py rosto.y4m --delegate CPU GPU --wasm simd nosimd
+
+Chromium plays the clip (``.y4m`` or ``.mjpeg``) as its fake camera, in a
+loop. For every landmarker variant (delegate × WASM build × model) the page
+boots with FaceMesh live and runs its engine comparison (``EngineBench`` in
+``frontend/engines.js``): it records ``ENGINE_BENCH_FRAMES`` camera frames
+and feeds those same frames to FaceMesh and to the FaceLandmarker, timing
+every send. Reported per engine: cold start, p50/p95/mean latency and
+frames with a face; per variant: how far the FaceLandmarker's landmarks and
+iris midpoint are from FaceMesh's, and how often both agree the eyes are
+closed. Headless Chromium usually has no real GPU, so GPU numbers there
+measure its software WebGL.
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_render import CAPTURE, FRONTEND_DIR, serve  # noqa: E402
+from iris_ball.assets import LANDMARKER_MODELS, asset_config  # noqa: E402
+
+RENDER = """
+([assets, engine, engineBench]) => {
+  const args = { cfg:{ showMesh:false }, assets, pipeline:"auto", capture:[640, 480], engine,
+                 engineBench, height:640 };
+  window.postMessage({ type:"streamlit:render", args }, "*");
+}
+"""
+
+
+def run_variant(browser, url, assets, engine, timeout_s):
+    page = browser.new_page(viewport={"width": 700, "height": 700})
+    try:
+        page.add_init_script(CAPTURE)
+        page.goto(url)
+        page.evaluate(RENDER, [assets, engine, 0])
+        page.wait_for_function("document.getElementById('hud').style.display === 'flex'",
+                               timeout=timeout_s * 1000)
+        page.evaluate(RENDER, [assets, engine, 1])
+        page.wait_for_function("window.__iris.last && window.__iris.last.engineBench",
+                               timeout=timeout_s * 1000)
+        return page.evaluate("window.__iris.last.engineBench")
+    finally:
+        page.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("clip", type=Path, help="fake camera input (.y4m or .mjpeg)")
+    parser.add_argument("--delegate", nargs="+", default=["CPU"], choices=["CPU", "GPU"])
+    parser.add_argument("--wasm", nargs="+", default=["auto"], choices=["auto", "simd", "nosimd"])
+    parser.add_argument("--model", nargs="+", default=list(LANDMARKER_MODELS),
+                        choices=list(LANDMARKER_MODELS))
+    parser.add_argument("--no-blendshapes", action="store_true")
+    parser.add_argument("--assets", default="cdn", choices=["cdn", "local"])
+    parser.add_argument("--save", type=Path, help="write the results as JSON")
+    parser.add_argument("--timeout", type=float, default=180)
+    args = parser.parse_args(argv)
+
+    from playwright.sync_api import sync_playwright
+
+    assets = asset_config(args.assets)
+    server = serve(FRONTEND_DIR)
+    url = f"http://127.0.0.1:{server.server_address[1]}/index.html"
+    results = []
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch(args=[
+            "--use-fake-ui-for-media-stream",
+            "--use-fake-device-for-media-stream",
+            f"--use-file-for-fake-video-capture={args.clip.resolve()}",
+        ])
+        meta = {"browser": browser.version, "platform": platform.platform(), "clip": str(args.clip),
+                "date": time.strftime("%Y-%m-%d %H:%M:%S")}
+        print(f"{'engine':<34} {'início':>8} {'p50':>7} {'p95':>7} {'média':>7} {'rosto':>7}")
+        for delegate, wasm, model in itertools.product(args.delegate, args.wasm, args.model):
+            if delegate == "GPU" and wasm != args.wasm[0]:
+                continue                                  # the WASM build only matters on CPU
+            engine = {"name": "facemesh", "delegate": delegate, "wasm": wasm, "model": model,
+                      "blendshapes": not args.no_blendshapes}
+            r = run_variant(browser, url, assets, engine, args.timeout)
+            if "error" in r:
+                print(f"{delegate}/{wasm}/{model}: {r['error']}")
+                continue
+            for e in r["engines"]:
+                init = f"{e['initMs']:.0f}" if e["initMs"] is not None else "—"
+                label = e["label"] + (f" {model}" if e["name"] == "landmarker" else "")
+                print(f"{label:<34} {init:>8} {e['p50']:>7.2f} {e['p95']:>7.2f} "
+                      f"{e['mean']:>7.2f} {e['found']:>3}/{r['frames']}")
+            a = r["agreement"]
+            print(f"    vs FaceMesh em {a['both']}/{a['either']} quadros: pontos {a['meanPx']:.2f} px "
+                  f"(máx. {a['maxPx']:.1f}, {a['meanIod']:.1%} IOD), íris {a['irisPx']:.2f} px, "
+                  f"olho fechado {a['closedAgree']:.0%} igual")
+            results.append({"delegate": delegate, "wasm": wasm, "model": model, **r})
+        browser.close()
+    server.shutdown()
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps({"meta": meta, "results": results}, indent=1))
+        print(f"→ {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
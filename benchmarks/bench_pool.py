@@ -0,0 +1,131 @@
+"""Load test: per-session threads vs. the shared-memory process pool.
+
+    python benchmarks/bench_pool.py --sessions 1 2 4 8 16 32 --seconds 5
+    python benchmarks/bench_pool.py --engine facemesh     # needs the model
+
+Every simulated session offers 640×480 frames at ``--fps`` and, like the
+server, keeps at most one inference in flight: frames that arrive meanwhile
+are dropped. Reports aggregate processed frames/s, p50/p99 latency
+(capture → landmarks) and the drop ratio for each session count.
+
+The default ``synthetic`` engine burns ``--work-ms`` of GIL-holding Python
+per frame, standing in for FaceMesh where no model is available.
+"""
+
+import argparse
+import sys
+import threading
+import time
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from iris_ball.facemesh import FaceMesh  # noqa: E402
+from iris_ball.landmarks import N_LANDMARKS  # noqa: E402
+from iris_ball.pool import FRAME_SHAPE, InferencePool  # noqa: E402
+
+
+class SyntheticMesh:
+    """FaceMesh stand-in: fixed CPU cost under the GIL, fake landmarks."""
+
+    backend = "synthetic"
+
+    def __init__(self, max_faces=1, work_ms=8.0):
+        self.max_faces = max_faces
+        self.work_ms = work_ms
+
+    def process(self, rgb, timestamp_ms=None):
+        end = time.perf_counter() + self.work_ms / 1000
+        acc = 0
+        while time.perf_counter() < end:
+            for i in range(200):
+                acc += i * i
+        level = float(rgb[::16, ::16].mean()) / 255
+        return np.full((1, N_LANDMARKS, 3), level, dtype=np.float32)
+
+
+def session(process, frame, fps, stop, lat, stats):
+    period = 1.0 / fps
+    t_next = time.perf_counter()
+    offered = done = 0
+    while not stop.is_set():
+        now = time.perf_counter()
+        if now < t_next:
+            time.sleep(t_next - now)
+        t_cap = time.perf_counter()
+        process(frame)
+        lat.append(time.perf_counter() - t_cap)
+        done += 1
+        # Camera frames that arrived while busy were superseded.
+        missed = int((time.perf_counter() - t_next) // period)
+        offered += 1 + missed
+        t_next += (1 + missed) * period
+    stats.append((offered, done))
+
+
+def run(process_factory, sessions, seconds, fps):
+    frame = np.random.default_rng(0).integers(0, 255, FRAME_SHAPE, dtype=np.uint8)
+    stop = threading.Event()
+    lat, stats = [], []
+    threads = [threading.Thread(target=session,
+                                args=(process_factory(), frame, fps, stop, lat, stats))
+               for _ in range(sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    dt = time.perf_counter() - t0
+    offered = sum(o for o, _ in stats)
+    done = sum(d for _, d in stats)
+    ms = np.array(lat) * 1000
+    return done / dt, np.percentile(ms, 50), np.percentile(ms, 99), 1 - done / max(offered, 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--engine", choices=["synthetic", "facemesh"], default="synthetic")
+    parser.add_argument("--work-ms", type=float, default=8.0)
+    parser.add_argument("--backend", choices=["thread", "process", "both"], default="both")
+    args = parser.parse_args(argv)
+
+    if args.engine == "synthetic":
+        engine = partial(SyntheticMesh, work_ms=args.work_ms)
+    else:
+        engine = partial(FaceMesh, static=True)
+
+    backends = ["thread", "process"] if args.backend == "both" else [args.backend]
+    pool = InferencePool(workers=args.workers, engine=engine) if "process" in backends else None
+    if pool:
+        pool.infer(np.zeros(FRAME_SHAPE, np.uint8))          # workers up, models warm
+        print(f"process pool: {pool.workers} workers, {pool.slots} slots")
+
+    print(f"{'backend':<8} {'sessions':>8} {'frames/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'drop':>6}")
+    try:
+        for backend in backends:
+            for n in args.sessions:
+                if backend == "thread":
+                    def factory():
+                        return engine().process
+                else:
+                    def factory():
+                        return pool.acquire(timeout=None).process
+                fps, p50, p99, drop = run(factory, n, args.seconds, args.fps)
+                print(f"{backend:<8} {n:>8} {fps:>10.1f} {p50:>8.1f} {p99:>8.1f} {drop:>6.0%}")
+    finally:
+        if pool:
+            pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
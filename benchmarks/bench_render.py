@@ -0,0 +1,265 @@
+"""Per-frame render cost of the page in headless Chromium, with baselines.
+
+    pip install playwright && playwright install chromium
+    python benchmarks/bench_render.py --save benchmarks/baselines/render.json
+    python benchmarks/bench_render.py --baseline benchmarks/baselines/render.json
+
+The page boots in replay mode (see ``frontend/recorder.js``), so there is no
+camera and no FaceMesh: synthetic landmark streams are encoded as ``.irb``
+and rendered back to back at their recorded times, which makes every run
+see the same frames. Each scenario is run for every combination of the
+toggles (``showMesh``, ``trailOn``, ``shockOn``, ``showGlow``), blur levels
+and canvas sizes, and the page's per-frame p50/p95/p99 are collected.
+
+Scenarios: ``still`` (jittering face), ``saccades`` (gaze jumping between
+corners every few frames, long trails), ``blinks`` (a blink every 20 frames,
+the fastest the cooldown allows) and ``shocks`` (blink storm while the ball
+sweeps, so many shockwaves overlap). ``--recording`` adds a real session.
+``--stress`` repeats every case with that many extra particles alive
+(``particleStress``), and ``--faces 1 2 4`` with that many copies of the
+face side by side (``maxFaces``), to see how the cost grows per face.
+
+The canvas sizes are the scene (W×H). ``--display`` draws it at other CSS
+widths, ``--dpr`` with that devicePixelRatio and ``--render-scales`` with
+the per-layer presets of ``frontend/layers.js``; their cases also list the
+mean cost of each layer, i.e. the fill cost of every combination:
+
+    python benchmarks/bench_render.py --sizes 640x480 --display 640 1920 --dpr 1 2 \
+        --render-scales full balanced light minimal --toggles
+
+With ``--baseline`` every case whose p50 grew by more than ``--tolerance``
+is listed and the exit status is 1.
+"""
+
+import argparse
+import base64
+import itertools
+import json
+import platform
+import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from iris_ball import recording  # noqa: E402
+from iris_ball.landmarks import (FACE_OVAL, L_EAR_PTS, LEFT_EYE, LEFT_IRIS,  # noqa: E402
+                                 N_LANDMARKS, R_EAR_PTS, RIGHT_EYE, RIGHT_IRIS, USED)
+
+FRONTEND_DIR = Path(__file__).resolve().parents[1] / "iris_ball" / "frontend"
+
+TOGGLES = ("showMesh", "trailOn", "shockOn", "showGlow")
+FPS = 30
+
+
+# ── Synthetic streams ────────────────────────────────────────────────────────
+
+def _ring(lms, idx, cx, cy, rx, ry):
+    a = np.linspace(0, 2 * np.pi, len(idx), endpoint=False)
+    lms[:, idx, 0] = cx[:, None] + rx * np.cos(a)
+    lms[:, idx, 1] = cy[:, None] + ry * np.sin(a)
+
+
+def face(gaze, closed, seed=0):
+    """(F, len(USED), 3) landmarks for per-frame gaze offsets (F, 2) and eye state.
+
+    The face stays near the centre; the irises move by ``gaze`` (normalized,
+    pre-amplify) and ``closed`` frames drop the EAR well under the threshold.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(gaze)
+    lms = np.zeros((n, N_LANDMARKS, 3), np.float32)
+    head = 0.5 + np.cumsum(0.0005 * rng.standard_normal((n, 2)), axis=0).clip(-0.05, 0.05)
+    hx, hy = head[:, 0], head[:, 1]
+    _ring(lms, FACE_OVAL, hx, hy + 0.02, 0.16, 0.24)
+    lid = np.where(closed, 0.003, 0.02)
+    for eye, pts, iris, dx in ((LEFT_EYE, L_EAR_PTS, LEFT_IRIS, 0.07),
+                               (RIGHT_EYE, R_EAR_PTS, RIGHT_IRIS, -0.07)):
+        ex, ey = hx + dx, hy - 0.05
+        _ring(lms, eye, ex, ey, 0.04, 0.015)
+        top1, bot1, top2, bot2, left, right = pts
+        lms[:, [left, right], 0] = np.stack([ex - 0.04, ex + 0.04], axis=1)
+        lms[:, [left, right], 1] = ey[:, None]
+        for top, bot, ox in ((top1, bot1, -0.01), (top2, bot2, 0.01)):
+            lms[:, [top, bot], 0] = (ex + ox)[:, None]
+            lms[:, top, 1], lms[:, bot, 1] = ey - lid, ey + lid
+        _ring(lms, iris, ex - gaze[:, 0], ey + gaze[:, 1], 0.008, 0.008)
+    lms[:, :, 2] = -0.02
+    lms[:, :, :2] += 0.0004 * rng.standard_normal((n, N_LANDMARKS, 2))
+    return lms[:, USED]
+
+
+def scenario(name, frames, seed=0):
+    rng = np.random.default_rng(seed)
+    k = np.arange(frames)
+    closed = np.zeros(frames, bool)
+    corners = 0.12 * np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]])
+    if name == "still":
+        gaze = np.zeros((frames, 2))
+    elif name == "saccades":
+        gaze = corners[(k // 6) % 4] + 0.01 * rng.standard_normal((frames, 2))
+    elif name == "blinks":
+        gaze = 0.02 * np.sin(k[:, None] / 15 + [0, 1])
+        closed = k % 20 < 2
+    elif name == "shocks":
+        gaze = 0.12 * np.stack([np.sin(k / 9), np.cos(k / 13)], axis=1)
+        closed = k % 19 < 2
+    else:
+        raise ValueError(name)
+    return k / FPS, face(gaze, closed, seed)
+
+
+def irb(t, lms):
+    return recording.header() + recording.encode(t, lms)
+
+
+# ── Page driver ───────────────────────────────────────────────────────────────
+
+CAPTURE = """
+window.__iris = { last: null };
+window.addEventListener("message", ev=>{
+  const m = ev.data;
+  if (m && m.isStreamlitMessage && m.type === "streamlit:setComponentValue") {
+    window.__iris.last = m.value;
+  }
+});
+"""
+
+RENDER = """
+([b64, cfg, size]) => {
+  const bytes = Uint8Array.from(atob(b64), c=>c.charCodeAt(0));
+  const args = { cfg, replay:bytes, replaySpeed:"max", replayFaces:cfg.maxFaces,
+                 size, height:size[1]+160 };
+  window.postMessage({ type:"streamlit:render", args }, "*");
+}
+"""
+
+
+def serve(directory):
+    handler = partial(SimpleHTTPRequestHandler, directory=str(directory))
+    handler.log_message = lambda *a: None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_case(browser, url, data, cfg, size, timeout_s, dpr=1):
+    width = cfg["displayWidth"]
+    page = browser.new_page(viewport={"width": width + 40, "height": width * size[1] // size[0] + 200},
+                            device_scale_factor=dpr)
+    try:
+        page.add_init_script(CAPTURE)
+        page.goto(url)
+        page.evaluate(RENDER, [data, cfg, list(size)])
+        page.wait_for_function("window.__iris.last && window.__iris.last.replay",
+                               timeout=timeout_s * 1000)
+        return page.evaluate("window.__iris.last.replay")
+    finally:
+        page.close()
+
+
+def case_key(name, size, cfg, dpr=1):
+    flags = ",".join(f"{k}={int(cfg[k])}" for k in TOGGLES)
+    key = f"{name}|{size[0]}x{size[1]}|{flags},blur={cfg['blurAmount']}"
+    key += f",stress={cfg['particleStress']}" if cfg["particleStress"] else ""
+    key += f",faces={cfg['maxFaces']}" if cfg["maxFaces"] > 1 else ""
+    if cfg["displayWidth"] != size[0] or dpr != 1 or cfg["renderScale"] != "full":
+        key += f",display={cfg['displayWidth']}@{dpr:g}x,scale={cfg['renderScale']}"
+    return key
+
+
+def compare(results, baseline, tolerance):
+    worse = []
+    for key, r in results.items():
+        b = baseline.get(key)
+        if b and r["frameP50"] > b["frameP50"] * (1 + tolerance):
+            worse.append((key, b["frameP50"], r["frameP50"]))
+    return worse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", default=["still", "saccades", "blinks", "shocks"])
+    parser.add_argument("--recording", type=Path, action="append", default=[],
+                        help="an .irb to add as a scenario (repeatable)")
+    parser.add_argument("--frames", type=int, default=240)
+    parser.add_argument("--blur", type=int, nargs="+", default=[0, 9, 20])
+    parser.add_argument("--sizes", nargs="+", default=["640x480", "1280x720"])
+    parser.add_argument("--stress", type=int, nargs="+", default=[0],
+                        help="extra live particles per case")
+    parser.add_argument("--faces", type=int, nargs="+", default=[1], choices=range(1, 5),
+                        help="copies of the face per case")
+    parser.add_argument("--display", type=int, nargs="+", default=[0],
+                        help="CSS display widths (0 = the canvas size)")
+    parser.add_argument("--dpr", type=float, nargs="+", default=[1])
+    parser.add_argument("--render-scales", nargs="+", default=["full"],
+                        choices=["full", "balanced", "light", "minimal"])
+    parser.add_argument("--toggles", nargs="*", default=list(TOGGLES),
+                        help="toggles to vary; the others stay on")
+    parser.add_argument("--save", type=Path, help="write the results as a JSON baseline")
+    parser.add_argument("--baseline", type=Path, help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args(argv)
+
+    from playwright.sync_api import sync_playwright
+
+    streams = {name: irb(*scenario(name, args.frames)) for name in args.scenarios}
+    for path in args.recording:
+        streams[path.stem] = path.read_bytes()
+    streams = {k: base64.b64encode(v).decode() for k, v in streams.items()}
+    sizes = [tuple(int(v) for v in s.split("x")) for s in args.sizes]
+    combos = list(itertools.product((True, False), repeat=len(args.toggles)))
+
+    server = serve(FRONTEND_DIR)
+    url = f"http://127.0.0.1:{server.server_address[1]}/index.html"
+    results = {}
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        meta = {"browser": browser.version, "platform": platform.platform(),
+                "date": time.strftime("%Y-%m-%d %H:%M:%S"), "frames": args.frames}
+        print(f"{'case':<62} {'p50':>7} {'p95':>7} {'p99':>7}  ms")
+        cases = itertools.product(streams, sizes, args.blur, args.stress, args.faces,
+                                  args.display, args.dpr, args.render_scales, combos)
+        for name, size, blur, stress, faces, display, dpr, scale, combo in cases:
+            cfg = {k: True for k in TOGGLES}
+            cfg.update(zip(args.toggles, combo))
+            cfg["blurAmount"] = blur
+            cfg["particleStress"] = stress
+            cfg["maxFaces"] = faces
+            cfg["displayWidth"] = display or size[0]
+            cfg["hidpi"] = True
+            cfg["renderScale"] = scale
+            r = run_case(browser, url, streams[name], cfg, size, args.timeout, dpr)
+            key = case_key(name, size, cfg, dpr)
+            results[key] = {k: r[k] for k in ("frameP50", "frameP95", "frameP99", "frameMean",
+                                              "rendered", "wallMs", "layerMs", "layerSizes")}
+            print(f"{key:<62} {r['frameP50']:>7.2f} {r['frameP95']:>7.2f} {r['frameP99']:>7.2f}")
+            if key.endswith(f"scale={scale}"):
+                print("    " + "  ".join(f"{layer} {ms:.2f} ({'×'.join(map(str, r['layerSizes'][layer]))})"
+                                         for layer, ms in r["layerMs"].items()))
+        browser.close()
+    server.shutdown()
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps({"meta": meta, "results": results}, indent=1))
+        print(f"→ {args.save}")
+    if args.baseline:
+        base = json.loads(args.baseline.read_text())
+        worse = compare(results, base["results"], args.tolerance)
+        print(f"\nvs {args.baseline} ({base['meta'].get('browser')}, {base['meta'].get('date')}): "
+              f"{len(worse)} of {len(results)} cases slower than +{args.tolerance:.0%}")
+        for key, b, r in worse:
+            print(f"  {key:<62} {b:>7.2f} → {r:>7.2f} ms  (+{r / b - 1:.0%})")
+        return 1 if worse else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Lag versus jitter of the ball smoothers on landmark sequences.
+
+    python benchmarks/bench_smoothing.py
+    python benchmarks/bench_smoothing.py --recording gravacoes/20250101-120000-123-a1b2c3.irb
+
+Runs the exponential lerp and the One Euro filter (``gaze.analyze`` with
+``smoother=...``) at several "smoothing" settings over synthetic gaze
+(fixations, saccades and a pursuit, with landmark noise) and over any
+recordings given. One Euro also extrapolates to cover part of
+``--latency-ms``, as the page does for the capture→screen delay; the lerp
+has no prediction.
+
+Each output sample is taken to be on screen ``--latency-ms`` after capture
+and compared with a zero-phase reference (centred moving average of the raw
+ball target):
+
+    lag     shift (ms) that best aligns the output with the reference,
+            latency included
+    jitter  RMS second difference (px/frame²) of the ball during fixations,
+            i.e. wobble, not the slow settle after a saccade
+    error   RMS distance (px) to where the ball should be when shown
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from iris_ball import recording  # noqa: E402
+from iris_ball.gaze import analyze, ball_target, gaze_vector  # noqa: E402
+from iris_ball.landmarks import LEFT_IRIS, N_LANDMARKS, RIGHT_IRIS, expand_used  # noqa: E402
+
+FPS = 30
+REF_HALF = 2                # reference window: 2*REF_HALF+1 frames, centred
+FIX_SPEED = 2.0             # px/frame of the reference below which gaze is fixating
+FIX_MARGIN = 4              # frames kept clear of any movement
+
+
+def synthetic(seconds, noise, seed=0):
+    """``(t, lms)``: fixations joined by 40 ms saccades, then a 0.5 Hz pursuit."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * FPS)
+    t = np.arange(n) / FPS
+    gaze = np.zeros((n, 2))
+    i, pos = 0, np.zeros(2)
+    while i < n * 2 // 3:
+        hold = int(rng.uniform(0.3, 0.8) * FPS)
+        nxt = rng.uniform(-0.12, 0.12, 2)
+        ramp = np.linspace(0, 1, 3)[1:, None]
+        seg = np.vstack([np.repeat(pos[None], hold, axis=0), pos + (nxt - pos) * ramp])
+        gaze[i:i + len(seg)] = seg[:n - i]
+        i, pos = i + len(seg), nxt
+    k = t[i:] - t[i]
+    gaze[i:] = pos + 0.1 * np.stack([np.sin(np.pi * k), np.cos(np.pi * k) - 1], axis=1)
+
+    lms = np.zeros((n, N_LANDMARKS, 3), np.float32)
+    a = np.linspace(0, 2 * np.pi, len(LEFT_IRIS), endpoint=False)
+    ring = 0.008 * np.stack([np.cos(a), np.sin(a)], axis=1)
+    for iris, ex in ((LEFT_IRIS, 0.57), (RIGHT_IRIS, 0.43)):
+        centre = np.stack([ex - gaze[:, 0], 0.45 + gaze[:, 1]], axis=1)
+        lms[:, iris, :2] = centre[:, None] + ring
+    lms[:, :, :2] += noise * rng.standard_normal((n, N_LANDMARKS, 2))
+    return t, lms
+
+
+def reference(lms):
+    """Raw ball target smoothed with a centred window (no phase lag)."""
+    raw = ball_target(gaze_vector(lms))[:, :2]
+    k = np.ones(2 * REF_HALF + 1) / (2 * REF_HALF + 1)
+    pad = np.pad(raw, ((REF_HALF, REF_HALF), (0, 0)), mode="edge")
+    return np.stack([np.convolve(pad[:, c], k, mode="valid") for c in range(2)], axis=1)
+
+
+def measure(t, ball, ref, latency, max_lag=0.3):
+    shown = t + latency
+    lags = np.arange(0, max_lag, 0.002)
+    best, best_lag = np.inf, 0.0
+    for lag in lags:
+        r = np.stack([np.interp(shown - lag, t, ref[:, c]) for c in range(2)], axis=1)
+        e = np.mean(np.sum((ball - r) ** 2, axis=1))
+        if e < best:
+            best, best_lag = e, lag
+    moving = np.hypot(*np.diff(ref, axis=0).T) > FIX_SPEED
+    fix = np.convolve(moving, np.ones(2 * FIX_MARGIN + 1), "same")[1:] == 0
+    jitter = np.sqrt(np.mean(np.sum(np.diff(ball, 2, axis=0)[fix] ** 2, axis=1)))
+    now = np.stack([np.interp(shown, t, ref[:, c]) for c in range(2)], axis=1)
+    error = np.sqrt(np.mean(np.sum((ball - now) ** 2, axis=1)))
+    return best_lag * 1000, jitter, error
+
+
+def run(name, t, lms, settings, latency):
+    valid = np.isfinite(lms[:, LEFT_IRIS[0], 0])
+    t, lms = t[valid], lms[valid]
+    ref = reference(lms)
+    for smoother in ("lerp", "oneeuro"):
+        for smoothing in settings:
+            res = analyze(lms, smoothing=smoothing, smoother=smoother, t=t, latency=latency)
+            lag, jitter, error = measure(t, res.ball[:, :2], ref, latency)
+            print(f"{name:<14} {smoother:<8} {smoothing:>4} {lag:>8.0f} {jitter:>8.2f} {error:>8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recording", type=Path, action="append", default=[],
+                        help="an .irb to measure as well (repeatable)")
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--noise", type=float, default=0.0015,
+                        help="landmark noise (normalized) of the synthetic stream")
+    parser.add_argument("--smoothing", type=int, nargs="+", default=[3, 7, 12])
+    parser.add_argument("--latency-ms", type=float, default=60)
+    args = parser.parse_args(argv)
+
+    latency = args.latency_ms / 1000
+    print(f"{'sequence':<14} {'filter':<8} {'smth':>4} {'lag ms':>8} {'jitter':>8} {'error':>8}")
+    run("synthetic", *synthetic(args.seconds, args.noise), args.smoothing, latency)
+    for path in args.recording:
+        t, sub = recording.load(path)
+        run(path.stem[:14], t, expand_used(sub), args.smoothing, latency)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+__all__ = ["iris_ball", "live_sink", "profile_sink"]
+
+
+def __getattr__(name):
+    # Lazy so the offline tools (gaze math, batch CLI, benchmarks) can import
+    # the package without pulling in Streamlit.
+    if name in __all__:
+        from . import component
+        return getattr(component, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
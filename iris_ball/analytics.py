@@ -0,0 +1,281 @@
+"""Bounded-memory blink/gaze analytics across every session of a server.
+
+:class:`AnalyticsStore` keeps, per session, two ring buffers of counters:
+one bucket per second (``seconds`` of them) and one per minute
+(``minutes``). Every ingested frame increments its second and its minute
+bucket, so the per-minute rollup is always ready and nothing per frame is
+kept. Each bucket holds the counters in ``COLUMNS``: frames, frames with a
+face, blinks, direction changes, frames per gaze direction and an EAR
+histogram (``EAR_BINS`` bins up to ``EAR_MAX``).
+
+All sessions share one ``(capacity, buckets, columns)`` array per level,
+with one row per session slot, so queries over thousands of sessions are a
+masked sum per level. Memory is fixed by the capacity: ~22 KB per session
+with the defaults, growing by doubling when more sessions than slots are
+open. Slots of closed or idle (:meth:`~AnalyticsStore.evict`) sessions are
+reused.
+
+With ``spill`` set, minute buckets about to be overwritten (and everything
+left when a session closes) are appended to that file as ``SPILL_DTYPE``
+records; :func:`read_spill` loads them back.
+"""
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .gaze import DIRECTIONS
+from .live import EAR_Q, FACE
+
+EAR_BINS = 12
+EAR_MAX = 0.42
+SECOND_BUCKETS = 300        # 5 min at 1 s
+MINUTE_BUCKETS = 240        # 4 h at 1 min
+IDLE_S = 120                # evict() default
+
+FRAMES, FACES, BLINKS, CHANGES = range(4)
+DIR0 = 4
+EAR0 = DIR0 + len(DIRECTIONS)
+COLUMNS = ("frames", "faces", "blinks", "changes",
+           *(f"dir_{d}" for d in DIRECTIONS), *(f"ear_{i}" for i in range(EAR_BINS)))
+
+SPILL_DTYPE = np.dtype([("session", "<u8"), ("minute", "<i8"), ("counts", "<u2", len(COLUMNS))])
+
+
+def session_key(name):
+    """Stable 64-bit id of a session name, as stored in spill files."""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "little")
+
+
+def read_spill(path):
+    return np.fromfile(path, dtype=SPILL_DTYPE)
+
+
+class _Level:
+    """Ring of ``n`` buckets of ``width`` seconds for every session slot."""
+
+    def __init__(self, n, width, dtype, capacity):
+        self.n, self.width, self.dtype = n, width, dtype
+        self.counts = np.zeros((capacity, n, len(COLUMNS)), dtype)
+        self.head = np.full(capacity, -1, np.int64)     # newest bucket index per slot
+
+    def grow(self, capacity):
+        counts = np.zeros((capacity, self.n, len(COLUMNS)), self.dtype)
+        counts[:len(self.counts)] = self.counts
+        head = np.full(capacity, -1, np.int64)
+        head[:len(self.head)] = self.head
+        self.counts, self.head = counts, head
+
+    def advance(self, slot, bucket, evicted=None):
+        """Move slot's head to ``bucket``, zeroing the buckets it laps.
+
+        ``evicted(slot, buckets, counts)`` sees the non-empty ones first.
+        """
+        head = self.head[slot]
+        if bucket <= head:
+            return
+        if head < 0:
+            self.counts[slot] = 0
+        else:
+            lapped = np.arange(head - self.n + 1, min(head, bucket - self.n) + 1)
+            pos = lapped % self.n
+            if evicted is not None:
+                used = self.counts[slot, pos, FRAMES] > 0
+                if used.any():
+                    evicted(slot, lapped[used], self.counts[slot, pos[used]])
+            self.counts[slot, pos] = 0
+        self.head[slot] = bucket
+
+    def add(self, slot, bucket, cols, weights):
+        """``counts[slot, bucket % n, cols] += weights``, dropping buckets already lapped."""
+        keep = bucket > self.head[slot] - self.n
+        np.add.at(self.counts[slot], (bucket[keep] % self.n, cols[keep]), weights[keep])
+
+    def window(self, now, span):
+        """(capacity, n) mask of the buckets of the last ``span`` buckets up to ``now``."""
+        age = (self.head[:, None] - np.arange(self.n)[None, :]) % self.n
+        age += (now - self.head)[:, None]
+        return (age < span) & (self.head >= 0)[:, None]
+
+
+@dataclass
+class Stats:
+    """Result of :meth:`AnalyticsStore.query`, one row per session."""
+
+    sessions: list
+    counts: np.ndarray      # (S, len(COLUMNS)) uint32 totals over the window
+    active_s: np.ndarray    # (S,) seconds with at least one frame
+
+    @property
+    def blink_rate(self):
+        """Blinks per active minute."""
+        return self.counts[:, BLINKS] / np.maximum(self.active_s / 60, 1e-9)
+
+    @property
+    def change_rate(self):
+        """Gaze direction changes per active minute."""
+        return self.counts[:, CHANGES] / np.maximum(self.active_s / 60, 1e-9)
+
+    @property
+    def dwell(self):
+        """(S, len(DIRECTIONS)) share of face frames per gaze direction."""
+        d = self.counts[:, DIR0:EAR0].astype(np.float64)
+        return d / np.maximum(d.sum(axis=1, keepdims=True), 1)
+
+    @property
+    def ear_hist(self):
+        """(S, EAR_BINS) EAR counts; bin edges are :func:`ear_edges`."""
+        return self.counts[:, EAR0:]
+
+
+def ear_edges():
+    return np.linspace(0, EAR_MAX, EAR_BINS + 1)
+
+
+class AnalyticsStore:
+    """Per-session second/minute rollups of blink and gaze events.
+
+    Thread-safe; meant to be one per process (``st.cache_resource``).
+    """
+
+    def __init__(self, capacity=256, seconds=SECOND_BUCKETS, minutes=MINUTE_BUCKETS, spill=None):
+        self.sec = _Level(seconds, 1, np.uint16, capacity)
+        self.min = _Level(minutes, 60, np.uint16, capacity)
+        self.spill = Path(spill) if spill else None
+        self.slots = {}                                   # name → slot
+        self.names = [None] * capacity
+        self.free = list(range(capacity - 1, -1, -1))
+        self.last_dir = np.full(capacity, -1, np.int16)
+        self.touched = np.zeros(capacity)                 # wall time of the last ingest
+        self.now = 0.0                                    # newest frame time seen (s)
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        return len(self.names)
+
+    @property
+    def nbytes(self):
+        return self.sec.counts.nbytes + self.min.counts.nbytes
+
+    def _slot(self, name):
+        slot = self.slots.get(name)
+        if slot is not None:
+            return slot
+        if not self.free:
+            cap = self.capacity
+            for level in (self.sec, self.min):
+                level.grow(2 * cap)
+            self.names += [None] * cap
+            self.last_dir = np.concatenate([self.last_dir, np.full(cap, -1, np.int16)])
+            self.touched = np.concatenate([self.touched, np.zeros(cap)])
+            self.free = list(range(2 * cap - 1, cap - 1, -1))
+        slot = self.free.pop()
+        self.slots[name], self.names[slot] = slot, name
+        self.sec.head[slot] = self.min.head[slot] = -1
+        self.last_dir[slot] = -1
+        return slot
+
+    def _spill(self, slot, minutes, counts):
+        if self.spill is None:
+            return
+        rec = np.zeros(len(minutes), SPILL_DTYPE)
+        rec["session"] = session_key(self.names[slot])
+        rec["minute"] = minutes
+        rec["counts"] = counts
+        self.spill.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.spill, "ab") as f:
+            rec.tofile(f)
+
+    def ingest(self, session, t, face, direction, ear, blinks):
+        """Add frames of one session: times ``t`` (epoch s, ascending), face
+        flags, direction indices (``gaze.DIRECTIONS``), mean EAR and blinks
+        registered per frame."""
+        t = np.asarray(t, np.float64)
+        if not len(t):
+            return
+        face = np.asarray(face, bool)
+        direction = np.asarray(direction, np.int64)
+        blinks = np.asarray(blinks, np.int64)
+        n = len(t)
+        with self._lock:
+            slot = self._slot(session)
+            fd = direction[face]
+            prev = np.concatenate([[self.last_dir[slot]], fd[:-1]])
+            changed = (fd != prev) & (prev >= 0)
+            if len(fd):
+                self.last_dir[slot] = fd[-1]
+            ear_bin = np.clip((np.asarray(ear)[face] / EAR_MAX * EAR_BINS).astype(np.int64),
+                              0, EAR_BINS - 1)
+            idx = np.arange(n)
+            fi = idx[face]
+            rows = np.concatenate([idx, fi, idx, fi[changed], fi, fi])
+            cols = np.concatenate([np.full(n, FRAMES), np.full(len(fi), FACES), np.full(n, BLINKS),
+                                   np.full(changed.sum(), CHANGES), DIR0 + fd, EAR0 + ear_bin])
+            w = np.concatenate([np.ones(n, np.int64), np.ones(len(fi), np.int64), blinks,
+                                np.ones(changed.sum() + 2 * len(fi), np.int64)])
+            for level in (self.sec, self.min):
+                bucket = np.floor(t / level.width).astype(np.int64)
+                level.advance(slot, bucket[-1], self._spill if level is self.min else None)
+                level.add(slot, bucket[rows], cols, w.astype(level.dtype))
+            self.touched[slot] = time.time()
+            self.now = max(self.now, t[-1])
+
+    def ingest_live(self, session, batch):
+        """Add one :class:`iris_ball.live.Batch`."""
+        f = batch.frames
+        self.ingest(session, batch.t, (f["flags"] & FACE) != 0, f["dir"],
+                    f["ear"].mean(axis=1) / EAR_Q, f["blinks"])
+
+    def close(self, session):
+        """Free the session's slot, spilling its minute rollups first."""
+        with self._lock:
+            self._close(session)
+
+    def _close(self, session):
+        """:meth:`close` with the lock already held."""
+        slot = self.slots.pop(session, None)
+        if slot is None:
+            return
+        m = self.min
+        if m.head[slot] >= 0:
+            minutes = m.head[slot] - np.arange(m.n)
+            pos = minutes % m.n
+            used = m.counts[slot, pos, FRAMES] > 0
+            if used.any():
+                self._spill(slot, minutes[used][::-1], m.counts[slot, pos[used]][::-1])
+        self.sec.head[slot] = m.head[slot] = -1
+        self.names[slot] = None
+        self.free.append(slot)
+
+    def evict(self, idle_s=IDLE_S, now=None):
+        """Close every session without an ingest in the last ``idle_s`` (wall) seconds."""
+        now = time.time() if now is None else now
+        with self._lock:                      # an ingest in between must keep its session
+            stale = [n for n, s in self.slots.items() if now - self.touched[s] > idle_s]
+            for name in stale:
+                self._close(name)
+        return stale
+
+    def query(self, window_s=60, sessions=None, now=None):
+        """Totals over the last ``window_s`` seconds (frame time) for every
+        open session, or for the names in ``sessions``.
+
+        Windows up to the second ring come from the per-second buckets,
+        longer ones from the per-minute rollups.
+        """
+        with self._lock:
+            now = self.now if now is None else now
+            level = self.sec if window_s <= self.sec.n else self.min
+            span = int(np.ceil(window_s / level.width))
+            names = list(self.slots) if sessions is None else [s for s in sessions if s in self.slots]
+            slots = np.array([self.slots[s] for s in names], np.int64)
+            mask = level.window(int(np.floor(now / level.width)), span)[slots]
+            counts = level.counts[slots]
+            totals = np.add.reduce(counts, axis=1, dtype=np.uint32, where=mask[:, :, None])
+            active = (mask & (counts[:, :, FRAMES] > 0)).sum(axis=1) * level.width
+        return Stats(names, totals, active.astype(np.float64))
@@ -0,0 +1,195 @@
+"""Local MediaPipe asset bundle for offline kiosks.
+
+``python -m iris_ball.assets`` downloads the pinned ``camera_utils`` and
+``face_mesh`` files into the component's ``vendor`` folder, which Streamlit
+serves from the component path; ``--landmarker`` adds ``tasks-vision`` and
+the FaceLandmarker model for the page's second engine
+(``frontend/engines.js``). The page then loads them through a versioned
+Cache Storage layer (see ``frontend/assets.js``), so after the first run
+the WASM and model files never touch the network.
+
+Streamlit only sends ``Cache-Control: public`` for component files, so
+``--precompress`` also writes ``.gz`` (and ``.br`` when ``brotli`` is
+installed) siblings for deployments that put nginx/Caddy in front with
+``gzip_static`` and an ``immutable`` max-age.
+"""
+
+import argparse
+import gzip
+import shutil
+import sys
+import urllib.request
+import zlib
+from pathlib import Path
+
+from .facemesh import FACE_LANDMARKER_MODEL
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+FACE_MESH_VERSION    = "0.4.1633559619"
+CAMERA_UTILS_VERSION = "0.3.1675466862"
+TASKS_VISION_VERSION = "0.10.14"
+
+CDN = "https://cdn.jsdelivr.net/npm/@mediapipe"
+VENDOR_DIR = Path(__file__).parent / "frontend" / "vendor" / "mediapipe"
+VENDOR_URL = "vendor/mediapipe"   # relative to the component's index.html
+
+CAMERA_UTILS_FILES = ["camera_utils.js"]
+FACE_MESH_FILES = [
+    "face_mesh.js",
+    "face_mesh.binarypb",
+    "face_mesh_solution_packed_assets.data",
+    "face_mesh_solution_packed_assets_loader.js",
+    "face_mesh_solution_simd_wasm_bin.js",
+    "face_mesh_solution_simd_wasm_bin.wasm",
+    "face_mesh_solution_wasm_bin.js",
+    "face_mesh_solution_wasm_bin.wasm",
+]
+TASKS_VISION_FILES = [
+    "vision_bundle.mjs",
+    "wasm/vision_wasm_internal.js",
+    "wasm/vision_wasm_internal.wasm",
+    "wasm/vision_wasm_nosimd_internal.js",
+    "wasm/vision_wasm_nosimd_internal.wasm",
+]
+PRECOMPRESS_SUFFIXES = (".js", ".mjs", ".wasm", ".data", ".binarypb")
+
+# Tasks model for the Python engine (iris_ball.facemesh) on MediaPipe builds
+# without the legacy solutions API, and for the page's FaceLandmarker.
+FACE_LANDMARKER_URL = ("https://storage.googleapis.com/mediapipe-models/face_landmarker/"
+                       "face_landmarker/float16/1/face_landmarker.task")
+
+# FaceLandmarker variants the page can pick (engine option "model"), as
+# vendored filenames → URLs. float16 is the only bundle published so far.
+LANDMARKER_MODELS = {"float16": ("face_landmarker.task", FACE_LANDMARKER_URL)}
+
+
+def remote_urls():
+    """Map each vendored filename to its pinned CDN URL."""
+    urls = {f: f"{CDN}/camera_utils@{CAMERA_UTILS_VERSION}/{f}" for f in CAMERA_UTILS_FILES}
+    urls.update({f: f"{CDN}/face_mesh@{FACE_MESH_VERSION}/{f}" for f in FACE_MESH_FILES})
+    return urls
+
+
+def landmarker_urls():
+    """Map each vendored Tasks-Vision file and model to its pinned URL."""
+    urls = {f"tasks-vision/{f}": f"{CDN}/tasks-vision@{TASKS_VISION_VERSION}/{f}"
+            for f in TASKS_VISION_FILES}
+    urls.update(dict(LANDMARKER_MODELS.values()))
+    return urls
+
+
+def cache_name():
+    """Cache Storage bucket of the pinned asset set.
+
+    Vendored URLs carry no version, so every pinned version (and the model
+    URLs) goes into the name: bumping any of them starts a fresh bucket
+    instead of serving the old files from the cache.
+    """
+    models = zlib.crc32(" ".join(url for _, url in LANDMARKER_MODELS.values()).encode())
+    return (f"iris-ball-mediapipe-{FACE_MESH_VERSION}-{CAMERA_UTILS_VERSION}-"
+            f"{TASKS_VISION_VERSION}-{models:08x}")
+
+
+def have_local_assets(dest=VENDOR_DIR):
+    return all((Path(dest) / f).is_file() for f in remote_urls())
+
+
+def have_local_landmarker(dest=VENDOR_DIR):
+    return all((Path(dest) / f).is_file() for f in landmarker_urls())
+
+
+def asset_config(mode="cdn"):
+    """Frontend asset settings for ``mode`` ("cdn" or "local").
+
+    In local mode the FaceLandmarker files still come from the CDN until
+    they are vendored (``--landmarker``).
+    """
+    if mode == "local":
+        camera_base = face_mesh_base = VENDOR_URL
+    else:
+        camera_base = f"{CDN}/camera_utils@{CAMERA_UTILS_VERSION}"
+        face_mesh_base = f"{CDN}/face_mesh@{FACE_MESH_VERSION}"
+    if mode == "local" and have_local_landmarker():
+        tasks_base = f"{VENDOR_URL}/tasks-vision"
+        models = {k: f"{VENDOR_URL}/{name}" for k, (name, _) in LANDMARKER_MODELS.items()}
+    else:
+        tasks_base = f"{CDN}/tasks-vision@{TASKS_VISION_VERSION}"
+        models = {k: url for k, (_, url) in LANDMARKER_MODELS.items()}
+    return {
+        "mode"          : mode,
+        "cameraUtils"   : f"{camera_base}/camera_utils.js",
+        "faceMeshBase"  : face_mesh_base,
+        "faceMeshFiles" : FACE_MESH_FILES,
+        "tasksBase"     : tasks_base,
+        "landmarkerModels": models,
+        "cacheName"     : cache_name(),
+    }
+
+
+def _precompress(path):
+    data = path.read_bytes()
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(data))
+
+
+def _download(url, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".part")
+    with urllib.request.urlopen(url, timeout=60) as resp, open(tmp, "wb") as out:
+        shutil.copyfileobj(resp, out)
+    tmp.replace(path)
+
+
+def fetch_assets(dest=VENDOR_DIR, precompress=False, force=False, landmarker=False):
+    """Download every asset (plus the FaceLandmarker files with ``landmarker``)
+    into ``dest``; returns the list of written paths."""
+    dest = Path(dest)
+    written = []
+    urls = remote_urls()
+    if landmarker:
+        urls.update(landmarker_urls())
+    for name, url in urls.items():
+        path = dest / name
+        if force or not path.is_file():
+            _download(url, path)
+            written.append(path)
+        if precompress and path.suffix in PRECOMPRESS_SUFFIXES:
+            _precompress(path)
+    return written
+
+
+def fetch_model(path=FACE_LANDMARKER_MODEL, force=False):
+    """Download the FaceLandmarker model; returns the path if it was written."""
+    path = Path(path)
+    if force or not path.is_file():
+        _download(FACE_LANDMARKER_URL, path)
+        return [path]
+    return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vendor MediaPipe FaceMesh assets for offline use.")
+    parser.add_argument("--dest", type=Path, default=VENDOR_DIR)
+    parser.add_argument("--precompress", action="store_true", help="also write .gz/.br siblings")
+    parser.add_argument("--force", action="store_true", help="re-download existing files")
+    parser.add_argument("--model", action="store_true",
+                        help="also fetch face_landmarker.task for the Python engine")
+    parser.add_argument("--landmarker", action="store_true",
+                        help="also vendor tasks-vision and the model for the page's FaceLandmarker")
+    args = parser.parse_args(argv)
+
+    written = fetch_assets(args.dest, precompress=args.precompress, force=args.force,
+                           landmarker=args.landmarker)
+    if args.model:
+        written += fetch_model(force=args.force)
+    print(f"{len(written)} arquivo(s) baixado(s) em {args.dest}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
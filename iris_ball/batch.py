@@ -0,0 +1,263 @@
+"""Offline blink/gaze analysis of recorded sessions.
+
+    python -m iris_ball.batch recordings/*.mp4 --out results/ --workers 8
+
+Each video is cut into ``--chunk-seconds`` time ranges, which are decoded
+(``av``, seeking to the nearest keyframe) and run through FaceMesh by a
+process pool. Every chunk gets a fresh engine: FaceMesh tracks from frame
+to frame, and the chunks a worker picks up are not contiguous in time, so
+one engine kept across chunks would track into an unrelated frame (and the
+VIDEO-mode graph would see timestamps go backwards). A finished chunk is written
+atomically as ``<out>/<video>.parts/NNNNN.npz`` holding only the landmarks
+the app reads (``landmarks.USED``), so a crashed run resumes where it
+stopped. When all chunks of a video exist, they are streamed in order
+through :func:`iris_ball.gaze.analyze` with the state carried across, and
+the per-frame series (EAR per eye, blinks, gaze, direction, ``bz``, roll)
+are appended to ``<video>.parquet`` row group by row group, or collected
+into ``<video>.npz``. Nothing ever holds a whole video in memory.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from . import gaze
+from .facemesh import FaceMesh
+from .landmarks import USED, expand_used
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional, NPZ output only
+    pa = pq = None
+
+DEFAULT_ENGINE = partial(FaceMesh, max_faces=1)
+CHUNK_SECONDS = 60.0
+
+_make_engine = None
+
+
+def _init_worker(engine):
+    global _make_engine
+    _make_engine = engine
+
+
+def probe(path):
+    """Duration (s) and average frame rate of the first video stream."""
+    import av
+
+    with av.open(str(path)) as container:
+        stream = container.streams.video[0]
+        if stream.duration is not None:
+            duration = float(stream.duration * stream.time_base)
+        else:
+            duration = container.duration / 1e6
+        return duration, float(stream.average_rate or 30)
+
+
+def chunks(duration, chunk_seconds=CHUNK_SECONDS):
+    """``[(t0, t1), ...]`` covering ``[0, duration)``; the last one is open-ended.
+
+    The duration is only an estimate (rounded, or read from the container),
+    so the last chunk takes every frame after its start.
+    """
+    n = max(1, int(np.ceil(duration / chunk_seconds)))
+    return [(i * chunk_seconds, (i + 1) * chunk_seconds if i < n - 1 else np.inf)
+            for i in range(n)]
+
+
+def start_pts(stream):
+    """pts of the stream's first frame; times here are measured from it."""
+    return stream.start_time or 0
+
+
+def decode_range(path, t0, t1, last=False):
+    """Yield ``(t, rgb)`` for frames with ``t0 <= t < t1`` (``<= t1`` if last).
+
+    ``t`` is seconds since the first frame, so streams that do not start at
+    pts 0 (edit lists, MPEG-TS) line up with :func:`chunks`.
+    """
+    import av
+
+    with av.open(str(path)) as container:
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        start = start_pts(stream)
+        if t0 > 0:
+            container.seek(start + int(t0 / stream.time_base), stream=stream, backward=True)
+        for frame in container.decode(stream):
+            if frame.pts is None:
+                continue
+            t = float((frame.pts - start) * stream.time_base)
+            if t < t0:
+                continue
+            if t > t1 or (t == t1 and not last):
+                break
+            yield t, frame.to_ndarray(format="rgb24")
+
+
+def _process_chunk(path, index, t0, t1, last, part):
+    """Worker: landmarks of one time range into ``part`` (written atomically)."""
+    times, lms = [], []
+    with _make_engine() as mesh:                 # tracking starts over with the chunk
+        for t, rgb in decode_range(path, t0, t1, last):
+            faces = mesh.process(rgb, timestamp_ms=t * 1000)
+            times.append(t)
+            lms.append(faces[0, USED] if len(faces) else np.full((len(USED), 3), np.nan,
+                                                                  dtype=np.float32))
+    lms = np.stack(lms) if lms else np.empty((0, len(USED), 3), np.float32)
+    tmp = part.with_name(part.stem + ".tmp.npz")
+    np.savez(tmp, t=np.asarray(times, dtype=np.float64), lms=lms.astype(np.float32))
+    os.replace(tmp, part)
+    return index, len(times)
+
+
+def _columns(t, res, blinks_before):
+    blink = np.zeros(len(t), dtype=bool)
+    blink[res.blink_frames] = True
+    return {
+        "t"        : t,
+        "ear_l"    : res.ear[:, 0],
+        "ear_r"    : res.ear[:, 1],
+        "gaze_x"   : res.gaze[:, 0],
+        "gaze_y"   : res.gaze[:, 1],
+        "direction": res.labels,
+        "roll"     : res.roll,
+        "ball_x"   : res.ball[:, 0],
+        "ball_y"   : res.ball[:, 1],
+        "bz"       : res.ball[:, 2],
+        "blink"    : blink,
+        "blinks"   : blinks_before + np.cumsum(blink),
+    }
+
+
+def analyze_parts(parts, out, fmt, amplify=2.6, smoothing=7, smoother="oneeuro"):
+    """Stream ordered part files through ``gaze.analyze`` into ``out``.
+
+    ``smoother`` and the frame times of each part go to ``gaze.analyze``,
+    so the ball columns follow the same filter as the page.
+    """
+    state, writer, collected = None, None, []
+    tmp = out.with_name(out.name + ".tmp")
+    try:
+        for part in parts:
+            with np.load(part) as z:
+                t, sub = z["t"], z["lms"]
+            if not len(t):
+                continue
+            res = gaze.analyze(expand_used(sub), amplify=amplify, smoothing=smoothing,
+                               state=state, smoother=smoother, t=t)
+            cols = _columns(t, res, state.blinks if state else 0)
+            state = res.state
+            if fmt == "parquet":
+                table = pa.table(cols)
+                writer = writer or pq.ParquetWriter(tmp, table.schema, compression="zstd")
+                writer.write_table(table)
+            else:
+                collected.append(cols)
+        if fmt == "parquet":
+            if writer is None:
+                return 0
+            writer.close()
+            writer = None
+        else:
+            merged = {k: np.concatenate([c[k] for c in collected]) for k in collected[0]} \
+                if collected else {}
+            with open(tmp, "wb") as f:
+                np.savez_compressed(f, **merged)
+        os.replace(tmp, out)
+    finally:
+        if writer is not None:
+            writer.close()
+    return state.blinks if state else 0
+
+
+def run_batch(videos, out_dir, workers=None, chunk_seconds=CHUNK_SECONDS, fmt="parquet",
+              amplify=2.6, smoothing=7, keep_parts=False, engine=DEFAULT_ENGINE, log=print,
+              smoother="oneeuro"):
+    """Analyze every video; returns ``{video: output path}``. Resumable.
+
+    ``engine`` is called once per chunk and must return a FaceMesh-like
+    context manager.
+    """
+    if fmt == "parquet" and pq is None:
+        raise RuntimeError("pyarrow não instalado; use --format npz")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    outputs, jobs = {}, {}
+    for video in map(Path, videos):
+        out = out_dir / f"{video.stem}.{fmt}"
+        outputs[video] = out
+        if out.is_file():
+            log(f"{video.name}: já analisado")
+            continue
+        parts_dir = out_dir / f"{video.stem}.parts"
+        parts_dir.mkdir(exist_ok=True)
+        ranges = chunks(probe(video)[0], chunk_seconds)
+        parts = [parts_dir / f"{i:05d}.npz" for i in range(len(ranges))]
+        todo = [(i, t0, t1) for i, (t0, t1) in enumerate(ranges) if not parts[i].is_file()]
+        log(f"{video.name}: {len(ranges)} blocos, {len(ranges) - len(todo)} do checkpoint")
+        jobs[video] = (out, parts_dir, parts, todo, len(ranges))
+
+    pending = {v: len(j[3]) for v, j in jobs.items()}
+
+    def finish(video):
+        out, parts_dir, parts, _, _ = jobs[video]
+        blinks = analyze_parts(parts, out, fmt, amplify, smoothing, smoother)
+        if not keep_parts:
+            shutil.rmtree(parts_dir)
+        log(f"{video.name}: {blinks} piscadas → {out}")
+
+    for video, n in pending.items():
+        if n == 0:
+            finish(video)
+    if not any(pending.values()):
+        return outputs
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(engine,)) as pool:
+        futures = {}
+        for video, (_, _, parts, todo, total) in jobs.items():
+            for i, t0, t1 in todo:
+                fut = pool.submit(_process_chunk, video, i, t0, t1, i == total - 1, parts[i])
+                futures[fut] = video
+        for fut in as_completed(futures):
+            video = futures[fut]
+            index, frames = fut.result()
+            pending[video] -= 1
+            log(f"{video.name}: bloco {index} ({frames} quadros), faltam {pending[video]}")
+            if pending[video] == 0:
+                finish(video)
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("videos", nargs="+", type=Path)
+    parser.add_argument("--out", type=Path, default=Path("results"))
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--chunk-seconds", type=float, default=CHUNK_SECONDS)
+    parser.add_argument("--format", choices=["parquet", "npz"],
+                        default="parquet" if pq is not None else "npz")
+    parser.add_argument("--amplify", type=float, default=2.6)
+    parser.add_argument("--smoothing", type=int, default=7)
+    parser.add_argument("--smoother", choices=gaze.SMOOTHERS, default="oneeuro",
+                        help="ball filter, as the page's \"Filtro do movimento\"")
+    parser.add_argument("--keep-parts", action="store_true",
+                        help="keep the per-chunk landmark files after analysis")
+    args = parser.parse_args(argv)
+
+    run_batch(args.videos, args.out, workers=args.workers, chunk_seconds=args.chunk_seconds,
+              fmt=args.format, amplify=args.amplify, smoothing=args.smoothing,
+              keep_parts=args.keep_parts, smoother=args.smoother)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Bidirectional Streamlit component wrapping the Iris Ball 3D page.
+
+The frontend is mounted once under a stable ``key``. Later reruns only post
+the new config to the running iframe, so the camera, the inference engine
+and all tracking state survive slider changes.
+
+:func:`live_sink` is a second, zero-height instance that only relays the
+page's live batches (see :mod:`iris_ball.live`); call it inside an
+``st.fragment`` so they rerun that fragment alone. :func:`profile_sink` does
+the same for the stage profiler's summaries.
+"""
+
+import zlib
+from pathlib import Path
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+FRONTEND_DIR = Path(__file__).parent / "frontend"
+
+_component = components.declare_component("iris_ball", path=str(FRONTEND_DIR))
+
+# session_state entry: key of the mounted instance that already has the replay bytes.
+_REPLAY_SENT = "iris_ball_replay_sent"
+# session_state entries: per instance key, the last report {stream, seq} read
+# (the page then stops resending its one-shot results), and (key, results) of
+# the current instance, which keep those results for the app.
+_REPORT_ACK = "iris_ball_report_ack"
+_REPORT_HELD = "iris_ball_report_held"
+REPORT_ONE_SHOT = ("blurBench", "fillBench", "heatmap", "engineBench", "replay")
+
+
+def iris_ball(cfg, assets, pipeline="auto", blur_bench=0, height=640, key="iris_ball",
+              record_ack=None, replay=None, replay_speed="original", heat_export=0, heat_reset=0,
+              capture=(640, 480), fill_bench=0, engine=None, engine_bench=0):
+    """Render (or update) the live page and return its last reported value.
+
+    ``assets`` comes from :func:`iris_ball.assets.asset_config` and
+    ``pipeline`` ("auto", "worker" or "main") picks where the canvases are
+    composited and ``capture`` is the camera resolution asked for.
+    ``engine`` picks the landmark engine (``frontend/engines.js``):
+    ``{"name": "facemesh"}`` (default) or ``"landmarker"`` with optional
+    ``delegate`` ("CPU"/"GPU"), ``wasm`` ("auto"/"simd"/"nosimd"), ``model``
+    (a key of ``assets.LANDMARKER_MODELS``) and ``blendshapes``. They are
+    only read on the first render, when the page boots; the key is derived
+    from them so changing any remounts the page. How large the canvases are
+    drawn is live config (``displayWidth``, ``hidpi``, ``renderScale``).
+    Bumping ``blur_bench`` asks the page to time every blur backend; the
+    results come back under the ``"blurBench"`` key of the returned dict.
+    Bumping ``heat_export`` does the same for the gaze heatmap (``"heatmap"``,
+    read it with :func:`iris_ball.heatmap.from_report`); bumping
+    ``heat_reset`` clears it. Bumping ``fill_bench`` times every layer at each
+    render-scale preset (``"fillBench"``). Bumping ``engine_bench`` records
+    a few seconds of camera and runs both engines over the same frames, with
+    ``engine``'s options for the landmarker (``"engineBench"``: latency per
+    engine and landmark agreement).
+
+    With ``cfg["record"]`` on, the page streams landmark chunks under
+    ``"recording"``; hand them to :func:`iris_ball.recording.receive` and pass
+    its result back as ``record_ack``. ``replay`` (the path of an ``.irb``, or
+    its bytes) boots the page without camera and plays the recording at
+    "original" or "max" ``replay_speed``; the run's timings come back under
+    ``"replay"``. A path is identified by name and mtime, and its bytes are
+    read and sent only when a new instance mounts, not on every rerun.
+
+    The page sends each one-shot result (``REPORT_ONE_SHOT``) once; the
+    returned dict keeps the last of each until the instance is remounted.
+    """
+    engine = engine or {"name": "facemesh"}
+    tag = None
+    if isinstance(replay, (bytes, bytearray)):
+        tag = f"{zlib.crc32(replay):08x}"
+    elif replay is not None:
+        replay = Path(replay)
+        tag = f"{zlib.crc32(str(replay).encode()):08x}-{replay.stat().st_mtime_ns:x}"
+    if tag is not None:
+        key = f"{key}-replay-{tag}-{replay_speed}"
+    # The landmarker's options only matter to the bench while FaceMesh runs.
+    booted = engine if engine["name"] == "landmarker" else {"name": engine["name"]}
+    key += "-" + "-".join(str(booted[k]) for k in sorted(booted))
+    key += f"-{assets['mode']}-{pipeline}-{capture[0]}x{capture[1]}"
+    data = None
+    if tag is not None and st.session_state.get(_REPLAY_SENT) != key:
+        data = replay if isinstance(replay, (bytes, bytearray)) else replay.read_bytes()
+        st.session_state[_REPLAY_SENT] = key
+    acks = st.session_state.setdefault(_REPORT_ACK, {})
+    value = _component(cfg=cfg, assets=assets, pipeline=pipeline, blurBench=blur_bench,
+                       heatExport=heat_export, heatReset=heat_reset, fillBench=fill_bench,
+                       capture=list(capture), engine=engine, engineBench=engine_bench,
+                       recordAck=record_ack, replay=data, replayKey=tag, replaySpeed=replay_speed,
+                       reportAck=acks.get(key), height=height, key=key, default=None)
+    if tag is not None and data is None and value and value.get("replayMissing") == tag:
+        # The iframe was remounted (e.g. the component skipped a run): send the bytes again.
+        st.session_state.pop(_REPLAY_SENT, None)
+        st.rerun()
+    held_key, held = st.session_state.get(_REPORT_HELD, (None, None))
+    if held_key != key:
+        held = {}
+        st.session_state[_REPORT_HELD] = (key, held)
+    if not value:
+        return value
+    acks[key] = {"stream": value.get("stream"), "seq": value.get("seq")}
+    held.update({k: value[k] for k in REPORT_ONE_SHOT if k in value})
+    return {**held, **value}
+
+
+def live_sink(channel, ack=None, key="iris_live"):
+    """Newest live value (``bytes``, parse with :class:`iris_ball.live.LiveFeed`) or None.
+
+    ``channel`` must match ``cfg["liveChannel"]`` of the page; ``ack`` is
+    what ``LiveFeed.ingest`` returned last, so the sink stops resending.
+    """
+    return _component(sink=True, channel=channel, ack=ack, key=f"{key}-{channel}", default=None)
+
+
+def profile_sink(channel, key="iris_profile"):
+    """Newest stage-profiler summary of the page (a dict) or None.
+
+    The page posts one every couple of seconds while ``cfg["profile"]`` is
+    on; like :func:`live_sink`, call it inside an ``st.fragment``.
+    """
+    return _component(sink=True, latest=True, channel=f"{channel}-profile",
+                      key=f"{key}-{channel}", default=None)
@@ -0,0 +1,87 @@
+"""Python FaceMesh engine for the server-side and offline paths.
+
+Wraps whichever API the installed MediaPipe ships: the legacy
+``mp.solutions.face_mesh`` when present, otherwise the Tasks
+``FaceLandmarker`` in VIDEO mode. The Tasks model is fetched by
+``python -m iris_ball.assets --model``. Both return landmarks as
+``(faces, 478, 3)`` float32 arrays, the same normalized x, y, z the browser
+gets.
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .landmarks import N_LANDMARKS
+
+MODEL_DIR = Path(__file__).parent / "models"
+FACE_LANDMARKER_MODEL = MODEL_DIR / "face_landmarker.task"
+
+NO_FACES = np.empty((0, N_LANDMARKS, 3), dtype=np.float32)
+
+
+def _to_array(faces):
+    if not faces:
+        return NO_FACES
+    return np.array([[(p.x, p.y, p.z) for p in face] for face in faces], dtype=np.float32)
+
+
+class FaceMesh:
+    """One FaceMesh graph. Not thread-safe: use one instance per thread.
+
+    ``static=True`` treats every frame as unrelated (no tracking between
+    calls), which is what a graph shared by several streams needs.
+    """
+
+    def __init__(self, max_faces=1, min_detection=0.5, min_tracking=0.5,
+                 model_path=FACE_LANDMARKER_MODEL, static=False):
+        import mediapipe as mp
+
+        self._mp = mp
+        self._last_ts = -1
+        self.static = static
+        if hasattr(mp, "solutions"):
+            self.backend = "solutions"
+            self._graph = mp.solutions.face_mesh.FaceMesh(
+                static_image_mode=static, max_num_faces=max_faces, refine_landmarks=True,
+                min_detection_confidence=min_detection, min_tracking_confidence=min_tracking)
+        else:
+            from mediapipe.tasks.python import BaseOptions, vision
+
+            if not Path(model_path).is_file():
+                raise FileNotFoundError(
+                    f"{model_path} não encontrado; rode `python -m iris_ball.assets --model`")
+            self.backend = "tasks"
+            self._graph = vision.FaceLandmarker.create_from_options(vision.FaceLandmarkerOptions(
+                base_options=BaseOptions(model_asset_path=str(model_path)),
+                running_mode=vision.RunningMode.IMAGE if static else vision.RunningMode.VIDEO,
+                num_faces=max_faces,
+                min_face_detection_confidence=min_detection,
+                min_tracking_confidence=min_tracking))
+
+    def process(self, rgb, timestamp_ms=None):
+        """Landmarks for an RGB uint8 frame; ``(0, 478, 3)`` when no face."""
+        if self.backend == "solutions":
+            res = self._graph.process(rgb)
+            faces = res.multi_face_landmarks or []
+            return _to_array([f.landmark for f in faces])
+
+        image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB,
+                               data=np.ascontiguousarray(rgb))
+        if self.static:
+            return _to_array(self._graph.detect(image).face_landmarks)
+        # VIDEO mode needs strictly increasing timestamps.
+        ts = int(time.monotonic() * 1000) if timestamp_ms is None else int(timestamp_ms)
+        ts = max(ts, self._last_ts + 1)
+        self._last_ts = ts
+        return _to_array(self._graph.detect_for_video(image, ts).face_landmarks)
+
+    def close(self):
+        self._graph.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
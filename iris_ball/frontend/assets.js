@@ -0,0 +1,112 @@
+// ── MediaPipe asset loader ────────────────────────────────────────────────────
+// Fetches camera_utils, face_mesh and the Tasks-Vision files (CDN or the local
+// vendor folder) through a versioned Cache Storage bucket and hands the
+// engines blob: URLs (FaceMesh via locateFile). After the first run the WASM
+// + models come from disk even when offline. Falls back to plain URLs where
+// Cache Storage is unavailable (e.g. http://) or blocked.
+
+// wasm-feature-detect SIMD probe; picks the same binary FaceMesh would load.
+const WASM_SIMD_PROBE = new Uint8Array([0,97,115,109,1,0,0,0,1,5,1,96,0,1,123,3,2,1,0,10,10,1,8,0,65,0,253,15,253,98,11]);
+
+const Assets = {
+  cfg     : null,
+  blobs   : {},          // face_mesh filename → blob: URL
+  source  : "—",         // "cache" | "rede" | "direto", shown in the HUD
+  direct  : false,       // skip Cache Storage, load plain URLs
+
+  // `type` overrides the blob's MIME type (module imports insist on one).
+  async cachedBlobUrl(url, type) {
+    const cache = await caches.open(this.cfg.cacheName);
+    let resp = await cache.match(url);
+    if (resp) {
+      if (this.source === "—") this.source = "cache";
+    } else {
+      resp = await fetch(url, { mode:"cors", credentials:"omit" });
+      if (!resp.ok) throw new Error(`${resp.status} ${url}`);
+      await cache.put(url, resp.clone());
+      this.source = "rede";
+    }
+    const blob = await resp.blob();
+    return URL.createObjectURL(type ? new Blob([blob], { type }) : blob);
+  },
+
+  // blob: URL of `url` through the cache, or `url` itself when loading directly.
+  async url(url, type) {
+    if (!this.direct) {
+      try {
+        return await this.cachedBlobUrl(url, type);
+      } catch (err) {
+        // Cache Storage can be blocked (sandboxed/opaque origins); load directly.
+        console.warn("asset cache indisponível:", err);
+        this.direct = true;
+      }
+    }
+    this.source = "direto";
+    return url;
+  },
+
+  loadScript(src) {
+    return new Promise((resolve, reject)=>{
+      const s = document.createElement("script");
+      s.src = src; s.crossOrigin = "anonymous";
+      s.onload = resolve;
+      s.onerror = ()=>reject(new Error(`falha ao carregar ${src}`));
+      document.head.appendChild(s);
+    });
+  },
+
+  wanted(files) {
+    const simd = WebAssembly.validate(WASM_SIMD_PROBE);
+    return files.filter(f => !/_wasm_bin\./.test(f) || f.includes("_simd_") === simd);
+  },
+
+  abs(path, base) {
+    return new URL(path, base ? new URL(base + "/", document.baseURI) : document.baseURI).href;
+  },
+
+  // Buckets of older pinned versions are never read again; drop them.
+  async prune() {
+    const prefix = this.cfg.cacheName.replace(/-\d.*$/, "-");
+    for (const name of await caches.keys()) {
+      if (name.startsWith(prefix) && name !== this.cfg.cacheName) await caches.delete(name);
+    }
+  },
+
+  // camera_utils only; each engine loads its own files (createEngine).
+  async load(cfg) {
+    this.cfg = cfg;
+    this.direct = !("caches" in window);
+    if (!this.direct) this.prune().catch(err=>console.warn("asset cache indisponível:", err));
+    if (typeof Camera === "undefined") await this.loadScript(await this.url(this.abs(cfg.cameraUtils)));
+  },
+
+  async faceMesh() {
+    if (typeof FaceMesh !== "undefined") return;
+    const files = this.wanted(this.cfg.faceMeshFiles);
+    const urls = await Promise.all(files.map(f => this.url(this.abs(f, this.cfg.faceMeshBase))));
+    files.forEach((f,i)=>{ if (urls[i].startsWith("blob:")) this.blobs[f] = urls[i]; });
+    await this.loadScript(this.locateFile("face_mesh.js"));
+  },
+
+  locateFile(f) {
+    return this.blobs[f] || this.abs(f, this.cfg.faceMeshBase);
+  },
+
+  // Tasks-Vision for FaceLandmarker: the bundle (an ES module), the fileset
+  // for the WASM build `wasm` picks ("auto" probes SIMD like FaceMesh does,
+  // "simd"/"nosimd" force one) and the URL of the `model` variant.
+  async landmarker(wasm, model) {
+    const cfg = this.cfg;
+    const simd = wasm === "simd" || (wasm !== "nosimd" && WebAssembly.validate(WASM_SIMD_PROBE));
+    const stem = `wasm/vision_wasm${simd ? "" : "_nosimd"}_internal`;
+    if (!(model in cfg.landmarkerModels)) throw new Error(`modelo desconhecido: ${model}`);
+    const [bundle, loader, binary, modelPath] = await Promise.all([
+      this.url(this.abs("vision_bundle.mjs", cfg.tasksBase), "text/javascript"),
+      this.url(this.abs(`${stem}.js`, cfg.tasksBase)),
+      this.url(this.abs(`${stem}.wasm`, cfg.tasksBase)),
+      this.url(this.abs(cfg.landmarkerModels[model])),
+    ]);
+    const vision = await import(bundle);
+    return { vision, simd, modelPath, fileset:{ wasmLoaderPath:loader, wasmBinaryPath:binary } };
+  },
+};
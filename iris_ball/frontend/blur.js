@@ -0,0 +1,122 @@
+// ── DOF blur backends ─────────────────────────────────────────────────────────
+// Each backend paints a blurred copy of `src` into `ctx` (w×h). "taps" is the
+// original 9-blit stack; "filter" is one native ctx.filter pass; the pyramids
+// shrink the frame to ½ or ¼, blur there and let the bilinear upscale finish
+// the job, which cuts fill cost by 4× / 16×.
+
+// Checked on whichever 2D context exists here (the render worker has no DOM).
+const CTX2D_PROTO = typeof CanvasRenderingContext2D !== "undefined"
+  ? CanvasRenderingContext2D.prototype
+  : typeof OffscreenCanvasRenderingContext2D !== "undefined"
+    ? OffscreenCanvasRenderingContext2D.prototype : {};
+const HAS_CTX_FILTER = "filter" in CTX2D_PROTO;
+
+// The tap stack leaves the layer ~92% opaque; the other backends match that.
+const BLUR_COVER = 0.92;
+
+function blurTaps(ctx, src, w, h, blurPx) {
+  ctx.globalAlpha = 0.18;
+  for (let i=0;i<8;i++) {
+    const angle = (i/8)*Math.PI*2;
+    ctx.drawImage(src, Math.cos(angle)*blurPx*0.5, Math.sin(angle)*blurPx*0.5, w, h);
+  }
+  ctx.globalAlpha = 0.55;
+  ctx.drawImage(src, 0, 0, w, h);
+  ctx.globalAlpha = 1;
+}
+
+function blurFilter(ctx, src, w, h, blurPx) {
+  ctx.filter = `blur(${(blurPx*0.4).toFixed(1)}px)`;
+  ctx.globalAlpha = BLUR_COVER;
+  ctx.drawImage(src, 0, 0, w, h);
+  ctx.filter = "none";
+  ctx.globalAlpha = 1;
+}
+
+// Scratch canvases for the pyramid, reallocated only when the size changes.
+const pyr = { down:null, blur:null, w:0, h:0 };
+
+function blurPyramid(factor) {
+  return (ctx, src, w, h, blurPx) => {
+    const sw = Math.max(1, Math.round(w/factor)), sh = Math.max(1, Math.round(h/factor));
+    if (pyr.w !== sw || pyr.h !== sh) {
+      pyr.down = makeCanvas(sw, sh); pyr.blur = makeCanvas(sw, sh);
+      pyr.w = sw; pyr.h = sh;
+    }
+    const cd = pyr.down.getContext("2d"), cb = pyr.blur.getContext("2d");
+    cd.drawImage(src, 0, 0, sw, sh);
+    cb.clearRect(0, 0, sw, sh);
+    // The upscale already spreads each texel over `factor` px, so blur less.
+    const small = Math.max(0, blurPx/factor - 0.5);
+    if (HAS_CTX_FILTER) blurFilter(cb, pyr.down, sw, sh, small);
+    else                blurTaps(cb, pyr.down, sw, sh, small);
+    ctx.imageSmoothingEnabled = true;
+    ctx.imageSmoothingQuality = "low";
+    ctx.globalAlpha = HAS_CTX_FILTER ? 1 : BLUR_COVER;
+    ctx.drawImage(pyr.blur, 0, 0, w, h);
+    ctx.globalAlpha = 1;
+  };
+}
+
+const BLUR_BACKENDS = {
+  taps      : blurTaps,
+  filter    : blurFilter,
+  pyramid2  : blurPyramid(2),
+  pyramid4  : blurPyramid(4),
+};
+
+function resolveBlurBackend(name) {
+  if (name === "filter" && !HAS_CTX_FILTER) return "pyramid2";
+  if (name in BLUR_BACKENDS) return name;
+  return HAS_CTX_FILTER ? "filter" : "pyramid4";   // "auto"
+}
+
+// Vignette is identical every frame: render once per size.
+function vignetteSprite(w, h) {
+  return Sprites.get(`v${w}x${h}`, w, h, ctx=>{
+    const vig = ctx.createRadialGradient(w/2,h/2,h*0.2, w/2,h/2,h*0.85);
+    vig.addColorStop(0, "rgba(0,0,0,0)");
+    vig.addColorStop(1, "rgba(0,0,10,0.72)");
+    ctx.fillStyle = vig;
+    ctx.fillRect(0,0,w,h);
+  });
+}
+
+// ── Blur cost tracking / comparison ──────────────────────────────────────────
+// Times are CPU-side submit cost from performance.now(); GPU work that the
+// browser defers is not included, so compare backends on the same machine.
+const BlurStats = {
+  ema     : {},           // backend → smoothed ms per frame
+  bench   : null,         // {queue, current, samples, warm, results}
+
+  record(name, ms) {
+    const prev = this.ema[name];
+    this.ema[name] = prev === undefined ? ms : prev + (ms-prev)*0.1;
+    if (this.bench && this.bench.current === name) this.benchSample(ms);
+  },
+
+  // Cycle every backend for `frames` frames and hand the summary to `done`.
+  startBench(frames, done) {
+    const queue = Object.keys(BLUR_BACKENDS).filter(n => n !== "filter" || HAS_CTX_FILTER);
+    this.bench = { queue, frames, done, current:queue.shift(), samples:[], warm:10, results:{} };
+  },
+
+  benchSample(ms) {
+    const b = this.bench;
+    if (b.warm > 0) { b.warm--; return; }
+    b.samples.push(ms);
+    if (b.samples.length < b.frames) return;
+    const sorted = b.samples.slice().sort((x,y)=>x-y);
+    b.results[b.current] = {
+      mean : sorted.reduce((a,v)=>a+v, 0)/sorted.length,
+      p50  : sorted[Math.floor(sorted.length*0.5)],
+      p95  : sorted[Math.floor(sorted.length*0.95)],
+    };
+    b.current = b.queue.shift();
+    b.samples = []; b.warm = 10;
+    if (!b.current) { this.bench = null; b.done(b.results); }
+  },
+
+  // Backend the bench wants this frame, or null when idle.
+  override() { return this.bench ? this.bench.current : null; },
+};
@@ -0,0 +1,996 @@
+// ── Iris Ball core ────────────────────────────────────────────────────────────
+// Everything that turns landmarks into pixels: config, tracking state, the
+// inference-stage math and the layered renderer. It never touches the DOM,
+// so the same file runs on the page (main-thread fallback) and inside
+// render_worker.js against transferred OffscreenCanvases. The host wires
+// itself in through the Host hooks and initLayers().
+//
+// Landmarks arrive packed: a Float32Array of normalized x,y,z (stride 3).
+
+// ── Config ────────────────────────────────────────────────────────────────────
+// Defaults mirror the sidebar; Python pushes updates through applyConfig().
+const CFG = {
+  ballRadius  : 52,
+  smoothing   : 7,
+  smoother    : "oneeuro",     // "oneeuro" | "lerp"
+  amplify     : 2.6,
+  popEffect   : 35,
+  blurAmount  : 9,
+  blurBackend : "auto",
+  ballColor   : "#2277ff",
+  blinkBoost  : 0.6,
+  orientColor : true,
+  trailOn     : true,
+  shockOn     : true,
+  showMesh    : true,
+  showIris    : true,
+  showShadow  : true,
+  showGlow    : true,
+  adaptive    : true,
+  targetFps   : 24,
+  roiTracking : false,
+  roiSize     : 192,
+  motionGate  : false,
+  motionThresh: 2.5,
+  maxSkip     : 2,
+  record      : false,
+  profile     : false,
+  particleStress: 0,
+  maxFaces    : 1,
+  live        : false,         // stream frames to Python (live.js)
+  liveLandmarks: false,
+  liveChannel : "",
+  heatmap     : false,         // gaze heatmap layer (heatmap.js)
+  heatHalfLife: 0,             // s, 0 = keep everything
+  displayWidth: 640,           // CSS px, 0 = frame width (layers.js)
+  hidpi       : true,          // backing stores × devicePixelRatio
+  renderScale : "balanced",    // RENDER_PRESETS key
+};
+
+// ── Landmark indices ──────────────────────────────────────────────────────────
+const LEFT_IRIS   = [474,475,476,477];
+const RIGHT_IRIS  = [469,470,471,472];
+const FACE_OVAL   = [10,338,297,332,284,251,389,356,454,323,361,288,397,365,
+                     379,378,400,377,152,148,176,149,150,136,172,58,132,93,
+                     234,127,162,21,54,103,67,109];
+const LEFT_EYE    = [362,382,381,380,374,373,390,249,263,466,388,387,386,385,384,398];
+const RIGHT_EYE   = [33,7,163,144,145,153,154,155,133,173,157,158,159,160,161,246];
+
+// EAR points: [p1-top, p2-top, p3-bot, p4-bot, p5-left, p6-right] (6-point standard)
+// Using MediaPipe indices for left eye vertical/horizontal
+const L_EAR_PTS = [386, 374, 387, 373, 362, 263]; // top1,bot1,top2,bot2,left,right
+const R_EAR_PTS = [159, 145, 160, 144, 33,  133];
+
+// ── Canvas ────────────────────────────────────────────────────────────────────
+// W×H is the scene: draw calls use it whatever each layer's backing size is
+// (see layers.js).
+let W=640, H=480;
+let cVideo=null, ctxV=null, ctxBl=null, ctxH=null, ctxB=null;
+let cFrame=null, ctxF=null;      // mirrored copy of the newest camera frame, video backing size
+
+function initLayers(video, blur, heat, ball, w, h) {
+  W = w; H = h;
+  Layers.init([video, blur, heat, ball]);
+  cVideo = video;
+  ctxV   = Layers.video.ctx;
+  ctxBl  = Layers.blur.ctx;
+  ctxH   = Layers.heat.ctx;
+  ctxB   = Layers.ball.ctx;
+  cFrame = makeCanvas(W, H);
+  ctxF   = cFrame.getContext("2d");
+  resizeLayers(W, H, 1);
+  Faces.id.fill(0);
+  resetFace(0);
+}
+
+// Display size (CSS px) and pixel ratio changed, or the preset did. The
+// camera copy follows the video layer so drawing it is a 1:1 blit.
+function resizeLayers(cssW, cssH, dpr) {
+  Layers.resize(cssW, cssH, dpr);
+  const v = Layers.video.canvas;
+  if (cFrame.width !== v.width || cFrame.height !== v.height) {
+    const old = cFrame;
+    cFrame = makeCanvas(v.width, v.height);
+    ctxF   = cFrame.getContext("2d");
+    ctxF.drawImage(old, 0, 0, v.width, v.height);
+  }
+  Heat.shown = false;                     // resizing cleared the layer
+}
+
+// ── Host hooks ────────────────────────────────────────────────────────────────
+// Overridden by the page or the worker; the core only calls them.
+const Host = {
+  badge    : (text, color)=>{},   // show the reaction badge
+  badgeOff : ()=>{},              // fade it out
+  hud      : snap=>{},            // every HUD_MS with hudSnapshot()
+  profile  : summary=>{},         // every PROF_REPORT_MS with Prof.summary() when profiling
+};
+
+// ── State ─────────────────────────────────────────────────────────────────────
+let renderN=0, lastFT=performance.now(), fps=0;
+const pred = {x:W/2, y:H/2, z:0};
+
+// Per-face state: one slot per tracked face, each field an array indexed by
+// slot. A slot keeps its id while its face is matched frame to frame; in
+// multi-face mode it is released after FACE_HOLD inference frames without a
+// match. With maxFaces 1, slot 0 is never released, as the single ball was.
+const MAX_FACES  = 4;
+const FACE_MATCH = 0.12;         // max centroid jump (normalized) for the same face
+const FACE_HOLD  = 15;           // inference frames a lost face keeps its ball
+const f64 = ()=>new Float64Array(MAX_FACES);
+const Faces = {
+  id      : new Int32Array(MAX_FACES),       // 0 = free slot
+  lms     : new Array(MAX_FACES).fill(null), // newest packed landmarks, null while lost
+  lost    : new Int32Array(MAX_FACES),       // inference frames since last match
+  cx : f64(), cy : f64(),                    // iris midpoint, for matching
+  bx : f64(), by : f64(), bz : f64(), prevBx : f64(), prevBy : f64(),
+  earL : f64(), earR : f64(), roll : f64(),
+  blinks   : new Int32Array(MAX_FACES),
+  cooldown : new Int32Array(MAX_FACES),      // inference frames until next blink can register
+  scale    : f64(), scaleV : f64(),          // blink pulse spring
+  // One Euro state, EU_CH channels per face: value, derivative (units/s)
+  eu : new Float64Array(MAX_FACES*4), euD : new Float64Array(MAX_FACES*4),
+  euT : f64(),                               // capture time of the last sample
+  euOn : new Uint8Array(MAX_FACES),
+  // Two newest ball targets
+  tPrev : f64(), xPrev : f64(), yPrev : f64(), zPrev : f64(),
+  tLast : f64(), xLast : f64(), yLast : f64(), zLast : f64(),
+  color  : new Array(MAX_FACES).fill(CFG.ballColor),
+  target : new Array(MAX_FACES).fill(CFG.ballColor),
+  dir    : new Array(MAX_FACES).fill("center"),
+  taken  : new Uint8Array(MAX_FACES),        // matching scratch
+  nextId : 1,
+};
+const NO_FACES = [];
+
+// Render loop timing
+const SIM_DT  = 1000/30;           // per-frame constants were tuned at ~30 Hz
+const HUD_MS  = 200;               // HUD snapshots (DOM writes) at 5 Hz
+let simAcc=0, lastRender=performance.now(), lastHud=0, renderMsEma=0;
+const fillMs = { video:0, blur:0, heat:0, ball:0 };   // this frame, per layer
+
+// Blink state
+const EAR_THRESH = 0.18;     // below this = eye closed
+const BLINK_SCORE_THRESH = 0.45;   // blendshape eyeBlink score at EAR_THRESH
+
+// One Euro smoothing (gaze.py one_euro): per-face nx, ny, bz and roll.
+// Min cutoff is ONE_EURO_HZ/smoothing Hz; values from bench_smoothing.py.
+const ONE_EURO_HZ      = 7;
+const ONE_EURO_BETA    = 3;
+const ONE_EURO_DCUTOFF = 1;
+const EU_CH            = 4;
+const PRED_GAIN        = 0.5;  // share of the capture age covered by extrapolation
+const PRED_MAX_MS      = 60;
+
+// Particle state (particles.js); capacity leaves room for the stress mode
+const TRAIL_MAX  = 22;
+const SHOCK_CAP  = 1024;
+const TRAIL_CAP  = 8192;
+const shocks = makeParticles(SHOCK_CAP);
+const trail  = makeParticles(TRAIL_CAP);
+
+// Badge timer
+let badgeTimer = 0;
+
+// Input-to-photon: epoch ms when the newest frame was captured, and the
+// capture time of the frame drawn by the previous render (presented by now).
+let frameTIn = 0, drawnTIn = 0, shownTIn = 0;
+const LAT_N   = 256;
+const latency = new Float32Array(LAT_N);
+let latN = 0, latI = 0;
+const epochNow = ()=>performance.timeOrigin + performance.now();
+
+// ── Helpers ───────────────────────────────────────────────────────────────────
+// Pixel distance between landmarks i and j of packed array P.
+function lmDist(P, i, j) {
+  const dx=(P[3*i]-P[3*j])*W, dy=(P[3*i+1]-P[3*j+1])*H;
+  return Math.sqrt(dx*dx+dy*dy);
+}
+
+// Memoized: the same few colours are parsed many times per frame.
+// Returned objects are shared, so callers must not mutate them.
+const rgbMemo = new Map();
+function hexRgb(h) {
+  let c = rgbMemo.get(h);
+  if (!c) {
+    c = { r:parseInt(h.slice(1,3),16), g:parseInt(h.slice(3,5),16), b:parseInt(h.slice(5,7),16) };
+    if (rgbMemo.size > 1024) rgbMemo.clear();
+    rgbMemo.set(h, c);
+  }
+  return c;
+}
+
+function rgbHex(r,g,b) {
+  return "#"+[r,g,b].map(v=>Math.max(0,Math.min(255,Math.round(v))).toString(16).padStart(2,"0")).join("");
+}
+
+function lerpColor(a, b, t) {
+  const ca=hexRgb(a), cb=hexRgb(b);
+  return rgbHex(ca.r+(cb.r-ca.r)*t, ca.g+(cb.g-ca.g)*t, ca.b+(cb.b-ca.b)*t);
+}
+
+// ── EAR calculation ───────────────────────────────────────────────────────────
+// EAR = (||p2-p6|| + ||p3-p5||) / (2 * ||p1-p4||)  (6-point Soukupova formula)
+function calcEAR(P, pts) {
+  const top1 = lmDist(P, pts[0], pts[1]);
+  const top2 = lmDist(P, pts[2], pts[3]);
+  const horiz= lmDist(P, pts[4], pts[5]);
+  return (top1+top2) / (2*horiz + 1e-6);
+}
+
+// FaceLandmarker blendshape eyeBlink score (0 open … 1 shut) on the EAR
+// scale, so the threshold, the HUD bars and the live records keep their
+// meaning: BLINK_SCORE_THRESH lands on EAR_THRESH, an open eye near 0.33.
+function blinkEar(score) {
+  return EAR_THRESH*(1-score)/(1-BLINK_SCORE_THRESH);
+}
+
+// ── Badge flash ───────────────────────────────────────────────────────────────
+function showBadge(text, color="#4488ff") {
+  Host.badge(text, color);
+  badgeTimer = 45;
+}
+
+// ── Direction color mapping ───────────────────────────────────────────────────
+const DIR_COLORS = {
+  left   : "#ff4422",
+  right  : "#2288ff",
+  up     : "#ffdd00",
+  down   : "#00dd66",
+  center : CFG.ballColor,
+};
+
+function getGazeDir(nx, ny) {
+  const absX = Math.abs(nx), absY = Math.abs(ny);
+  if (absX < 0.25 && absY < 0.25) return "center";
+  if (absX > absY) return nx < 0 ? "left" : "right";
+  return ny < 0 ? "up" : "down";
+}
+
+// ── Shockwave ─────────────────────────────────────────────────────────────────
+function spawnShock(x,y,color) {
+  if (!CFG.shockOn) return;
+  shocks.spawn(x, y, 0, CFG.ballRadius*3.5, 0.9, hexRgb(color));
+}
+
+function updateShocks() {
+  shocks.retire(0.01);
+  const {r, maxR, alpha} = shocks;
+  for (let i=0;i<shocks.n;i++) {
+    r[i]     += (maxR[i] - r[i]) * 0.12;
+    alpha[i] *= 0.84;
+  }
+}
+
+// Stroke/shadow style strings per packed RGB, so drawing builds none.
+const shockStyleMemo = new Map();
+function shockStyle(cr, cg, cb) {
+  const key = (cr<<16) | (cg<<8) | cb;
+  let st = shockStyleMemo.get(key);
+  if (!st) {
+    st = { stroke:`rgb(${cr},${cg},${cb})`, shadow:`rgba(${cr},${cg},${cb},0.8)` };
+    if (shockStyleMemo.size > 1024) shockStyleMemo.clear();
+    shockStyleMemo.set(key, st);
+  }
+  return st;
+}
+
+function drawShocks() {
+  if (!shocks.n) return;
+  const {x, y, r, alpha, rgb} = shocks;
+  ctxB.save();
+  ctxB.shadowBlur = 18;
+  for (let i=0;i<shocks.n;i++) {
+    const st = shockStyle(rgb[3*i], rgb[3*i+1], rgb[3*i+2]);
+    ctxB.globalAlpha = alpha[i];
+    ctxB.beginPath();
+    ctxB.arc(x[i], y[i], r[i], 0, Math.PI*2);
+    ctxB.strokeStyle = st.stroke;
+    ctxB.lineWidth   = 3.5 * alpha[i];
+    ctxB.shadowColor = st.shadow;
+    ctxB.stroke();
+  }
+  ctxB.restore();
+}
+
+// ── Trail ─────────────────────────────────────────────────────────────────────
+function spawnTrail(x,y,r,color) {
+  if (!CFG.trailOn || !Governor.q.trail) return;
+  trail.spawn(x, y, r*0.65, 0, 0.55, hexRgb(color));
+}
+
+// After this step's spawns: cap the length (TRAIL_MAX per ball) and age.
+function updateTrail(balls) {
+  const max = TRAIL_MAX*balls + CFG.particleStress;
+  if (trail.n > max) trail.dropOldest(trail.n - max);
+  ageTrail();
+}
+
+function ageTrail() {
+  const {r, alpha} = trail;
+  for (let i=0;i<trail.n;i++) { alpha[i] *= 0.80; r[i] *= 0.94; }
+  trail.retire(0.03);
+}
+
+// Unit trail dot, drawn scaled to each particle's radius.
+const TRAIL_SPRITE_R = 64;
+function trailSprite(r, g, b) {
+  const cr = quantCh(r), cg = quantCh(g), cb = quantCh(b);
+  const R = TRAIL_SPRITE_R;
+  return Sprites.get(`t${cr},${cg},${cb}`, 2*R, 2*R, ctx=>{
+    const g = ctx.createRadialGradient(R,R,0, R,R,R);
+    g.addColorStop(0,   `rgba(${cr},${cg},${cb},0.8)`);
+    g.addColorStop(0.5, `rgba(${cr},${cg},${cb},0.3)`);
+    g.addColorStop(1,   `rgba(${cr},${cg},${cb},0)`);
+    ctx.fillStyle = g;
+    ctx.fillRect(0,0,2*R,2*R);
+  });
+}
+
+// Neighbouring dots usually share a colour, so the sprite lookup (and its
+// key string) is only redone when the packed RGB changes.
+function drawTrail() {
+  if (!CFG.trailOn || !Governor.q.trail) return;
+  const {x, y, r, alpha, rgb} = trail;
+  let key = -1, sprite = null;
+  for (let i=0;i<trail.n;i++) {
+    const k = (rgb[3*i]<<16) | (rgb[3*i+1]<<8) | rgb[3*i+2];
+    if (k !== key) { key = k; sprite = trailSprite(rgb[3*i], rgb[3*i+1], rgb[3*i+2]); }
+    ctxB.globalAlpha = alpha[i];
+    ctxB.drawImage(sprite, x[i]-r[i], y[i]-r[i], 2*r[i], 2*r[i]);
+  }
+  ctxB.globalAlpha = 1;
+}
+
+// ── Particle stress mode ──────────────────────────────────────────────────────
+// Keeps CFG.particleStress extra trail dots (and 1/16 as many shockwaves)
+// alive at random spots, to check that frame times stay flat.
+const STRESS_COLORS = ["#ff4422", "#2288ff", "#ffdd00", "#00dd66"];
+function spawnStress() {
+  if (!CFG.particleStress) return;
+  const nTrail = Math.min(CFG.particleStress, TRAIL_CAP);
+  const nShock = Math.min(CFG.particleStress >> 4, SHOCK_CAP);
+  let k = 0;
+  while (trail.n < nTrail) {
+    const c = hexRgb(STRESS_COLORS[k++ & 3]);
+    trail.spawn(Math.random()*W, Math.random()*H, 4 + Math.random()*20, 0,
+                0.2 + Math.random()*0.35, c);
+  }
+  while (shocks.n < nShock) {
+    const c = hexRgb(STRESS_COLORS[k++ & 3]);
+    shocks.spawn(Math.random()*W, Math.random()*H, 0, 40 + Math.random()*140, 0.9, c);
+  }
+}
+
+// ── Ground shadow ─────────────────────────────────────────────────────────────
+function drawGroundShadow(cx,cy,r,z) {
+  if (!CFG.showShadow) return;
+  const sy = cy + r*0.9 + z*18;
+  const sx = cx + r*0.15;
+  const alpha = 0.45 - z*0.3;
+  if (alpha<=0) return;
+  ctxV.save();
+  ctxV.globalAlpha = alpha;
+  const grad = ctxV.createRadialGradient(sx,sy,0, sx,sy,r*1.3);
+  grad.addColorStop(0,   "rgba(0,0,0,0.9)");
+  grad.addColorStop(0.5, "rgba(0,0,0,0.35)");
+  grad.addColorStop(1,   "rgba(0,0,0,0)");
+  ctxV.scale(1, 0.25);
+  ctxV.beginPath();
+  ctxV.arc(sx, sy*4, r*1.3, 0, Math.PI*2);
+  ctxV.fillStyle = grad;
+  ctxV.fill();
+  ctxV.restore();
+}
+
+// ── DOF blur ──────────────────────────────────────────────────────────────────
+// The governor may force a cheaper backend than the one picked in the sidebar.
+function activeBlurBackend() {
+  return resolveBlurBackend(Governor.q.blur || CFG.blurBackend);
+}
+
+// The blur layer draws in its own backing pixels (identity transform), so
+// the radius is scaled to them.
+function drawBlurredBg(blurPx) {
+  const L = Layers.blur, bw = L.canvas.width, bh = L.canvas.height;
+  ctxBl.clearRect(0,0,bw,bh);
+  const benchName = BlurStats.override();
+  if (benchName) blurPx = Math.max(blurPx, 4);   // keep sampling while benchmarking
+  if (blurPx<=0) return;
+  const name = benchName || activeBlurBackend();
+  const t0 = performance.now();
+  BLUR_BACKENDS[name](ctxBl, cVideo, bw, bh, blurPx*L.k);
+  ctxBl.drawImage(vignetteSprite(bw, bh), 0, 0);
+  BlurStats.record(name, performance.now()-t0);
+}
+
+// ── Glow ─────────────────────────────────────────────────────────────────────
+// The glow's shape only depends on z (inner/outer radius ratio and alpha), so
+// one normalized sprite per (colour, z bucket) is scaled to the live radius.
+const GLOW_SPRITE_R = 128;
+function glowSprite(col, z) {
+  const {r:cr,g:cg,b:cb} = quantRgb(hexRgb(col));
+  const zq = Math.round(z*20)/20;
+  const R  = GLOW_SPRITE_R;
+  return Sprites.get(`g${cr},${cg},${cb},${zq}`, 2*R, 2*R, ctx=>{
+    const alpha = 0.22+zq*0.18;
+    const inner = R * 0.5/(2.2+zq*1.4);
+    const g1 = ctx.createRadialGradient(R,R,inner, R,R,R);
+    g1.addColorStop(0,   `rgba(${cr},${cg},${cb},${alpha.toFixed(2)})`);
+    g1.addColorStop(0.4, `rgba(${cr},${cg},${cb},${(alpha*0.4).toFixed(2)})`);
+    g1.addColorStop(1,   `rgba(${cr},${cg},${cb},0)`);
+    ctx.beginPath(); ctx.arc(R,R,R,0,Math.PI*2);
+    ctx.fillStyle = g1; ctx.fill();
+  });
+}
+
+function drawGlow(cx,cy,r,col,z) {
+  if (!CFG.showGlow || !Governor.q.glow) return;
+  const glowR = r*(2.2+z*1.4);
+  ctxB.drawImage(glowSprite(col, z), cx-glowR, cy-glowR, 2*glowR, 2*glowR);
+}
+
+// ── 3D Phong Sphere ───────────────────────────────────────────────────────────
+// Paints the unrotated shaded ball centred at (cx,cy); only used to fill sprites.
+function paintSphere(ctx,cx,cy,r,cr,cg,cb) {
+  // Ambient base
+  ctx.beginPath(); ctx.arc(cx,cy,r,0,Math.PI*2);
+  ctx.fillStyle=`rgb(${Math.max(0,cr-100)},${Math.max(0,cg-100)},${Math.max(0,cb-100)})`;
+  ctx.fill();
+
+  // Diffuse
+  const lx=cx-r*0.55, ly=cy-r*0.55;
+  const diff = ctx.createRadialGradient(lx,ly,r*0.01, cx,cy,r*1.05);
+  diff.addColorStop(0,   `rgb(${Math.min(255,cr+55)},${Math.min(255,cg+55)},${Math.min(255,cb+55)})`);
+  diff.addColorStop(0.45,`rgb(${cr},${cg},${cb})`);
+  diff.addColorStop(0.75,`rgb(${Math.max(0,cr-60)},${Math.max(0,cg-60)},${Math.max(0,cb-60)})`);
+  diff.addColorStop(1,   `rgb(${Math.max(0,cr-110)},${Math.max(0,cg-110)},${Math.max(0,cb-110)})`);
+  ctx.beginPath(); ctx.arc(cx,cy,r,0,Math.PI*2);
+  ctx.fillStyle=diff; ctx.fill();
+
+  // Rim
+  const rim = ctx.createRadialGradient(cx+r*0.4,cy+r*0.4,r*0.3, cx,cy,r*1.02);
+  rim.addColorStop(0,   "rgba(0,0,0,0)");
+  rim.addColorStop(0.7, "rgba(0,0,0,0)");
+  rim.addColorStop(0.88,`rgba(${Math.max(0,cr-30)},${Math.max(0,cg-10)},${Math.min(255,cb+80)},0.55)`);
+  rim.addColorStop(1,   "rgba(0,0,0,0)");
+  ctx.beginPath(); ctx.arc(cx,cy,r,0,Math.PI*2);
+  ctx.fillStyle=rim; ctx.fill();
+
+  // Fresnel
+  ctx.beginPath(); ctx.arc(cx,cy,r,0,Math.PI*2);
+  ctx.strokeStyle="rgba(200,220,255,0.35)";
+  ctx.lineWidth=r*0.045; ctx.stroke();
+
+  // Clip for highlights
+  ctx.save();
+  ctx.beginPath(); ctx.arc(cx,cy,r,0,Math.PI*2); ctx.clip();
+
+  // Primary specular
+  const sx1=lx+r*0.06, sy1=ly+r*0.06;
+  const sg1=ctx.createRadialGradient(sx1,sy1,0, sx1,sy1,r*0.42);
+  sg1.addColorStop(0,   "rgba(255,255,255,0.98)");
+  sg1.addColorStop(0.18,"rgba(255,255,255,0.72)");
+  sg1.addColorStop(0.45,"rgba(255,255,255,0.18)");
+  sg1.addColorStop(1,   "rgba(255,255,255,0)");
+  ctx.beginPath(); ctx.arc(sx1,sy1,r*0.42,0,Math.PI*2);
+  ctx.fillStyle=sg1; ctx.fill();
+
+  // Soft specular
+  const sg2=ctx.createRadialGradient(lx+r*0.1,ly+r*0.1,0, lx,ly,r*0.75);
+  sg2.addColorStop(0, "rgba(255,255,255,0.35)");
+  sg2.addColorStop(0.5,"rgba(255,255,255,0.08)");
+  sg2.addColorStop(1,  "rgba(255,255,255,0)");
+  ctx.beginPath(); ctx.arc(lx,ly,r*0.75,0,Math.PI*2);
+  ctx.fillStyle=sg2; ctx.fill();
+
+  // Tack highlight
+  const tg=ctx.createRadialGradient(lx+r*0.02,ly+r*0.02,0, lx+r*0.02,ly+r*0.02,r*0.12);
+  tg.addColorStop(0,"rgba(255,255,255,1)");
+  tg.addColorStop(0.4,"rgba(255,255,255,0.6)");
+  tg.addColorStop(1,"rgba(255,255,255,0)");
+  ctx.beginPath(); ctx.arc(lx+r*0.02,ly+r*0.02,r*0.12,0,Math.PI*2);
+  ctx.fillStyle=tg; ctx.fill();
+
+  ctx.restore(); // clip restore
+}
+
+// Sprite is square with the ball centred; the pad leaves room for the
+// Fresnel stroke that straddles the edge.
+function sphereSprite(rq, col) {
+  const {r:cr,g:cg,b:cb} = quantRgb(hexRgb(col));
+  const c = rq + Math.ceil(rq*0.03) + 2;
+  return Sprites.get(`s${rq},${cr},${cg},${cb}`, 2*c, 2*c,
+                     ctx=>paintSphere(ctx, c, c, rq, cr, cg, cb));
+}
+
+// AO ring sits under the ball and does not follow the roll.
+function aoSprite(rq) {
+  const w = Math.ceil(rq*1.4)+2, h = Math.ceil(rq*0.44)+2;
+  return Sprites.get(`a${rq}`, w, h, ctx=>{
+    const ex=w/2, ey=h/2;
+    const aog=ctx.createRadialGradient(ex,ey,rq*0.1, ex,ey,rq*0.7);
+    aog.addColorStop(0,"rgba(0,0,0,0.28)"); aog.addColorStop(1,"rgba(0,0,0,0)");
+    ctx.beginPath();
+    ctx.ellipse(ex,ey,rq*0.7,rq*0.22,0,0,Math.PI*2);
+    ctx.fillStyle=aog; ctx.fill();
+  });
+}
+
+// Sprites are painted at the ball layer's backing resolution and drawn back
+// at scene size, so HiDPI balls stay sharp.
+function drawSphere(cx,cy,r,col,z,roll) {
+  const rq = quantR(r*Layers.ball.k), k = r/rq;
+  const ball = sphereSprite(rq, col);
+  const sw = ball.width*k;
+
+  // Apply roll tilt as skew transform
+  ctxB.save();
+  ctxB.translate(cx,cy);
+  ctxB.rotate(roll * 0.18);   // subtle skew based on head/eye roll
+  ctxB.drawImage(ball, -sw/2, -sw/2, sw, sw);
+  ctxB.restore();
+
+  const ao = aoSprite(rq);
+  const aw = ao.width*k, ah = ao.height*k;
+  ctxB.drawImage(ao, cx-aw/2, cy+r*0.82-ah/2, aw, ah);
+}
+
+// ── Face mesh overlays ────────────────────────────────────────────────────────
+// All visible faces go into one path per style: one stroke or fill call no
+// matter how many faces there are.
+function tracePoly(P, idxs) {
+  ctxV.moveTo(P[3*idxs[0]]*W, P[3*idxs[0]+1]*H);
+  for (let k=1;k<idxs.length;k++) ctxV.lineTo(P[3*idxs[k]]*W, P[3*idxs[k]+1]*H);
+  ctxV.closePath();
+}
+
+function drawMeshOverlay() {
+  if (!CFG.showMesh || !Governor.q.mesh) return;
+  ctxV.beginPath();
+  for (let s=0;s<MAX_FACES;s++) if (Faces.lms[s]) tracePoly(Faces.lms[s], FACE_OVAL);
+  ctxV.strokeStyle="rgba(60,80,180,0.4)"; ctxV.lineWidth=1.2; ctxV.stroke();
+
+  ctxV.beginPath();
+  for (let s=0;s<MAX_FACES;s++) {
+    const P = Faces.lms[s];
+    if (P) { tracePoly(P, LEFT_EYE); tracePoly(P, RIGHT_EYE); }
+  }
+  ctxV.strokeStyle="rgba(0,200,180,0.5)"; ctxV.lineWidth=1; ctxV.stroke();
+}
+
+const IRIS_PTS = [...LEFT_IRIS,...RIGHT_IRIS];
+function drawIrisPts() {
+  if (!CFG.showIris) return;
+  ctxV.beginPath();
+  for (let s=0;s<MAX_FACES;s++) {
+    const P = Faces.lms[s];
+    if (!P) continue;
+    for (let k=0;k<IRIS_PTS.length;k++) {
+      const x = P[3*IRIS_PTS[k]]*W, y = P[3*IRIS_PTS[k]+1]*H;
+      ctxV.moveTo(x+3.5, y);
+      ctxV.arc(x, y, 3.5, 0, Math.PI*2);
+    }
+  }
+  ctxV.fillStyle="#00ffaa";
+  ctxV.fill();
+}
+
+// ── Inference stage ───────────────────────────────────────────────────────────
+// ingestFrame/onLandmarks only copy the frame and update *target* state.
+// Everything that moves on screen is advanced by renderFrame, so a slow model
+// no longer stalls the springs, shockwaves or HUD.
+
+// Mean of coordinate `axis` (0=x, 1=y) over landmarks `idxs`.
+function meanCoord(P, idxs, axis) {
+  let s=0;
+  for (let k=0;k<idxs.length;k++) s += P[3*idxs[k]+axis];
+  return s/idxs.length;
+}
+
+function pushTarget(s, t, x, y, z, fresh) {
+  const F = Faces;
+  if (fresh) { F.tPrev[s]=t; F.xPrev[s]=x; F.yPrev[s]=y; F.zPrev[s]=z; }
+  else {
+    F.tPrev[s]=F.tLast[s]; F.xPrev[s]=F.xLast[s]; F.yPrev[s]=F.yLast[s]; F.zPrev[s]=F.zLast[s];
+  }
+  F.tLast[s]=t; F.xLast[s]=x; F.yLast[s]=y; F.zLast[s]=z;
+}
+
+// Fresh state for slot s under a new id, ball at the centre.
+function resetFace(s) {
+  const F = Faces;
+  F.id[s] = F.nextId++;
+  F.lms[s] = null; F.lost[s] = 0;
+  F.bx[s] = F.prevBx[s] = W/2; F.by[s] = F.prevBy[s] = H/2; F.bz[s] = 0;
+  F.earL[s] = F.earR[s] = F.roll[s] = 0;
+  F.blinks[s] = 0; F.cooldown[s] = 0;
+  F.scale[s] = 1; F.scaleV[s] = 0;
+  F.color[s] = F.target[s] = CFG.ballColor;
+  F.dir[s] = "center";
+  F.euOn[s] = 0;
+  pushTarget(s, 0, W/2, H/2, 0, true);
+}
+
+function releaseFace(s) {
+  Faces.id[s] = 0;
+  Faces.lms[s] = null;
+}
+
+// Mirror the camera frame into cFrame; `tIn` is its capture time (epoch ms).
+function ingestFrame(image, tIn) {
+  const fw = cFrame.width, fh = cFrame.height;
+  ctxF.save();
+  ctxF.translate(fw,0); ctxF.scale(-1,1);
+  ctxF.drawImage(image,0,0,fw,fh);
+  ctxF.restore();
+  if (frameTIn !== drawnTIn) Prof.dropped++;    // previous frame never reached the screen
+  frameTIn = tIn;
+}
+
+// Slot for a detection whose iris midpoint is (cx, cy): the nearest live,
+// unclaimed face within FACE_MATCH, else a free slot, else the longest-lost
+// one (recycled under a new id). -1 when every slot is claimed this frame.
+function matchFace(cx, cy) {
+  const F = Faces;
+  const reach = CFG.maxFaces > 1 ? FACE_MATCH*FACE_MATCH : Infinity;
+  let best = -1, bestD = reach, free = -1, stale = -1;
+  for (let s=0;s<MAX_FACES;s++) {
+    if (F.taken[s]) continue;
+    if (!F.id[s]) { if (free < 0) free = s; continue; }
+    const d = (F.cx[s]-cx)**2 + (F.cy[s]-cy)**2;
+    if (d <= bestD) { best = s; bestD = d; }
+    if (F.lost[s] > 0 && (stale < 0 || F.lost[s] > F.lost[stale])) stale = s;
+  }
+  if (best >= 0) return best;
+  const s = free >= 0 ? free : stale;
+  if (s >= 0) resetFace(s);
+  return s;
+}
+
+// `faces` holds one packed landmark array per detected face (possibly none),
+// `blinks` null or the engine's [left, right] blink scores per face (see
+// engines.js). `t` is the result time on the performance.now() clock;
+// replays pass the recorded one.
+function onLandmarks(faces, t=performance.now(), blinks=null) {
+  const F = Faces;
+  const tc = Math.min(t, frameTIn - performance.timeOrigin);   // capture time
+  faces = faces || NO_FACES;
+  Prof.mark();
+  F.taken.fill(0);
+  const n = Math.min(faces.length, CFG.maxFaces);
+  for (let k=0;k<n;k++) {
+    const P = faces[k];
+    const lcx = meanCoord(P, LEFT_IRIS, 0),  lcy = meanCoord(P, LEFT_IRIS, 1);
+    const rcx = meanCoord(P, RIGHT_IRIS, 0), rcy = meanCoord(P, RIGHT_IRIS, 1);
+    const s = matchFace((lcx+rcx)/2, (lcy+rcy)/2);
+    if (s < 0) continue;
+    F.taken[s] = 1;
+    faceLandmarks(s, P, t, tc, lcx, lcy, rcx, rcy, blinks, k);
+  }
+  for (let s=0;s<MAX_FACES;s++) {
+    if (!F.id[s] || F.taken[s]) continue;
+    F.lms[s] = null;
+    F.lost[s]++;
+    if (CFG.maxFaces > 1 && F.lost[s] > FACE_HOLD) releaseFace(s);
+  }
+  if (CFG.live) {
+    let p = -1, seen = 0;
+    for (let s=0;s<MAX_FACES;s++) if (F.lms[s]) { seen++; if (p < 0) p = s; }
+    Live.frame(frameTIn, p, p >= 0 ? F.lms[p] : null, latency[(latI+LAT_N-1) % LAT_N], seen);
+  }
+  Prof.lap("lms");
+}
+
+// Blink, roll, gaze and ball target of face slot s from landmarks P, whose
+// iris centres were already computed for matching. `tc` is the capture time;
+// blink scores, when given, are face k's in `blinks`.
+function faceLandmarks(s, P, t, tc, lcx, lcy, rcx, rcy, blinks, k) {
+  const F = Faces;
+  const fresh = F.lms[s] === null;   // don't extrapolate across a lost face
+  F.lms[s] = P;
+  F.lost[s] = 0;
+  F.cx[s] = (lcx+rcx)/2; F.cy[s] = (lcy+rcy)/2;
+
+  // ── EAR blink detection ────────────────────────────────────────────────────
+  const earL = F.earL[s] = blinks ? blinkEar(blinks[2*k])   : calcEAR(P, L_EAR_PTS);
+  const earR = F.earR[s] = blinks ? blinkEar(blinks[2*k+1]) : calcEAR(P, R_EAR_PTS);
+  const earAvg = (earL+earR)/2;
+
+  if (earAvg < EAR_THRESH && F.cooldown[s]<=0) {
+    // BLINK DETECTED
+    F.blinks[s]++;
+    F.cooldown[s] = 18;
+    // Pulse the ball outward
+    F.scaleV[s] = 0.55 * CFG.blinkBoost + 0.05;
+    if (CFG.live) Live.blink();
+    // Shockwave at ball position
+    spawnShock(F.bx[s], F.by[s], F.color[s]);
+    showBadge("👁️ PISCOU!", "#ff88aa");
+  }
+  if (F.cooldown[s]>0) F.cooldown[s]--;
+
+  // ── Eye roll / tilt angle ──────────────────────────────────────────────────
+  // Vector from right eye center to left eye center
+  const roll = Math.atan2(lcy - rcy, lcx - rcx);  // radians
+  if (CFG.smoother !== "oneeuro") F.roll[s] = roll;
+
+  // ── Iris center (mirrored) ────────────────────────────────────────────────
+  const rawX = W - (lcx+rcx)/2*W, rawY = (lcy+rcy)/2*H;
+
+  // Amplify
+  let nx=Math.max(-1,Math.min(1,((rawX/W)-0.5)*CFG.amplify));
+  let ny=Math.max(-1,Math.min(1,((rawY/H)-0.5)*CFG.amplify));
+
+  Heat.add(nx, ny, tc);
+
+  // ── Gaze direction & color ────────────────────────────────────────────────
+  const dir = getGazeDir(nx,ny);
+  if (dir !== F.dir[s]) {
+    F.dir[s] = dir;
+    if (CFG.orientColor) {
+      F.target[s] = DIR_COLORS[dir] || CFG.ballColor;
+      if (dir!=="center") showBadge(
+        dir==="left"  ? "👈 ESQUERDA" :
+        dir==="right" ? "👉 DIREITA"  :
+        dir==="up"    ? "👆 CIMA"     : "👇 BAIXO",
+        F.target[s]
+      );
+    }
+  }
+  DIR_COLORS.center = CFG.ballColor;   // keep center color in sync with picker
+
+  // ── Ball target ───────────────────────────────────────────────────────────
+  const distFromCenter=Math.sqrt(nx*nx+ny*ny);
+  const z = Math.max(0,1-distFromCenter*1.6);
+  if (CFG.smoother === "oneeuro") filterFace(s, tc, nx, ny, z, roll, fresh);
+  else pushTarget(s, t, (nx+1)/2*W, (ny+1)/2*H, z, fresh);
+}
+
+// One One Euro step of channel i (Casiez et al. 2012): a low-pass whose
+// cutoff rises with the filtered speed, so fixations are smoothed hard and
+// saccades pass with little lag. `dt` in seconds.
+function euroStep(i, x, dt, minCutoff) {
+  const F = Faces;
+  const aD = 1/(1 + 1/(2*Math.PI*ONE_EURO_DCUTOFF)/dt);
+  F.euD[i] += aD*((x - F.eu[i])/dt - F.euD[i]);
+  const tau = 1/(2*Math.PI*(minCutoff + ONE_EURO_BETA*Math.abs(F.euD[i])));
+  F.eu[i] += (x - F.eu[i])/(1 + tau/dt);
+}
+
+function filterFace(s, t, nx, ny, z, roll, fresh) {
+  const F = Faces, o = s*EU_CH;
+  if (fresh || !F.euOn[s]) {
+    F.eu[o] = nx; F.eu[o+1] = ny; F.eu[o+2] = z; F.eu[o+3] = roll;
+    F.euD.fill(0, o, o+EU_CH);
+    F.euT[s] = t; F.euOn[s] = 1;
+    return;
+  }
+  const dt = Math.max(1, t - F.euT[s])/1000;
+  const mc = ONE_EURO_HZ/CFG.smoothing;
+  F.euT[s] = t;
+  euroStep(o, nx, dt, mc); euroStep(o+1, ny, dt, mc);
+  euroStep(o+2, z, dt, mc); euroStep(o+3, roll, dt, mc);
+}
+
+// ── Render stage ──────────────────────────────────────────────────────────────
+// Target between/after landmark results: linear extrapolation from the two
+// newest samples, capped at one inference interval so a stall just holds.
+function predictTarget(s, now) {
+  const F = Faces;
+  const span = F.tLast[s] - F.tPrev[s];
+  const k = span > 0 ? Math.min(1, (now - F.tLast[s])/span) : 0;
+  pred.x = F.xLast[s] + (F.xLast[s]-F.xPrev[s])*k;
+  pred.y = F.yLast[s] + (F.yLast[s]-F.yPrev[s])*k;
+  pred.z = F.zLast[s] + (F.zLast[s]-F.zPrev[s])*k;
+  return pred;
+}
+
+// Ball of slot s from its One Euro state, extrapolated along the filtered
+// speed over PRED_GAIN of the time since capture, to hide inference latency.
+function placeFiltered(s, now) {
+  const F = Faces, o = s*EU_CH;
+  const h = Math.min(PRED_MAX_MS, Math.max(0, now - F.euT[s])*PRED_GAIN)/1000;
+  const nx = Math.max(-1, Math.min(1, F.eu[o]   + F.euD[o]*h));
+  const ny = Math.max(-1, Math.min(1, F.eu[o+1] + F.euD[o+1]*h));
+  F.bx[s] = (nx+1)/2*W; F.by[s] = (ny+1)/2*H;
+  F.bz[s] = Math.max(0, Math.min(1, F.eu[o+2] + F.euD[o+2]*h));
+  F.roll[s] = F.eu[o+3] + F.euD[o+3]*h;
+}
+
+function currentRadius(s) {
+  const popScale = 1 + Faces.bz[s]*(CFG.popEffect/100);
+  return CFG.ballRadius * popScale * Faces.scale[s];
+}
+
+// One fixed SIM_DT step of everything whose constants were tuned per frame.
+function simStep() {
+  const F = Faces;
+  let balls = 0, moved = false;
+  for (let s=0;s<MAX_FACES;s++) {
+    if (!F.id[s]) continue;
+    balls++;
+    // Lerp color smoothly
+    F.color[s] = lerpColor(F.color[s], F.target[s], 0.08);
+
+    // ── Blink scale physics (spring) ───────────────────────────────────────
+    F.scale[s]  += F.scaleV[s];
+    F.scaleV[s] += (1.0 - F.scale[s]) * 0.28;   // spring to 1.0
+    F.scaleV[s] *= 0.72;                          // damping
+    F.scale[s]   = Math.max(0.5, F.scale[s]);
+
+    // ── Velocity → trail ───────────────────────────────────────────────────
+    const speed = Math.hypot(F.bx[s]-F.prevBx[s], F.by[s]-F.prevBy[s]);
+    F.prevBx[s]=F.bx[s]; F.prevBy[s]=F.by[s];
+    if (speed > 1.5) {
+      spawnTrail(F.bx[s], F.by[s], currentRadius(s), F.color[s]);
+      moved = true;
+    }
+  }
+  if (moved) updateTrail(balls);
+  else if (CFG.particleStress) ageTrail();     // keep the stress dots churning
+  updateShocks();
+  spawnStress();
+
+  // Badge fade
+  if (badgeTimer>0) {
+    badgeTimer--;
+    if (badgeTimer===0) Host.badgeOff();
+  }
+}
+
+// One display frame. The host drives it from requestAnimationFrame.
+function renderFrame(now) {
+  const F = Faces;
+  const t0 = performance.now();
+  if (shownTIn !== drawnTIn) {
+    // The previous render put that frame on screen at the last vsync.
+    shownTIn = drawnTIn;
+    latency[latI] = epochNow() - shownTIn;
+    latI = (latI+1) % LAT_N;
+    if (latN < LAT_N) latN++;
+  }
+  const dt = Math.min(100, now-lastRender);
+  lastRender = now;
+
+  // ── Smooth ball positions ─────────────────────────────────────────────────
+  // lerp: a = 1/smoothing per SIM_DT, rescaled so the feel is frame-rate
+  // independent. oneeuro: the filtering already happened per sample.
+  const a = 1 - Math.pow(1 - 1/CFG.smoothing, dt/SIM_DT);
+  const euro = CFG.smoother === "oneeuro";
+  let tracking = false, maxZ = 0;
+  for (let s=0;s<MAX_FACES;s++) {
+    if (!F.id[s]) continue;
+    if (F.lms[s] && euro && F.euOn[s]) {
+      placeFiltered(s, now);
+      tracking = true;
+    } else if (F.lms[s]) {
+      const p = predictTarget(s, now);
+      F.bx[s]+=a*(p.x-F.bx[s]); F.by[s]+=a*(p.y-F.by[s]); F.bz[s]+=a*(p.z-F.bz[s]);
+      tracking = true;
+    }
+    maxZ = Math.max(maxZ, F.bz[s]);
+  }
+
+  simAcc += dt;
+  while (simAcc >= SIM_DT) { simStep(); simAcc -= SIM_DT; }
+
+  // ── Video layer ──────────────────────────────────────────────────────────
+  const sync = FillStats.syncing();
+  Prof.mark();
+  ctxV.drawImage(cFrame,0,0,W,H);
+  drawnTIn = frameTIn;
+  fillMs.video = Prof.lap("video");
+  if (tracking) {
+    drawMeshOverlay();
+    drawIrisPts();
+    fillMs.video += Prof.lap("mesh");
+  }
+
+  // ── Shadows (pop + blink combined radius) ───────────────────────────────
+  for (let s=0;s<MAX_FACES;s++) {
+    if (F.id[s]) drawGroundShadow(F.bx[s], F.by[s], currentRadius(s), F.bz[s]);
+  }
+  if (sync) FillStats.sync(ctxV);
+
+  // ── Blur background ───────────────────────────────────────────────────────
+  // One shared pass, focused on the ball closest to the viewer.
+  fillMs.video += Prof.lap("shadow");
+  drawBlurredBg(CFG.blurAmount*(0.2+maxZ*0.8));
+  if (sync) FillStats.sync(ctxBl);
+  fillMs.blur = Prof.lap("blur");
+
+  // ── Heatmap layer ─────────────────────────────────────────────────────────
+  Heat.draw(ctxH, now);
+  if (sync) FillStats.sync(ctxH);
+  fillMs.heat = Prof.lap("heat");
+
+  // ── Ball layer ────────────────────────────────────────────────────────────
+  ctxB.clearRect(0,0,W,H);
+  drawShocks();
+  drawTrail();
+  for (let s=0;s<MAX_FACES;s++) {
+    if (!F.id[s]) continue;
+    const r = currentRadius(s);
+    drawGlow(F.bx[s], F.by[s], r, F.color[s], F.bz[s]);
+    drawSphere(F.bx[s], F.by[s], r, F.color[s], F.bz[s], F.roll[s]);
+  }
+  if (sync) FillStats.sync(ctxB);
+  fillMs.ball = Prof.lap("ball");
+  FillStats.record(fillMs);
+
+  tickFps(now);
+  const frameMs = performance.now()-t0;
+  renderMsEma += (frameMs - renderMsEma)*0.1;
+  Prof.frame(frameMs);
+  if (now-lastHud >= HUD_MS) { lastHud = now; Host.hud(hudSnapshot()); }
+  if (Prof.due(now)) Host.profile(Prof.summary());
+}
+
+// ── FPS / HUD snapshot ───────────────────────────────────────────────────────
+function tickFps(now) {
+  renderN++;
+  if (now-lastFT>=1000) { fps=renderN; renderN=0; lastFT=now; }
+}
+
+function latencyStats() {
+  if (!latN) return null;
+  const sorted = latency.slice(0, latN).sort();
+  return { p50:sorted[latN>>1], p95:sorted[Math.floor(latN*0.95)], n:latN };
+}
+
+// Plain data only: it is posted across the worker boundary as-is. The
+// scalar fields describe the first visible face; `faces` lists every ball.
+function hudSnapshot() {
+  const F = Faces;
+  const bn = activeBlurBackend(), bms = BlurStats.ema[bn];
+  let p = -1;
+  const faces = [];
+  for (let s=0;s<MAX_FACES;s++) {
+    if (!F.id[s]) continue;
+    if (p < 0 && F.lms[s]) p = s;
+    faces.push({ id:F.id[s], blinks:F.blinks[s], dir:F.dir[s], tracking:F.lms[s] !== null });
+  }
+  const s = p < 0 ? 0 : p;
+  return {
+    tracking : p >= 0,
+    x : F.bx[s], y : F.by[s], z : F.bz[s],
+    dir      : F.dir[s],
+    blinks   : F.blinks[s],
+    earL     : F.earL[s], earR : F.earR[s],
+    faces,
+    fps,
+    renderMs : renderMsEma,
+    blur     : CFG.blurAmount>0 && bms!==undefined ? `${bn} ${bms.toFixed(1)}ms` : "—",
+    latency  : latencyStats(),
+  };
+}
+
+// ── Live config ───────────────────────────────────────────────────────────────
+// Called on every Streamlit rerun (forwarded to the worker when it renders). Only
+// mutates CFG and the colour targets, so the camera, FaceMesh and all tracking
+// state keep running across updates.
+function applyConfig(next) {
+  if (!next) return;
+  const F = Faces;
+  const prevColor = CFG.ballColor, prevSmoother = CFG.smoother, prevScale = CFG.renderScale;
+  Object.keys(CFG).forEach(k=>{ if (k in next) CFG[k] = next[k]; });
+  if (CFG.smoother !== prevSmoother) { F.euOn.fill(0); F.lms.fill(null); }   // restart both filters
+  Heat.setHalfLife(CFG.heatHalfLife);
+  if (CFG.renderScale !== prevScale && cFrame && !FillStats.bench) {
+    resizeLayers(Layers.cssW, Layers.cssH, Layers.dpr);
+  }
+  CFG.maxFaces = Math.max(1, Math.min(MAX_FACES, CFG.maxFaces|0));
+  DIR_COLORS.center = CFG.ballColor;
+  for (let s=0;s<MAX_FACES;s++) {
+    if (s >= CFG.maxFaces && F.id[s]) releaseFace(s);
+    if (CFG.ballColor !== prevColor && (F.dir[s] === "center" || !CFG.orientColor)) {
+      F.target[s] = CFG.ballColor;
+    }
+    if (!CFG.orientColor) F.target[s] = CFG.ballColor;
+  }
+  if (CFG.maxFaces === 1 && !F.id[0] && cFrame) resetFace(0);   // the single ball is always shown
+  if (!CFG.trailOn) trail.clear();
+  if (!CFG.shockOn) shocks.clear();
+}
+
@@ -0,0 +1,228 @@
+// ── Inference engines ─────────────────────────────────────────────────────────
+// Two ways to get landmarks from a camera frame, behind one interface:
+//   facemesh    the legacy @mediapipe/face_mesh solution; results arrive
+//               through its onResults callback while send() is pending
+//   landmarker  Tasks-Vision FaceLandmarker in VIDEO mode; detectForVideo is
+//               synchronous. Options pick the WASM build (SIMD or not), the
+//               delegate (CPU, or GPU through WebGL) and the model, and turn
+//               on the blendshapes, whose eyeBlinkLeft/Right scores replace
+//               the geometric EAR (see blinkEar in core.js)
+// Either engine calls its handler with the same object — { faces, blinks,
+// image }: one packed landmark array per face, null or a Float32Array of
+// [left, right] blink scores per face, and the frame the landmarks belong to
+// (only valid during the call) — so onResults does not know which one ran.
+
+const ENGINE_NAMES = ["facemesh", "landmarker"];
+const ENGINE_DEFAULTS = { name:"facemesh", delegate:"CPU", wasm:"auto", model:"float16", blendshapes:true };
+const ENGINE_BENCH_FRAMES = 90;
+
+function packLandmarks(lms) {
+  const P = new Float32Array(lms.length*3);
+  for (let i=0;i<lms.length;i++) {
+    P[3*i]=lms[i].x; P[3*i+1]=lms[i].y; P[3*i+2]=lms[i].z;
+  }
+  return P;
+}
+
+// eyeBlinkLeft/Right of every face, or null without blendshapes.
+function blinkScores(shapes) {
+  if (!shapes || !shapes.length) return null;
+  const out = new Float32Array(2*shapes.length);
+  shapes.forEach((s, k)=>{
+    for (const c of s.categories) {
+      if      (c.categoryName === "eyeBlinkLeft")  out[2*k]   = c.score;
+      else if (c.categoryName === "eyeBlinkRight") out[2*k+1] = c.score;
+    }
+  });
+  return out;
+}
+
+async function faceMeshEngine(opts) {
+  await Assets.faceMesh();
+  const mesh = new FaceMesh({ locateFile: f=>Assets.locateFile(f) });
+  let faces = 0;
+  const engine = {
+    label  : "FaceMesh",
+    handler: null,
+    configure(maxFaces) {
+      if (maxFaces === faces) return;
+      faces = maxFaces;
+      mesh.setOptions({
+        maxNumFaces:faces, refineLandmarks:true,
+        minDetectionConfidence:0.5, minTrackingConfidence:0.5,
+      });
+    },
+    send(image, t) { return mesh.send({image}); },
+    reset() { mesh.reset(); },
+    close() { return mesh.close(); },
+  };
+  mesh.onResults(res=>engine.handler({
+    faces : (res.multiFaceLandmarks || NO_FACES).map(packLandmarks),
+    blinks: null,
+    image : res.image,
+  }));
+  return engine;
+}
+
+async function landmarkerEngine(opts) {
+  const { vision, fileset, modelPath, simd } = await Assets.landmarker(opts.wasm, opts.model);
+  let faces = 1, lastTs = -1;
+  const lm = await vision.FaceLandmarker.createFromOptions(fileset, {
+    baseOptions: { modelAssetPath:modelPath, delegate:opts.delegate },
+    runningMode: "VIDEO",
+    numFaces: faces,
+    outputFaceBlendshapes: opts.blendshapes,
+    minFaceDetectionConfidence:0.5, minFacePresenceConfidence:0.5, minTrackingConfidence:0.5,
+  });
+  return {
+    label  : `FaceLandmarker ${opts.delegate}${opts.delegate === "CPU" ? (simd ? " SIMD" : " sem SIMD") : ""}`,
+    handler: null,
+    configure(maxFaces) {
+      if (maxFaces === faces) return;
+      faces = maxFaces;
+      lm.setOptions({ numFaces:faces });
+    },
+    send(image, t) {
+      const ts = lastTs = Math.max(lastTs + 1, Math.round(t));   // VIDEO mode: strictly increasing ms
+      const res = lm.detectForVideo(image, ts);
+      this.handler({
+        faces : res.faceLandmarks.map(packLandmarks),
+        blinks: blinkScores(res.faceBlendshapes),
+        image,
+      });
+    },
+    reset() {},            // no tracking state to drop outside a new instance
+    close() { lm.close(); },
+  };
+}
+
+// `opts` is ENGINE_DEFAULTS with the page's overrides; `handler` gets every
+// result (and can be swapped later). Loads whatever the engine needs first.
+async function createEngine(opts, handler) {
+  opts = { ...ENGINE_DEFAULTS, ...opts };
+  const engine = opts.name === "landmarker" ? await landmarkerEngine(opts) : await faceMeshEngine(opts);
+  engine.opts = opts;
+  engine.handler = handler;
+  return engine;
+}
+
+const sameEngine = (engine, opts)=>
+  engine !== null && JSON.stringify(engine.opts) === JSON.stringify({ ...ENGINE_DEFAULTS, ...opts });
+
+// ── Engine comparison ─────────────────────────────────────────────────────────
+// Records `n` camera frames as ImageBitmaps (scene size), then feeds the same
+// frames, in order, to each engine variant; live inference pauses while they
+// run. A variant equal to the live engine reuses it (tracking reset, no cold
+// start: two legacy FaceMesh graphs on one page are best avoided), the others
+// get a fresh instance. Per engine: cold start (creation plus the first
+// frame) and the latency of every later send. Agreement is measured on face 0
+// of the frames where both found a face, against the first variant: mean and
+// max distance over all landmarks and between the iris midpoints, in scene px
+// and relative to the distance between the irises, plus how often both call
+// the eyes closed (geometric EAR, or blendshapes when the engine has them).
+const EngineBench = {
+  want    : 0,
+  frames  : [],
+  variants: null,
+  live    : null,
+  done    : null,
+  running : false,
+
+  start(n, variants, live, done) {
+    Object.assign(this, { want:n, frames:[], variants, live, done });
+  },
+
+  grabbing() { return this.want > 0; },
+
+  async grab(src) {
+    this.frames.push(await createImageBitmap(src, { resizeWidth:W, resizeHeight:H }));
+    if (this.frames.length < this.want) return;
+    this.want = 0;
+    this.running = true;
+    try {
+      this.done(await this.run());
+    } catch (err) {
+      this.done({ error:String(err && err.message || err) });
+    } finally {
+      this.frames.forEach(b=>b.close());
+      this.frames = [];
+      this.running = false;
+    }
+  },
+
+  async run() {
+    const canvas = document.createElement("canvas");
+    canvas.width = W; canvas.height = H;
+    const ctx = canvas.getContext("2d");
+    const n = this.frames.length, engines = [], seen = [];
+    for (const opts of this.variants) {
+      let last = null;
+      const keep = res=>{ last = res.faces.length ? { P:res.faces[0], blinks:res.blinks } : null; };
+      const reuse = sameEngine(this.live, opts);
+      const t0 = performance.now();
+      const engine = reuse ? this.live : await createEngine(opts, keep);
+      const liveHandler = engine.handler;
+      engine.handler = keep;
+      engine.reset();
+      engine.configure(1);
+      const lat = new Float64Array(n-1), found = [];
+      let initMs = null;
+      try {
+        for (let i=0;i<n;i++) {
+          ctx.drawImage(this.frames[i], 0, 0);
+          last = null;
+          const ts = performance.now();
+          await engine.send(canvas, ts);
+          const t1 = performance.now();
+          if (i > 0) lat[i-1] = t1 - ts;
+          else if (!reuse) initMs = t1 - t0;
+          found.push(last);
+        }
+      } finally {
+        if (reuse) { engine.handler = liveHandler; engine.reset(); engine.configure(CFG.maxFaces); }
+        else await engine.close();
+      }
+      lat.sort();
+      const at = q=>lat[Math.min(lat.length-1, Math.floor(lat.length*q))];
+      engines.push({ name:opts.name, label:engine.label, initMs, p50:at(0.5), p95:at(0.95),
+                     mean:lat.reduce((a, v)=>a+v, 0)/lat.length,
+                     found:found.filter(Boolean).length });
+      seen.push(found);
+    }
+    return { frames:n, w:W, h:H, engines, agreement:this.agreement(seen[0], seen[1]) };
+  },
+
+  agreement(ref, other) {
+    let both = 0, either = 0, mean = 0, rel = 0, iris = 0, max = 0, closedSame = 0;
+    const closed = [0, 0];
+    const shut = r=>(r.blinks ? (blinkEar(r.blinks[0])+blinkEar(r.blinks[1]))/2
+                              : (calcEAR(r.P, L_EAR_PTS)+calcEAR(r.P, R_EAR_PTS))/2) < EAR_THRESH;
+    const mid = P=>[(meanCoord(P, LEFT_IRIS, 0)+meanCoord(P, RIGHT_IRIS, 0))/2*W,
+                    (meanCoord(P, LEFT_IRIS, 1)+meanCoord(P, RIGHT_IRIS, 1))/2*H];
+    for (let i=0;i<ref.length;i++) {
+      const a = ref[i], b = other[i];
+      if (a || b) either++;
+      if (!a || !b) continue;
+      both++;
+      const pts = Math.min(a.P.length, b.P.length)/3;
+      let sum = 0;
+      for (let j=0;j<pts;j++) {
+        const d = Math.hypot((a.P[3*j]-b.P[3*j])*W, (a.P[3*j+1]-b.P[3*j+1])*H);
+        sum += d;
+        if (d > max) max = d;
+      }
+      const iod = Math.hypot((meanCoord(a.P, LEFT_IRIS, 0)-meanCoord(a.P, RIGHT_IRIS, 0))*W,
+                             (meanCoord(a.P, LEFT_IRIS, 1)-meanCoord(a.P, RIGHT_IRIS, 1))*H);
+      mean += sum/pts;
+      rel  += sum/pts/Math.max(iod, 1e-6);
+      const [ax, ay] = mid(a.P), [bx, by] = mid(b.P);
+      iris += Math.hypot(ax-bx, ay-by);
+      const sa = shut(a), sb = shut(b);
+      closed[0] += sa; closed[1] += sb;
+      if (sa === sb) closedSame++;
+    }
+    const k = both ? 1/both : 0;
+    return { both, either, meanPx:mean*k, maxPx:max, irisPx:iris*k, meanIod:rel*k,
+             closedAgree:closedSame*k, closed };
+  },
+};
@@ -0,0 +1,78 @@
+// ── Motion gate ───────────────────────────────────────────────────────────────
+// Compares a 32×24 luminance thumbnail of consecutive camera frames. When the
+// mean absolute difference is below CFG.motionThresh the inference pass is
+// skipped and the last landmarks are reused. Two guards keep blinks safe:
+//   · at most CFG.maxSkip frames in a row are skipped, so any blink lasting
+//     longer than maxSkip+1 frames (~100 ms at 30 fps for maxSkip=2) is seen;
+//   · nothing is skipped while any face's last EAR is near EAR_THRESH.
+
+const GATE_W = 32, GATE_H = 24;
+const GATE_EAR_MARGIN = 1.5;     // process while EAR < EAR_THRESH × this
+
+const Gate = {
+  canvas : document.createElement("canvas"),
+  ctx    : null,
+  prev   : new Uint8Array(GATE_W*GATE_H),
+  cur    : new Uint8Array(GATE_W*GATE_H),
+  primed : false,
+  run    : 0,        // consecutive skips
+  lastFaces: NO_FACES,   // landmarks to reuse, one array per face
+  lastBlinks: null,      // and their blink scores, when the engine gives them
+  lastEar: 1,
+  skipped: 0,
+  total  : 0,
+  lastDiff: 0,
+
+  // Mean |ΔY| (0–255) between this frame's thumbnail and the previous one.
+  diff(src) {
+    if (!this.ctx) {
+      this.canvas.width = GATE_W; this.canvas.height = GATE_H;
+      this.ctx = this.canvas.getContext("2d", { willReadFrequently:true });
+    }
+    this.ctx.drawImage(src, 0, 0, GATE_W, GATE_H);
+    const px = this.ctx.getImageData(0, 0, GATE_W, GATE_H).data;
+    let sum = 0;
+    for (let i=0, j=0; i<this.cur.length; i++, j+=4) {
+      const y = (px[j]*77 + px[j+1]*150 + px[j+2]*29) >> 8;
+      sum += Math.abs(y - this.prev[i]);
+      this.cur[i] = y;
+    }
+    [this.prev, this.cur] = [this.cur, this.prev];
+    const d = this.primed ? sum/this.cur.length : Infinity;
+    this.primed = true;
+    return d;
+  },
+
+  // True when this frame can reuse the previous landmarks.
+  shouldSkip(src) {
+    this.total++;
+    if (!CFG.motionGate) { this.primed = false; return false; }
+    this.lastDiff = this.diff(src);
+    const skip = this.lastFaces.length > 0 &&
+                 this.run < CFG.maxSkip &&
+                 this.lastEar > EAR_THRESH*GATE_EAR_MARGIN &&
+                 this.lastDiff < CFG.motionThresh;
+    if (skip) { this.run++; this.skipped++; }
+    else      { this.run = 0; }
+    return skip;
+  },
+
+  // Remember a fresh inference result.
+  observe(faces, blinks) {
+    this.lastFaces = faces;
+    this.lastBlinks = blinks;
+    this.lastEar = 1;
+    faces.forEach((P, k)=>{
+      const ear = blinks ? (blinkEar(blinks[2*k])+blinkEar(blinks[2*k+1]))/2
+                         : (calcEAR(P, L_EAR_PTS)+calcEAR(P, R_EAR_PTS))/2;
+      this.lastEar = Math.min(this.lastEar, ear);
+    });
+  },
+
+  // Skip ratio since the last call.
+  takeRatio() {
+    const r = this.total ? this.skipped/this.total : 0;
+    this.skipped = 0; this.total = 0;
+    return r;
+  },
+};
@@ -0,0 +1,61 @@
+// ── Adaptive quality governor ────────────────────────────────────────────────
+// Watches a rolling window of per-frame cost (engine send + render) against
+// the budget 1000/CFG.targetFps. Over budget for ~1s → step down one tier;
+// under 60% of budget for ~4s → step back up. The asymmetric thresholds and
+// dwell times are the hysteresis that stops it from flapping between tiers.
+
+const QUALITY_TIERS = [
+  { name:"máxima", blur:null,       trail:true,  glow:true,  mesh:true,  inferScale:1   },
+  { name:"alta",   blur:"pyramid4", trail:true,  glow:true,  mesh:true,  inferScale:1   },
+  { name:"média",  blur:"pyramid4", trail:false, glow:false, mesh:true,  inferScale:1   },
+  { name:"baixa",  blur:"pyramid4", trail:false, glow:false, mesh:false, inferScale:1   },
+  { name:"mínima", blur:"pyramid4", trail:false, glow:false, mesh:false, inferScale:0.5 },
+];
+
+const GOV_WINDOW    = 30;     // frames in the rolling average
+const GOV_DOWN_MS   = 1000;   // dwell before stepping down
+const GOV_UP_MS     = 4000;   // dwell before stepping up
+const GOV_HEADROOM  = 0.6;    // step up only below this fraction of budget
+
+const Governor = {
+  tier       : 0,
+  q          : QUALITY_TIERS[0],
+  costs      : new Float32Array(GOV_WINDOW),
+  n          : 0,
+  i          : 0,
+  lastChange : 0,
+  onChange   : null,        // (tier, q, avgMs) => void
+
+  avg() {
+    let s = 0;
+    for (let k=0;k<this.n;k++) s += this.costs[k];
+    return this.n ? s/this.n : 0;
+  },
+
+  set(tier, now) {
+    this.tier = tier;
+    this.q = QUALITY_TIERS[tier];
+    this.lastChange = now;
+    const avgMs = this.avg();
+    this.n = 0; this.i = 0;           // samples from the old tier are stale
+    if (this.onChange) this.onChange(tier, this.q, avgMs);
+  },
+
+  // Called once per processed frame with that frame's total cost in ms.
+  record(costMs, now) {
+    if (!CFG.adaptive) {
+      if (this.tier !== 0) this.set(0, now);
+      return;
+    }
+    this.costs[this.i] = costMs;
+    this.i = (this.i+1) % GOV_WINDOW;
+    if (this.n < GOV_WINDOW) { this.n++; return; }
+
+    const budget = 1000/CFG.targetFps, avg = this.avg(), since = now-this.lastChange;
+    if (avg > budget && since > GOV_DOWN_MS && this.tier < QUALITY_TIERS.length-1) {
+      this.set(this.tier+1, now);
+    } else if (avg < budget*GOV_HEADROOM && since > GOV_UP_MS && this.tier > 0) {
+      this.set(this.tier-1, now);
+    }
+  },
+};
@@ -0,0 +1,128 @@
+// ── Gaze heatmap ──────────────────────────────────────────────────────────────
+// Where the gaze went, in a fixed HEAT_W×HEAT_H grid whatever the session
+// length. Every face sample splats one unit bilinearly into its four nearest
+// cells, so an update is O(1). With CFG.heatHalfLife > 0 (seconds) older
+// samples fade. The grid is not scaled every frame: a sample at time t weighs
+// 2^((t - tRef)/halfLife), reads divide by the weight of the newest sample,
+// and the grid is rescaled (tRef moved up) only when that weight gets large.
+// The sample is the unsmoothed gaze target in screen space, which heatmap.py
+// rebuilds from recorded landmarks with the same splat.
+
+const HEAT_W       = 64;
+const HEAT_H       = 48;
+const HEAT_RENORM  = 64;         // log2 weight at which the grid is rescaled
+const HEAT_DRAW_MS = 250;        // layer refresh
+const HEAT_ALPHA   = 0.55;       // layer opacity at the hottest cell
+
+const Heat = {
+  grid    : new Float64Array(HEAT_W*HEAT_H),
+  n       : 0,            // samples since reset
+  tRef    : 0,            // ms; weight 1 at this time
+  tLast   : 0,            // ms, newest sample
+  halfLife: 0,            // ms, 0 = no decay
+  lut     : null,         // 256 RGBA entries
+  small   : null,         // HEAT_W×HEAT_H canvas the layer is scaled up from
+  img     : null,
+  lastDraw: -Infinity,
+  shown   : false,
+
+  reset() {
+    this.grid.fill(0);
+    this.n = 0;
+  },
+
+  // Decay to `halfLifeS` seconds from now on; what was accumulated keeps its
+  // current weights.
+  setHalfLife(halfLifeS) {
+    const h = Math.max(0, halfLifeS)*1000;
+    if (h === this.halfLife) return;
+    this.settle();
+    this.halfLife = h;
+  },
+
+  // Fold the decay up to tLast into the grid so tRef = tLast.
+  settle() {
+    if (this.halfLife > 0 && this.n) {
+      const k = Math.pow(2, -(this.tLast - this.tRef)/this.halfLife);
+      for (let i=0;i<this.grid.length;i++) this.grid[i] *= k;
+    }
+    this.tRef = this.tLast;
+  },
+
+  // One sample: amplified gaze (nx, ny) in [-1, 1], mirrored as on screen,
+  // captured at `t` (ms).
+  add(nx, ny, t) {
+    if (!this.n) this.tRef = t;
+    this.tLast = t;
+    this.n++;
+    let w = 1;
+    if (this.halfLife > 0) {
+      let e = (t - this.tRef)/this.halfLife;
+      if (e > HEAT_RENORM) { this.settle(); e = 0; }
+      w = Math.pow(2, e);
+    }
+    const gx = (nx+1)/2*HEAT_W - 0.5, gy = (ny+1)/2*HEAT_H - 0.5;
+    const x0 = Math.floor(gx), y0 = Math.floor(gy);
+    const fx = gx - x0, fy = gy - y0;
+    const xa = Math.max(0, Math.min(HEAT_W-1, x0)), xb = Math.max(0, Math.min(HEAT_W-1, x0+1));
+    const ya = Math.max(0, Math.min(HEAT_H-1, y0)), yb = Math.max(0, Math.min(HEAT_H-1, y0+1));
+    const g = this.grid;
+    g[ya*HEAT_W+xa] += w*(1-fx)*(1-fy);
+    g[ya*HEAT_W+xb] += w*fx*(1-fy);
+    g[yb*HEAT_W+xa] += w*(1-fx)*fy;
+    g[yb*HEAT_W+xb] += w*fx*fy;
+  },
+
+  // Plain data for Python (heatmap.from_report): cell values as of the
+  // newest sample, row-major.
+  snapshot() {
+    const k = this.halfLife > 0 ? Math.pow(2, -(this.tLast - this.tRef)/this.halfLife) : 1;
+    return {
+      w: HEAT_W, h: HEAT_H, n: this.n,
+      halfLife: this.halfLife/1000,
+      t: this.tLast,
+      data: Array.from(this.grid, v=>v*k),
+    };
+  },
+
+  // Transparent → blue → cyan → yellow → red, alpha rising with the value.
+  buildLut() {
+    const stops = [[0,0,0,0], [0,60,255,0.35], [0,220,255,0.6], [255,230,0,0.85], [255,40,0,1]];
+    this.lut = new Uint8ClampedArray(256*4);
+    for (let i=0;i<256;i++) {
+      const p = i/255*(stops.length-1), j = Math.min(stops.length-2, Math.floor(p)), f = p-j;
+      for (let c=0;c<4;c++) {
+        const v = stops[j][c] + (stops[j+1][c]-stops[j][c])*f;
+        this.lut[4*i+c] = c < 3 ? v : v*HEAT_ALPHA*255;
+      }
+    }
+  },
+
+  // Redraw the layer at most every HEAT_DRAW_MS; clears it once when off.
+  draw(ctx, now) {
+    if (!CFG.heatmap) {
+      if (this.shown) { ctx.clearRect(0,0,W,H); this.shown = false; }
+      return;
+    }
+    if (now - this.lastDraw < HEAT_DRAW_MS && this.shown) return;
+    this.lastDraw = now;
+    this.shown = true;
+    if (!this.small) {
+      this.buildLut();
+      this.small = makeCanvas(HEAT_W, HEAT_H);
+      this.img = this.small.getContext("2d").createImageData(HEAT_W, HEAT_H);
+    }
+    const g = this.grid, px = this.img.data, lut = this.lut;
+    let max = 0;
+    for (let i=0;i<g.length;i++) if (g[i] > max) max = g[i];
+    const k = max > 0 ? 255/max : 0;
+    for (let i=0;i<g.length;i++) {
+      const l = 4*Math.round(g[i]*k);
+      px[4*i] = lut[l]; px[4*i+1] = lut[l+1]; px[4*i+2] = lut[l+2]; px[4*i+3] = lut[l+3];
+    }
+    this.small.getContext("2d").putImageData(this.img, 0, 0);
+    ctx.clearRect(0,0,W,H);
+    ctx.imageSmoothingEnabled = true;
+    ctx.drawImage(this.small, 0, 0, W, H);
+  },
+};
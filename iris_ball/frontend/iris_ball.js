@@ -0,0 +1,425 @@
+// ── Iris Ball page ────────────────────────────────────────────────────────────
+// Main-thread side: camera + inference engine (engines.js), HUD/badge DOM,
+// Streamlit wiring and the render pipeline choice. Drawing lives in core.js,
+// which runs either in render_worker.js (OffscreenCanvas) or right here as a
+// fallback.
+
+// ── DOM ───────────────────────────────────────────────────────────────────────
+const vid    = document.getElementById("vid");
+const cVideoEl = document.getElementById("cVideo");
+const cBlurEl  = document.getElementById("cBlur");
+const cHeatEl  = document.getElementById("cHeat");
+const cBallEl  = document.getElementById("cBall");
+const wrapEl   = document.getElementById("wrap");
+
+// Inference-side counters (rendering keeps its own in core.js)
+let inferN=0, inferLastT=performance.now(), inferFps=0;
+
+// Time-to-first-landmark (ms since the iframe navigation started)
+let firstLandmarkMs = null;
+
+// ── Badge flash ───────────────────────────────────────────────────────────────
+const badgeEl = document.getElementById("badge");
+function badgeOn(text, color) {
+  badgeEl.textContent   = text;
+  badgeEl.style.color   = color;
+  badgeEl.style.borderColor = color;
+  badgeEl.style.opacity = "1";
+}
+function badgeOff() { badgeEl.style.opacity = "0"; }
+
+// ── HUD ───────────────────────────────────────────────────────────────────────
+// Element lookups happen once; the renderer hands us a snapshot at 5 Hz.
+const HUD = {
+  dot   : document.getElementById("dot"),
+  st    : document.getElementById("stTxt"),
+  x     : document.getElementById("hX"),
+  y     : document.getElementById("hY"),
+  z     : document.getElementById("hZ"),
+  dir   : document.getElementById("hDir"),
+  fps   : document.getElementById("hFps"),
+  blur  : document.getElementById("hBlur"),
+  lat   : document.getElementById("hLat"),
+  roi   : document.getElementById("hRoi"),
+  skip  : document.getElementById("hSkip"),
+  blink : document.getElementById("hBlink"),
+  earL  : document.getElementById("earLFill"),
+  earR  : document.getElementById("earRFill"),
+  bar   : document.getElementById("hud"),
+};
+let lastSnap = { renderMs:0 };
+
+function updateHud(snap) {
+  const t0 = performance.now();
+  writeHud(snap);
+  Prof.add("hud", performance.now()-t0);
+}
+
+function writeHud(snap) {
+  lastSnap = snap;
+  HUD.fps.textContent  = `${snap.fps} / ${inferFps}`;
+  HUD.blur.textContent = snap.blur;
+  HUD.lat.textContent  = snap.latency
+    ? `${Math.round(snap.latency.p50)}/${Math.round(snap.latency.p95)}ms (${Pipeline.mode})` : "—";
+  if (!snap.tracking) {
+    HUD.dot.style.background="#ff3333";
+    HUD.st.textContent="Procurando rosto…";
+    HUD.dir.textContent="—";
+    return;
+  }
+  HUD.dot.style.background="#00ff88";
+  HUD.st.textContent="TRACKING";
+  HUD.x.textContent=Math.round(snap.x);
+  HUD.y.textContent=Math.round(snap.y);
+  HUD.z.textContent=snap.z.toFixed(2);
+  HUD.dir.textContent=snap.dir.toUpperCase();
+  HUD.blink.textContent = snap.faces.length > 1
+    ? snap.faces.map(f=>`#${f.id}:${f.blinks}`).join(" ") : snap.blinks;
+
+  // EAR bars, red when closed
+  HUD.earL.style.width = Math.min(1,snap.earL/0.3)*100+"%";
+  HUD.earR.style.width = Math.min(1,snap.earR/0.3)*100+"%";
+  const earColor = (snap.earL+snap.earR)/2 < EAR_THRESH ? "#ff3344" : "#00ffaa";
+  HUD.earL.style.background = earColor;
+  HUD.earR.style.background = earColor;
+}
+
+// ── Report to Python ───────────────────────────────────────────────────────────
+// setComponentValue replaces the whole value (and triggers a rerun), so keep
+// one merged object and only send it for rare, explicit events. Every send
+// bumps `seq`; Python acks the last one it read (args.reportAck), and the
+// one-shot results that value carried are then dropped, so later sends stop
+// repeating them (component.py keeps them for the app).
+const REPORT_ONE_SHOT = ["blurBench", "fillBench", "heatmap", "engineBench", "replay"];
+const report = { stream:(Math.random()*0xffffffff)>>>0, seq:0 };
+const reportSentAt = {};               // one-shot key → seq of the send that carried it
+function reportToPython(patch) {
+  Object.assign(report, patch);
+  report.seq++;
+  for (const k of Object.keys(patch)) if (REPORT_ONE_SHOT.includes(k)) reportSentAt[k] = report.seq;
+  Streamlit.setComponentValue(report);
+}
+
+function pruneReport(ack) {
+  if (!ack || ack.stream !== report.stream) return;
+  for (const k of Object.keys(reportSentAt)) {
+    if (ack.seq >= reportSentAt[k]) { delete report[k]; delete reportSentAt[k]; }
+  }
+}
+
+// Core-side summary (from the worker or this thread) plus the page-side
+// stages, when the worker ran the core. Summaries come every PROF_REPORT_MS,
+// so they skip the component value (a full rerun each) and go to their own
+// sink, like the live batches: only its fragment reruns.
+let profChan = null;
+function reportProfile(summary) {
+  if (Pipeline.worker) Object.assign(summary.stages, Prof.summary().stages);
+  const name = CFG.liveChannel ? `${CFG.liveChannel}-profile` : null;
+  if ((profChan && profChan.name) !== name) {
+    if (profChan) profChan.close();
+    profChan = name ? new BroadcastChannel(name) : null;
+  }
+  if (profChan) profChan.postMessage({ ...summary, budgetMs:1000/CFG.targetFps, mode:Pipeline.mode });
+}
+
+// ── Render pipeline ───────────────────────────────────────────────────────────
+// "worker": the four canvases are transferred to render_worker.js and frames
+// cross as ImageBitmaps, so compositing never blocks this thread.
+// "main": core.js renders here (browsers without OffscreenCanvas).
+// "replay": like "main", but Replay.run drives renderFrame instead of rAF.
+const WORKER_OK = typeof Worker !== "undefined" &&
+                  typeof createImageBitmap === "function" &&
+                  "transferControlToOffscreen" in HTMLCanvasElement.prototype;
+
+const Pipeline = {
+  mode   : null,
+  worker : null,
+  benchDone : null,
+  fillDone  : null,
+  heatDone  : null,
+
+  start(mode) {
+    this.mode = mode === "replay" ? "replay" : mode === "main" || !WORKER_OK ? "main" : "worker";
+    if (this.mode === "worker") {
+      this.worker = new Worker("render_worker.js");
+      this.worker.onmessage = ev=>this.onWorkerMessage(ev.data);
+      const video = cVideoEl.transferControlToOffscreen();
+      const blur  = cBlurEl.transferControlToOffscreen();
+      const heat  = cHeatEl.transferControlToOffscreen();
+      const ball  = cBallEl.transferControlToOffscreen();
+      this.worker.postMessage({ type:"init", video, blur, heat, ball, w:W, h:H, cfg:CFG,
+                                tier:Governor.tier }, [video, blur, heat, ball]);
+      return;
+    }
+    Host.badge = badgeOn; Host.badgeOff = badgeOff; Host.hud = updateHud;
+    Host.profile = reportProfile;
+    initLayers(cVideoEl, cBlurEl, cHeatEl, cBallEl, W, H);
+    if (this.mode === "replay") return;
+    const loop = now=>{ renderFrame(now); requestAnimationFrame(loop); };
+    requestAnimationFrame(loop);
+  },
+
+  onWorkerMessage(m) {
+    if      (m.type === "hud")       updateHud(m.snap);
+    else if (m.type === "badge")     badgeOn(m.text, m.color);
+    else if (m.type === "badgeOff")  badgeOff();
+    else if (m.type === "blurBench") this.benchDone(m.results);
+    else if (m.type === "fillBench") this.fillDone(m.results);
+    else if (m.type === "heat")      this.heatDone(m.snap);
+    else if (m.type === "prof")      reportProfile(m.summary);
+  },
+
+  config(cfg) {
+    applyConfig(cfg);
+    if (this.worker) this.worker.postMessage({ type:"cfg", cfg:CFG });
+    if (engine && !EngineBench.running) engine.configure(CFG.maxFaces);
+  },
+
+  tier(tier) {
+    if (this.worker) this.worker.postMessage({ type:"tier", tier });
+  },
+
+  resize(cssW, cssH, dpr) {
+    if (this.worker) this.worker.postMessage({ type:"resize", cssW, cssH, dpr });
+    else if (this.mode) resizeLayers(cssW, cssH, dpr);
+  },
+
+  async frame(image, faces, tIn, blinks=null) {
+    if (!this.worker) {
+      ingestFrame(image, tIn);
+      onLandmarks(faces, undefined, blinks);
+      return;
+    }
+    // Snapshot now: res.image is only valid inside the engine's callback.
+    const bitmap = await createImageBitmap(image);
+    this.worker.postMessage({ type:"frame", bitmap, faces, blinks, tIn }, [bitmap]);
+  },
+
+  // Clear the heatmap (no `done`) or fetch its snapshot.
+  heatmap(done) {
+    if (!this.worker) { if (done) done(Heat.snapshot()); else Heat.reset(); return; }
+    this.heatDone = done;
+    this.worker.postMessage({ type:"heat", reset:!done });
+  },
+
+  blurBench(frames, done) {
+    if (!this.worker) { BlurStats.startBench(frames, done); return; }
+    this.benchDone = done;
+    this.worker.postMessage({ type:"blurBench", frames });
+  },
+
+  fillBench(frames, done) {
+    if (!this.worker) { FillStats.startBench(frames, done); return; }
+    this.fillDone = done;
+    this.worker.postMessage({ type:"fillBench", frames });
+  },
+};
+
+// ── Display size ──────────────────────────────────────────────────────────────
+// CSS size of the canvases, capped at the frame width (see layers.js). The
+// backing stores follow it × devicePixelRatio, wherever the core renders.
+let frameHeight = 640;
+const Display = { w:0, h:0, dpr:0 };
+function layout() {
+  const fit = Math.max(320, document.documentElement.clientWidth - 4);
+  const cssW = CFG.displayWidth > 0 ? Math.min(CFG.displayWidth, fit) : fit;
+  const cssH = Math.round(cssW*H/W);
+  const dpr = CFG.hidpi ? window.devicePixelRatio || 1 : 1;
+  Streamlit.setFrameHeight(Math.max(frameHeight, cssH + 170));
+  if (!Pipeline.mode || (Display.w === cssW && Display.h === cssH && Display.dpr === dpr)) return;
+  Object.assign(Display, { w:cssW, h:cssH, dpr });
+  wrapEl.style.width = `${cssW}px`; wrapEl.style.height = `${cssH}px`;
+  for (const c of [cVideoEl, cBlurEl, cHeatEl, cBallEl]) {
+    c.style.width = `${cssW}px`; c.style.height = `${cssH}px`;
+  }
+  HUD.bar.style.maxWidth = `${Math.max(640, cssW)}px`;
+  Pipeline.resize(cssW, cssH, dpr);
+}
+
+// ── Inference input ───────────────────────────────────────────────────────────
+// Landmarks are normalized, so the low tiers can feed FaceMesh a shrunken
+// copy of the frame (or the ROI crop, see roi.js) without touching any of the
+// drawing code. The renderer then gets the full-size `vid` instead of res.image.
+// A capture larger than the scene is shrunk to it too: FaceMesh gains
+// nothing from the extra pixels.
+const cInfer = document.createElement("canvas");
+let inferReduced = false;
+function inferenceImage() {
+  const k = Governor.q.inferScale;
+  const crop = Roi.input(vid, k);
+  inferReduced = crop !== null || k < 1;
+  if (crop) return crop;
+  if (k >= 1 && vid.videoWidth <= W) return vid;
+  const iw = Math.round(W*k), ih = Math.round(H*k);
+  if (cInfer.width !== iw || cInfer.height !== ih) { cInfer.width = iw; cInfer.height = ih; }
+  cInfer.getContext("2d").drawImage(vid, 0, 0, iw, ih);
+  return cInfer;
+}
+
+Governor.onChange = (tier, q, avgMs)=>{
+  document.getElementById("hQ").textContent = `${q.name} (${tier})`;
+  Pipeline.tier(tier);
+  reportToPython({ quality:{ tier, name:q.name, tiers:QUALITY_TIERS.length, frameMs:avgMs } });
+};
+
+Recorder.onFlush = rec=>reportToPython({ recording:rec });
+
+// ── Inference results ─────────────────────────────────────────────────────────
+// Either engine (engines.js) lands here with every face packed into x,y,z
+// triples; in worker mode the arrays are structure-cloned, so each result
+// gets its own buffers. The recorder keeps the first face only.
+let frameTIn0 = 0;            // epoch ms at onFrame, i.e. camera capture time
+
+function onResults(res) {
+  inferN++;
+  const now = performance.now();
+  if (now-inferLastT >= 1000) {
+    inferFps=inferN; inferN=0; inferLastT=now;
+    HUD.roi.textContent = CFG.roiTracking ? `${Math.round(Roi.takeRatio()*100)}%` : "off";
+    HUD.skip.textContent = CFG.motionGate ? `${Math.round(Gate.takeRatio()*100)}%` : "off";
+  }
+
+  if (res.faces.length && firstLandmarkMs === null) {
+    firstLandmarkMs = now;
+    document.getElementById("hTtfl").textContent =
+      `${(firstLandmarkMs/1000).toFixed(2)}s (${Assets.source}, ${engine.label})`;
+  }
+  const faces = res.faces.map(P=>Roi.toFull(P));
+  Roi.update(CFG.maxFaces === 1 && faces.length ? faces[0] : null);
+  Gate.observe(faces, res.blinks);
+  Recorder.push(frameTIn0, faces.length ? faces[0] : null);
+  return Pipeline.frame(inferReduced ? vid : res.image, faces, frameTIn0, res.blinks);
+}
+
+// ── MediaPipe init ────────────────────────────────────────────────────────────
+// `engineOpts` (args.engine) picks the engine and its options, see engines.js.
+let engine = null, camera = null, booted = false;
+
+async function boot(assetCfg, pipelineMode, capture, engineOpts) {
+  try {
+    await Assets.load(assetCfg);
+    engine = await createEngine(engineOpts, onResults);
+    engine.configure(CFG.maxFaces);
+  } catch (err) {
+    document.getElementById("loader").innerHTML=
+      `<span style="color:#ff6677">❌ MediaPipe: ${err.message}</span>`;
+    return;
+  }
+
+  Pipeline.start(pipelineMode);
+  layout();
+
+  camera = new Camera(vid,{
+    onFrame: async()=>{
+      if (EngineBench.running) return;               // its frames are being replayed
+      if (EngineBench.grabbing()) await EngineBench.grab(vid);
+      const t0 = performance.now();
+      frameTIn0 = performance.timeOrigin + t0;
+      if (Gate.shouldSkip(vid)) {
+        // Still scene: new pixels, previous landmarks, no inference pass.
+        const faces = Gate.lastFaces;
+        Recorder.push(frameTIn0, faces.length ? faces[0] : null);
+        return Pipeline.frame(vid, faces, frameTIn0, Gate.lastBlinks);
+      }
+      const image = inferenceImage();
+      const ts = performance.now();
+      await engine.send(image, ts);
+      const t1 = performance.now();
+      Prof.add("infer", t1-ts);
+      Governor.record(t1-t0 + lastSnap.renderMs, t1);
+    },
+    width:capture ? capture[0] : W, height:capture ? capture[1] : H,
+  });
+  camera.start().then(()=>{
+    document.getElementById("loader").style.display="none";
+    document.getElementById("wrap").style.display="block";
+    document.getElementById("hud").style.display="flex";
+  }).catch(err=>{
+    document.getElementById("loader").innerHTML=
+      `<span style="color:#ff6677">❌ Câmera: ${err.message}</span>`;
+  });
+}
+
+// ── Replay ────────────────────────────────────────────────────────────────────
+// No camera and no FaceMesh: the recording's landmarks are drawn over a plain
+// background, and the run's timings are reported to Python when it ends.
+// `size` ([w, h]) overrides the canvas size and `faces` clones the recorded
+// face; benchmarks/bench_render.py uses both.
+function bootReplay(bytes, speed, size, faces) {
+  if (report.replayMissing) { delete report.replayMissing; reportToPython({}); }
+  let rec;
+  try {
+    rec = Replay.open(bytes, faces || 1);
+  } catch (err) {
+    document.getElementById("loader").innerHTML=
+      `<span style="color:#ff6677">❌ Replay: ${err.message}</span>`;
+    return;
+  }
+  if (size) [W, H] = size;
+  Pipeline.start("replay");
+  layout();
+  const background = makeCanvas(W, H);
+  const bctx = background.getContext("2d");
+  bctx.fillStyle = "#0a0a1a";
+  bctx.fillRect(0, 0, W, H);
+
+  document.getElementById("loader").style.display="none";
+  document.getElementById("wrap").style.display="block";
+  document.getElementById("hud").style.display="flex";
+  document.getElementById("hTtfl").textContent = `replay ${rec.n} quadros`;
+  Replay.run(rec, speed, background, stats=>reportToPython({ replay:stats }));
+}
+
+// ── Streamlit wiring ──────────────────────────────────────────────────────────
+// The first render boots the pipeline; later renders only carry new config.
+// The live sink instance (see live.js) never boots.
+let blurBenchSeen = 0, fillBenchSeen = 0, heatExportSeen = 0, heatResetSeen = 0, engineBenchSeen = 0;
+Streamlit.onRender(args=>{
+  if (args.sink) { LiveSink.render(args); return; }
+  Pipeline.config(args.cfg);
+  Recorder.sync(CFG.record, args.recordAck);
+  pruneReport(args.reportAck);
+  if (report.recording && !Recorder.unacked.length) delete report.recording;
+  if (!booted) {                                     // don't replay old requests on reload
+    blurBenchSeen = args.blurBench || 0;
+    fillBenchSeen = args.fillBench || 0;
+    heatExportSeen = args.heatExport || 0;
+    heatResetSeen = args.heatReset || 0;
+    engineBenchSeen = args.engineBench || 0;
+  }
+  if ((args.blurBench||0) > blurBenchSeen) {
+    blurBenchSeen = args.blurBench;
+    Pipeline.blurBench(120, results=>reportToPython({ blurBench:{ results, w:W, h:H, n:blurBenchSeen } }));
+  }
+  if ((args.fillBench||0) > fillBenchSeen) {
+    fillBenchSeen = args.fillBench;
+    Pipeline.fillBench(FILL_BENCH_FRAMES, results=>reportToPython({ fillBench:{
+      results, scene:[W, H], display:[Display.w, Display.h], n:fillBenchSeen } }));
+  }
+  if ((args.heatReset||0) > heatResetSeen) {
+    heatResetSeen = args.heatReset;
+    Pipeline.heatmap(null);
+  }
+  if ((args.heatExport||0) > heatExportSeen) {
+    heatExportSeen = args.heatExport;
+    Pipeline.heatmap(snap=>reportToPython({ heatmap:{ ...snap, seq:heatExportSeen } }));
+  }
+  if ((args.engineBench||0) > engineBenchSeen && engine) {
+    engineBenchSeen = args.engineBench;
+    const variants = ENGINE_NAMES.map(name=>({ ...args.engine, name }));
+    EngineBench.start(ENGINE_BENCH_FRAMES, variants, engine,
+                      result=>reportToPython({ engineBench:{ ...result, n:engineBenchSeen } }));
+  }
+  if (!booted && args.replayKey && !args.replay) {
+    // Python sends a recording's bytes once per mount; a new iframe asks again.
+    reportToPython({ replayMissing:args.replayKey });
+  } else if (!booted) {
+    booted = true;
+    window.addEventListener("resize", layout);
+    if (args.replay) bootReplay(args.replay, args.replaySpeed, args.size, args.replayFaces);
+    else boot(args.assets, args.pipeline, args.capture, args.engine);
+  }
+  frameHeight = args.height || 640;
+  layout();
+});
+Streamlit.ready();
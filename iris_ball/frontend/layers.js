@@ -0,0 +1,119 @@
+// ── Render scale ──────────────────────────────────────────────────────────────
+// Four sizes that used to be one W×H:
+//   capture    what the camera delivers (args.capture, fixed at boot)
+//   scene      W×H, the coordinate space of every draw call and of all the
+//              pixel constants (ball radius, trail speed…); also the input
+//              size FaceMesh gets, times the tier's inferScale (or the ROI)
+//   display    the CSS size of the canvases (CFG.displayWidth, 0 = the frame
+//              width), aspect of the scene
+//   backing    per layer: display × devicePixelRatio (CFG.hidpi) × the
+//              layer's share in RENDER_PRESETS[CFG.renderScale]
+// Each layer's context maps scene → backing pixels with setTransform, so
+// drawing code stays in scene units; only the blur layer works in its own
+// pixels, since canvas filters ignore the transform. Soft layers (blur,
+// heatmap) lose nothing visible at ¼–½ scale and cost 4–16× less fill.
+
+const LAYER_NAMES = ["video", "blur", "heat", "ball"];
+
+const RENDER_PRESETS = {
+  full     : { video:1,   blur:1,    heat:1,    ball:1   },
+  balanced : { video:1,   blur:0.5,  heat:0.25, ball:1   },
+  light    : { video:0.5, blur:0.25, heat:0.25, ball:1   },
+  minimal  : { video:0.5, blur:0.25, heat:0.25, ball:0.5 },
+};
+
+const FILL_BENCH_FRAMES = 60;
+
+const Layers = {
+  video : null, blur : null, heat : null, ball : null,   // {canvas, ctx, k}
+  cssW  : 0, cssH : 0, dpr : 1,
+  preset: null,
+
+  init(canvases) {
+    LAYER_NAMES.forEach((name, i)=>{
+      const canvas = canvases[i];
+      this[name] = { canvas, ctx:canvas.getContext("2d"), k:1 };
+    });
+  },
+
+  // Size every backing store for a display of cssW×cssH CSS px; k is
+  // backing px per scene px.
+  resize(cssW, cssH, dpr) {
+    this.cssW = cssW; this.cssH = cssH; this.dpr = dpr;
+    this.preset = FillStats.override() || CFG.renderScale;
+    const shares = RENDER_PRESETS[this.preset] || RENDER_PRESETS.balanced;
+    for (const name of LAYER_NAMES) {
+      const L = this[name];
+      const bw = Math.max(1, Math.round(cssW*dpr*shares[name]));
+      const bh = Math.max(1, Math.round(cssH*dpr*shares[name]));
+      if (L.canvas.width !== bw || L.canvas.height !== bh) { L.canvas.width = bw; L.canvas.height = bh; }
+      L.k = bw/W;
+      if (name === "blur") L.ctx.setTransform(1, 0, 0, 1, 0, 0);
+      else                 L.ctx.setTransform(bw/W, 0, 0, bh/H, 0, 0);
+    }
+  },
+
+  // Backing sizes, for reports.
+  sizes() {
+    const out = {};
+    for (const name of LAYER_NAMES) out[name] = [this[name].canvas.width, this[name].canvas.height];
+    return out;
+  },
+};
+
+// ── Fill cost ─────────────────────────────────────────────────────────────────
+// Per-layer cost of renderFrame (video includes mesh and shadow). Outside a
+// bench these are CPU submit times, like BlurStats. The bench cycles every
+// preset at the display's own devicePixelRatio and at 1, and reads one pixel
+// back from each layer after drawing it, which waits for the GPU to finish
+// the fill, so its numbers include the fill itself.
+const FillStats = {
+  ema   : { video:0, blur:0, heat:0, ball:0 },
+  bench : null,           // {queue, current, samples, warm, results, restore}
+
+  record(ms) {
+    for (const name of LAYER_NAMES) this.ema[name] += (ms[name] - this.ema[name])*0.1;
+    if (this.bench) this.benchSample(ms);
+  },
+
+  // True while the bench wants the per-layer readback.
+  syncing() { return this.bench !== null && this.bench.warm <= 0; },
+  sync(ctx) { ctx.getImageData(0, 0, 1, 1); },
+
+  startBench(frames, done) {
+    const dprs = [...new Set([Layers.dpr, 1])];
+    const queue = [];
+    for (const preset of Object.keys(RENDER_PRESETS)) for (const dpr of dprs) queue.push({ preset, dpr });
+    this.bench = { queue, frames, done, current:null, samples:[], warm:0, results:[],
+                   restore:{ cssW:Layers.cssW, cssH:Layers.cssH, dpr:Layers.dpr } };
+    this.next();
+  },
+
+  override() { return this.bench && this.bench.current ? this.bench.current.preset : null; },
+
+  next() {
+    const b = this.bench;
+    b.current = b.queue.shift() || null;
+    b.samples = []; b.warm = 10;
+    if (b.current) { resizeLayers(b.restore.cssW, b.restore.cssH, b.current.dpr); return; }
+    this.bench = null;
+    resizeLayers(b.restore.cssW, b.restore.cssH, b.restore.dpr);
+    b.done(b.results);
+  },
+
+  benchSample(ms) {
+    const b = this.bench;
+    if (b.warm > 0) { b.warm--; return; }
+    b.samples.push({ ...ms });
+    if (b.samples.length < b.frames) return;
+    const p50 = name=>{
+      const s = b.samples.map(m=>m[name]).sort((x,y)=>x-y);
+      return s[s.length>>1];
+    };
+    const row = { preset:b.current.preset, dpr:b.current.dpr, sizes:Layers.sizes() };
+    for (const name of LAYER_NAMES) row[name] = p50(name);
+    row.total = LAYER_NAMES.reduce((a, name)=>a + row[name], 0);
+    b.results.push(row);
+    this.next();
+  },
+};
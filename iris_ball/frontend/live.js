@@ -0,0 +1,151 @@
+// ── Live channel ──────────────────────────────────────────────────────────────
+// Per-frame tracking data for Python without a rerun per frame. Live runs
+// next to core.js (page or render worker): every processed camera frame adds
+// one fixed-size record, and every LIVE_WINDOW_MS the window is posted as
+// one binary batch on a BroadcastChannel named by CFG.liveChannel (one per
+// Streamlit session). LiveSink, a second zero-height instance of this
+// component inside an st.fragment, relays the batches with
+// setComponentValue, so only that fragment reruns. live.py documents the
+// layout; landmarks (optional) are REC_USED quantized like .irb records and
+// zigzag-varint coded as deltas from the previous face in the batch.
+
+const LIVE_WINDOW_MS   = 500;
+const LIVE_HEADER      = 30;
+const LIVE_FRAME_BYTES = 16;
+const LIVE_EAR_Q       = 500;        // EAR → u8
+const LIVE_PENDING_MAX = 20;         // batches the sink keeps until Python acks
+const LIVE_DIRS = ["center", "left", "right", "up", "down"];
+
+const Live = {
+  chan   : null,
+  name   : null,
+  stream : (Math.random()*0xffffffff)>>>0,   // tells Python a reload restarted seq
+  seq    : 0,
+  t0     : 0,
+  n      : 0,
+  k      : 0,            // landmarks per frame in this batch (0 = none)
+  frames : new DataView(new ArrayBuffer(LIVE_FRAME_BYTES*64)),
+  lms    : new Uint8Array(1 << 14),
+  lmsN   : 0,
+  prev   : new Int32Array(REC_USED.length*3),
+  hasPrev: false,
+  blinks : 0,            // blinks registered since the last record
+
+  blink() { this.blinks++; },
+
+  // One processed frame captured at `tIn` (epoch ms): primary face slot s
+  // (-1 = none) with its landmarks P, newest latency sample and face count.
+  frame(tIn, s, P, latencyMs, faces) {
+    if (this.name !== CFG.liveChannel) {
+      if (this.chan) this.chan.close();
+      this.name = CFG.liveChannel;
+      this.chan = this.name ? new BroadcastChannel(this.name) : null;
+      this.n = 0;
+    }
+    if (!this.chan) return;
+    if (this.n && tIn - this.t0 >= LIVE_WINDOW_MS) this.flush();
+    if (!this.n) {
+      this.t0 = tIn;
+      this.k = CFG.liveLandmarks ? REC_USED.length : 0;
+      this.lmsN = 0; this.hasPrev = false;
+    }
+    if ((this.n+1)*LIVE_FRAME_BYTES > this.frames.byteLength) {
+      const grown = new Uint8Array(this.frames.byteLength*2);
+      grown.set(new Uint8Array(this.frames.buffer));
+      this.frames = new DataView(grown.buffer);
+    }
+    const F = Faces, dv = this.frames, o = this.n*LIVE_FRAME_BYTES;
+    const u8 = (v, q)=>Math.max(0, Math.min(255, Math.round(v*q)));
+    dv.setUint16(o, Math.max(0, Math.min(0xffff, Math.round(tIn - this.t0))), true);
+    dv.setUint8(o+2, s >= 0 ? 1 : 0);
+    dv.setUint8(o+3, s >= 0 ? LIVE_DIRS.indexOf(F.dir[s]) : LIVE_DIRS.length);
+    dv.setUint8(o+4, s >= 0 ? u8(F.earL[s], LIVE_EAR_Q) : 0);
+    dv.setUint8(o+5, s >= 0 ? u8(F.earR[s], LIVE_EAR_Q) : 0);
+    dv.setUint16(o+6, s >= 0 ? Math.max(0, Math.round(F.bx[s])) : 0, true);
+    dv.setUint16(o+8, s >= 0 ? Math.max(0, Math.round(F.by[s])) : 0, true);
+    dv.setUint8(o+10, s >= 0 ? u8(F.bz[s], 255) : 0);
+    dv.setUint8(o+11, Math.min(255, this.blinks));
+    dv.setUint16(o+12, Math.max(0, Math.min(0xffff, Math.round(latencyMs))), true);
+    dv.setUint8(o+14, faces);
+    this.blinks = 0;
+    if (this.k && s >= 0) this.putLandmarks(P);
+    this.n++;
+  },
+
+  putLandmarks(P) {
+    if (this.lmsN + this.k*15 > this.lms.length) {
+      const grown = new Uint8Array(this.lms.length*2);
+      grown.set(this.lms);
+      this.lms = grown;
+    }
+    for (let k=0, j=0; k<this.k; k++) {
+      const b = 3*REC_USED[k];
+      for (let c=0;c<3;c++, j++) {
+        const q = Math.max(-32768, Math.min(32767, Math.round(P[b+c]*REC_Q)));
+        this.putVarint(this.hasPrev ? q - this.prev[j] : q);
+        this.prev[j] = q;
+      }
+    }
+    this.hasPrev = true;
+  },
+
+  putVarint(v) {
+    let z = ((v << 1) ^ (v >> 31)) >>> 0;      // zigzag
+    while (z >= 0x80) { this.lms[this.lmsN++] = (z & 0x7f) | 0x80; z >>>= 7; }
+    this.lms[this.lmsN++] = z;
+  },
+
+  flush() {
+    const nB = this.n*LIVE_FRAME_BYTES;
+    const buf = new Uint8Array(LIVE_HEADER + nB + this.lmsN);
+    const dv = new DataView(buf.buffer);
+    buf.set([73, 82, 76, 49]);                 // "IRL1"
+    dv.setUint32(4, this.stream, true);
+    dv.setUint32(8, this.seq++, true);
+    dv.setFloat64(12, this.t0, true);
+    dv.setUint16(20, this.n, true);
+    dv.setUint8(22, Math.min(255, fps));
+    dv.setUint16(24, this.k, true);
+    dv.setUint32(26, this.lmsN, true);
+    buf.set(new Uint8Array(this.frames.buffer, 0, nB), LIVE_HEADER);
+    buf.set(this.lms.subarray(0, this.lmsN), LIVE_HEADER + nB);
+    this.chan.postMessage(buf);
+    this.n = 0;
+  },
+};
+
+// ── Live sink (page only) ─────────────────────────────────────────────────────
+// The component instance rendered with `sink`: no camera, no canvases. It
+// forwards every unacked batch, concatenated, as one bytes value; with
+// `latest` (the profile sink) it forwards each message as it comes.
+const LiveSink = {
+  chan    : null,
+  pending : [],
+
+  render(args) {
+    if (!this.chan) {
+      document.getElementById("loader").style.display = "none";
+      this.chan = new BroadcastChannel(args.channel);
+      this.chan.onmessage = args.latest ? ev=>Streamlit.setComponentValue(ev.data)
+                                        : ev=>this.push(ev.data);
+    }
+    const ack = args.ack;
+    if (ack) {
+      this.pending = this.pending.filter(b=>{
+        const dv = new DataView(b.buffer, b.byteOffset);
+        return dv.getUint32(4, true) !== ack.stream || dv.getUint32(8, true) > ack.seq;
+      });
+    }
+    Streamlit.setFrameHeight(0);
+  },
+
+  push(buf) {
+    this.pending.push(buf);
+    if (this.pending.length > LIVE_PENDING_MAX) this.pending.shift();
+    let size = 0;
+    for (const b of this.pending) size += b.length;
+    const out = new Uint8Array(size);
+    for (let i=0, o=0; i<this.pending.length; o+=this.pending[i].length, i++) out.set(this.pending[i], o);
+    Streamlit.setComponentValue(out);
+  },
+};
@@ -0,0 +1,54 @@
+// ── Particle pools ────────────────────────────────────────────────────────────
+// Fixed-capacity struct-of-arrays store for short-lived effects (trail dots,
+// shockwaves). Each field is one typed array indexed by slot, colours are kept
+// as parsed RGB bytes, and particles stay in spawn order (oldest first, which
+// is also the draw order). Spawning, ageing and retiring only move numbers
+// inside the arrays, so a running session allocates nothing per frame.
+
+function makeParticles(cap) {
+  const x = new Float32Array(cap), y = new Float32Array(cap), r = new Float32Array(cap);
+  const maxR = new Float32Array(cap), alpha = new Float32Array(cap);
+  return {
+    cap,
+    n      : 0,
+    x, y, r, maxR, alpha,
+    rgb    : new Uint8Array(cap*3),
+    scalars: [x, y, r, maxR, alpha],
+
+    // Append one particle; when full the oldest one makes room.
+    spawn(x, y, r, maxR, alpha, c) {
+      if (this.n === this.cap) this.dropOldest(1);
+      const i = this.n++;
+      this.x[i] = x; this.y[i] = y; this.r[i] = r; this.maxR[i] = maxR;
+      this.alpha[i] = alpha;
+      this.rgb[3*i] = c.r; this.rgb[3*i+1] = c.g; this.rgb[3*i+2] = c.b;
+      return i;
+    },
+
+    dropOldest(k) {
+      k = Math.min(k, this.n);
+      if (k <= 0) return;
+      for (let f=0;f<this.scalars.length;f++) this.scalars[f].copyWithin(0, k, this.n);
+      this.rgb.copyWithin(0, 3*k, 3*this.n);
+      this.n -= k;
+    },
+
+    // Drop every particle with alpha <= minAlpha, compacting in place.
+    retire(minAlpha) {
+      let w = 0;
+      for (let i=0;i<this.n;i++) {
+        if (this.alpha[i] <= minAlpha) continue;
+        if (w !== i) {
+          this.x[w] = this.x[i]; this.y[w] = this.y[i]; this.r[w] = this.r[i];
+          this.maxR[w] = this.maxR[i]; this.alpha[w] = this.alpha[i];
+          this.rgb[3*w] = this.rgb[3*i]; this.rgb[3*w+1] = this.rgb[3*i+1];
+          this.rgb[3*w+2] = this.rgb[3*i+2];
+        }
+        w++;
+      }
+      this.n = w;
+    },
+
+    clear() { this.n = 0; },
+  };
+}
@@ -0,0 +1,71 @@
+// ── Stage profiler ────────────────────────────────────────────────────────────
+// Per-stage timings of the hot path, each in a ring of the last PROF_N
+// samples. Loaded on the page and in render_worker.js; each side fills the
+// stages it runs and the page merges both into one summary for Python.
+//
+//   frame     whole renderFrame          shadow ground shadow
+//   video     mirrored frame draw        blur   drawBlurredBg
+//   mesh      mesh + iris overlay        ball   shocks, trail, glow, sphere
+//   lms       EAR/gaze math (onLandmarks)
+//   heat      heatmap layer
+//   infer     engine send (page)         hud    HUD DOM writes (page)
+//
+// "dropped" counts camera frames overwritten before any render drew them;
+// "overBudget" counts renders slower than 1000/CFG.targetFps.
+
+const PROF_N         = 512;
+const PROF_REPORT_MS = 2000;
+
+const Prof = {
+  rings      : new Map(),      // stage → { buf, n, i }
+  t          : 0,
+  dropped    : 0,
+  overBudget : 0,
+  frames     : 0,
+  lastReport : 0,
+
+  add(stage, ms) {
+    let r = this.rings.get(stage);
+    if (!r) { r = { buf:new Float32Array(PROF_N), n:0, i:0 }; this.rings.set(stage, r); }
+    r.buf[r.i] = ms;
+    r.i = (r.i+1) % PROF_N;
+    if (r.n < PROF_N) r.n++;
+  },
+
+  // mark() then lap(stage) after each stage: records (and returns) the time
+  // since the last mark.
+  mark() { this.t = performance.now(); },
+  lap(stage) {
+    const t = performance.now(), ms = t - this.t;
+    this.add(stage, ms);
+    this.t = t;
+    return ms;
+  },
+
+  frame(ms) {
+    this.add("frame", ms);
+    this.frames++;
+    if (ms > 1000/CFG.targetFps) this.overBudget++;
+  },
+
+  // True every PROF_REPORT_MS while CFG.profile is on.
+  due(now) {
+    if (!CFG.profile || now - this.lastReport < PROF_REPORT_MS) return false;
+    this.lastReport = now;
+    return true;
+  },
+
+  // Percentiles per stage plus the counters since the previous summary.
+  summary() {
+    const stages = {};
+    this.rings.forEach((r, name)=>{
+      if (!r.n) return;
+      const s = r.buf.slice(0, r.n).sort();
+      const at = q=>s[Math.min(r.n-1, Math.floor(r.n*q))];
+      stages[name] = { p50:at(0.5), p95:at(0.95), p99:at(0.99), max:s[r.n-1], n:r.n };
+    });
+    const out = { stages, dropped:this.dropped, overBudget:this.overBudget, frames:this.frames };
+    this.dropped = 0; this.overBudget = 0; this.frames = 0;
+    return out;
+  },
+};
@@ -0,0 +1,202 @@
+// ── Landmark recorder / replay ────────────────────────────────────────────────
+// Recorder keeps only the landmarks the app reads (REC_USED, ~80 of 478) as
+// int16 records and streams them to Python in chunks; recording.py documents
+// the .irb layout. A chunk is resent with every report until Python acks its
+// seq, since a rerun only sees the newest component value.
+// Replay decodes a whole .irb and feeds it to the render pipeline with no
+// camera, at the recorded pace or as fast as the renderer goes. It can also
+// clone the recorded face side by side to load the multi-face path.
+
+const REC_N_LANDMARKS = 478;
+const REC_USED = [...new Set([...LEFT_IRIS, ...RIGHT_IRIS, ...FACE_OVAL, ...LEFT_EYE,
+                              ...RIGHT_EYE, ...L_EAR_PTS, ...R_EAR_PTS])].sort((a,b)=>a-b);
+const REC_Q        = 8192;          // recording.QSCALE
+const REC_FLUSH_MS = 3000;          // one chunk (and one rerun) per flush
+const REPLAY_COST_N = 4096;         // per-frame costs kept for the percentiles
+const REPLAY_FACE_DX = 0.22;        // spacing of cloned faces (normalized x)
+
+function bytesToB64(u8) {
+  let s = "";
+  for (let i=0;i<u8.length;i+=0x8000) s += String.fromCharCode.apply(null, u8.subarray(i, i+0x8000));
+  return btoa(s);
+}
+
+// UTC time to the ms plus 24 random bits (recording.REC_ID), so a restart
+// within the same second, or another session, never reuses a file.
+function recordingId() {
+  const t = new Date().toISOString().replace(/[-:]/g, "").replace("T", "-").replace(".", "-").slice(0, 19);
+  const rnd = Array.from(crypto.getRandomValues(new Uint8Array(3)), b=>b.toString(16).padStart(2, "0"));
+  return `${t}-${rnd.join("")}`;
+}
+
+const Recorder = {
+  active   : false,
+  id       : null,
+  seq      : 0,
+  t0       : 0,
+  stride   : 6 + 6*REC_USED.length,
+  buf      : new ArrayBuffer(0),
+  n        : 0,
+  unacked  : [],
+  lastFlush: 0,
+  onFlush  : null,           // ({id, indices, chunks, done}) => void
+
+  // Called on every Streamlit render with CFG.record and the Python ack.
+  sync(on, ack) {
+    if (ack && ack.id === this.id) this.unacked = this.unacked.filter(c=>c.seq > ack.seq);
+    if (on && !this.active) {
+      this.active = true;
+      this.id = recordingId();
+      this.seq = 0; this.n = 0; this.unacked = [];
+      this.t0 = 0; this.lastFlush = performance.now();
+    } else if (!on && this.active) {
+      this.active = false;
+      this.flush(true);
+    }
+  },
+
+  // One processed camera frame: capture time (epoch ms) and packed landmarks or null.
+  push(tIn, P) {
+    if (!this.active) return;
+    if (!this.t0) this.t0 = tIn;
+    if ((this.n+1)*this.stride > this.buf.byteLength) {
+      const grown = new ArrayBuffer(Math.max(64, 2*(this.n+1))*this.stride);
+      new Uint8Array(grown).set(new Uint8Array(this.buf, 0, this.n*this.stride));
+      this.buf = grown;
+    }
+    const dv = new DataView(this.buf, this.n*this.stride, this.stride);
+    dv.setUint32(0, Math.max(0, Math.round(tIn - this.t0)), true);
+    dv.setUint16(4, P ? 1 : 0, true);
+    for (let k=0, o=6; k<REC_USED.length; k++) {
+      const b = 3*REC_USED[k];
+      for (let c=0;c<3;c++, o+=2) {
+        const q = P ? Math.round(P[b+c]*REC_Q) : 0;
+        dv.setInt16(o, Math.max(-32768, Math.min(32767, q)), true);
+      }
+    }
+    this.n++;
+    const now = performance.now();
+    if (now - this.lastFlush >= REC_FLUSH_MS) this.flush(false);
+  },
+
+  flush(done) {
+    this.lastFlush = performance.now();
+    if (this.n) {
+      const data = bytesToB64(new Uint8Array(this.buf, 0, this.n*this.stride));
+      this.unacked.push({ seq:this.seq++, data });
+      this.n = 0;
+    }
+    if ((this.unacked.length || done) && this.onFlush) {
+      this.onFlush({ id:this.id, indices:REC_USED, chunks:this.unacked, done });
+    }
+  },
+};
+
+// ── Replay ────────────────────────────────────────────────────────────────────
+const Replay = {
+  // Parse an .irb (Uint8Array) into fixed-size record views; `faces` > 1
+  // replays that many copies of the recorded face.
+  open(bytes, faces=1) {
+    const dv = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    const magic = String.fromCharCode(bytes[0], bytes[1], bytes[2], bytes[3]);
+    if (magic !== "IRB1") throw new Error("gravação inválida");
+    const k = dv.getUint16(4, true);
+    const indices = new Uint16Array(k);
+    for (let i=0;i<k;i++) indices[i] = dv.getUint16(6+2*i, true);
+    const offset = 6 + 2*k, stride = 6 + 6*k;
+    return {
+      dv, indices, offset, stride,
+      n : Math.floor((bytes.byteLength - offset)/stride),
+      P : new Float32Array(REC_N_LANDMARKS*3),
+      faces : faces > 1
+        ? Array.from({length:faces}, ()=>new Float32Array(REC_N_LANDMARKS*3))
+        : null,
+      one : [],
+    };
+  },
+
+  time(rec, i) { return rec.dv.getUint32(rec.offset + i*rec.stride, true); },
+
+  // Landmarks of frame i in the packed layout, or null. The array is reused.
+  landmarks(rec, i) {
+    const base = rec.offset + i*rec.stride;
+    if (!(rec.dv.getUint16(base+4, true) & 1)) return null;
+    for (let k=0, o=base+6; k<rec.indices.length; k++) {
+      const b = 3*rec.indices[k];
+      for (let c=0;c<3;c++, o+=2) rec.P[b+c] = rec.dv.getInt16(o, true)/REC_Q;
+    }
+    return rec.P;
+  },
+
+  // Faces of frame i for onLandmarks: none, the recorded one, or its clones
+  // spread around it. The arrays are reused.
+  faces(rec, i) {
+    const P = this.landmarks(rec, i);
+    if (!P) return NO_FACES;
+    if (!rec.faces) { rec.one[0] = P; return rec.one; }
+    const m = rec.faces.length;
+    for (let f=0; f<m; f++) {
+      const Q = rec.faces[f], dx = REPLAY_FACE_DX*(f - (m-1)/2);
+      for (let k=0; k<rec.indices.length; k++) {
+        const b = 3*rec.indices[k];
+        Q[b] = P[b] + dx; Q[b+1] = P[b+1]; Q[b+2] = P[b+2];
+      }
+    }
+    return rec.faces;
+  },
+
+  // Drive ingestFrame/onLandmarks/renderFrame (main-thread core) from `rec`.
+  // "max" renders every recorded frame at its recorded time, back to back,
+  // so the output only depends on the recording and the config.
+  async run(rec, speed, background, onDone) {
+    const cost = new Float32Array(REPLAY_COST_N);
+    const base = Math.ceil(performance.now()) + SIM_DT;
+    const wall0 = performance.now();
+    let rendered = 0;
+
+    const feed = i=>{
+      const t = base + this.time(rec, i);
+      ingestFrame(background, performance.timeOrigin + t);
+      onLandmarks(this.faces(rec, i), t);
+      return t;
+    };
+
+    if (speed === "max") {
+      for (let i=0; i<rec.n; ) {
+        const sliceEnd = performance.now() + 12;     // yield so the canvases paint
+        for (; i<rec.n && performance.now() < sliceEnd; i++) {
+          const t0 = performance.now();
+          renderFrame(feed(i));
+          cost[rendered++ % REPLAY_COST_N] = performance.now() - t0;
+        }
+        await new Promise(r=>setTimeout(r, 0));
+      }
+    } else {
+      await new Promise(resolve=>{
+        let i = 0;
+        const loop = now=>{
+          const t0 = performance.now();
+          while (i < rec.n && this.time(rec, i) <= now - wall0) feed(i++);
+          renderFrame(base + (now - wall0));
+          cost[rendered++ % REPLAY_COST_N] = performance.now() - t0;
+          if (i < rec.n) requestAnimationFrame(loop); else resolve();
+        };
+        requestAnimationFrame(loop);
+      });
+    }
+
+    const wallMs = performance.now() - wall0;
+    const sorted = cost.slice(0, Math.min(rendered, REPLAY_COST_N)).sort();
+    onDone({
+      speed, frames:rec.n, rendered, wallMs,
+      durationMs : rec.n ? this.time(rec, rec.n-1) : 0,
+      fps        : rendered/wallMs*1000,
+      frameP50   : sorted[sorted.length>>1] || 0,
+      frameP95   : sorted[Math.floor(sorted.length*0.95)] || 0,
+      frameP99   : sorted[Math.floor(sorted.length*0.99)] || 0,
+      frameMean  : sorted.reduce((a, b)=>a+b, 0)/(sorted.length || 1),
+      layerMs    : { ...FillStats.ema },
+      layerSizes : Layers.sizes(),
+    });
+  },
+};
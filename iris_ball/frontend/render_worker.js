@@ -0,0 +1,64 @@
+// ── Render worker ─────────────────────────────────────────────────────────────
+// Owns the four transferred OffscreenCanvases and runs core.js against them.
+// Their backing sizes come from the page ("resize"), which knows the display
+// size and devicePixelRatio.
+// The page posts camera frames (ImageBitmap, transferred) with their packed
+// landmarks and blink scores; we post HUD snapshots, profiler summaries,
+// badge events and heatmap snapshots back.
+// Live batches go straight from here to the session's BroadcastChannel
+// (recorder.js only provides REC_USED/REC_Q to live.js).
+
+importScripts("sprites.js", "blur.js", "governor.js", "profiler.js", "particles.js", "heatmap.js",
+              "layers.js", "core.js", "recorder.js", "live.js");
+
+Host.badge    = (text, color)=>postMessage({ type:"badge", text, color });
+Host.badgeOff = ()=>postMessage({ type:"badgeOff" });
+Host.hud      = snap=>postMessage({ type:"hud", snap });
+Host.profile  = summary=>postMessage({ type:"prof", summary });
+
+// Dedicated workers get rAF in Chromium/Firefox; otherwise approximate 60 Hz.
+const raf = typeof self.requestAnimationFrame === "function"
+  ? f=>self.requestAnimationFrame(f)
+  : f=>setTimeout(()=>f(performance.now()), 16);
+
+function loop(now) {
+  renderFrame(now);
+  raf(loop);
+}
+
+self.onmessage = ev=>{
+  const m = ev.data;
+  switch (m.type) {
+    case "init":
+      initLayers(m.video, m.blur, m.heat, m.ball, m.w, m.h);
+      applyConfig(m.cfg);
+      Governor.q = QUALITY_TIERS[m.tier];
+      raf(loop);
+      break;
+    case "cfg":
+      applyConfig(m.cfg);
+      break;
+    case "resize":
+      resizeLayers(m.cssW, m.cssH, m.dpr);
+      break;
+    case "tier":
+      Governor.tier = m.tier;
+      Governor.q = QUALITY_TIERS[m.tier];
+      break;
+    case "frame":
+      ingestFrame(m.bitmap, m.tIn);
+      m.bitmap.close();
+      onLandmarks(m.faces, undefined, m.blinks);
+      break;
+    case "heat":
+      if (m.reset) Heat.reset();
+      else postMessage({ type:"heat", snap:Heat.snapshot() });
+      break;
+    case "blurBench":
+      BlurStats.startBench(m.frames, results=>postMessage({ type:"blurBench", results }));
+      break;
+    case "fillBench":
+      FillStats.startBench(m.frames, results=>postMessage({ type:"fillBench", results }));
+      break;
+  }
+};
@@ -0,0 +1,72 @@
+// ── ROI-cropped inference ─────────────────────────────────────────────────────
+// Once a face is found, the next frame sends FaceMesh only a padded square
+// around the last FACE_OVAL box, resized to CFG.roiSize. Landmarks come back
+// normalized to that crop and are mapped to full-frame coordinates. If the
+// face is lost or its box runs into the crop edge, the next frame falls back
+// to full-frame detection. Only used while a single face is tracked.
+
+const ROI_PAD  = 1.6;    // crop side / face-box side
+const ROI_EDGE = 0.03;   // face within this of the crop border → re-detect
+
+const Roi = {
+  box    : null,         // next crop {x,y,w,h} (normalized), null = full frame
+  active : null,         // crop used for the frame currently in FaceMesh
+  canvas : document.createElement("canvas"),
+  cropped: 0,
+  full   : 0,
+
+  // Image to feed FaceMesh for this frame; `scale` comes from the governor.
+  input(src, scale) {
+    this.active = CFG.roiTracking && CFG.maxFaces === 1 ? this.box : null;
+    if (!this.active) { this.full++; return null; }
+    this.cropped++;
+    const side = Math.max(32, Math.round(CFG.roiSize*scale));
+    if (this.canvas.width !== side) { this.canvas.width = side; this.canvas.height = side; }
+    const b = this.active, cw = src.videoWidth || W, ch = src.videoHeight || H;   // capture px
+    this.canvas.getContext("2d").drawImage(src, b.x*cw, b.y*ch, b.w*cw, b.h*ch, 0, 0, side, side);
+    return this.canvas;
+  },
+
+  // Map packed crop-space landmarks P to full-frame coordinates in place.
+  toFull(P) {
+    const b = this.active;
+    if (!b) return P;
+    for (let i=0;i<P.length;i+=3) {
+      P[i]   = b.x + P[i]*b.w;
+      P[i+1] = b.y + P[i+1]*b.h;
+      P[i+2] = P[i+2]*b.w;
+    }
+    return P;
+  },
+
+  // Pick the crop for the next frame from this frame's (full-frame) result.
+  update(P) {
+    if (!P) { this.box = null; return; }
+    let x0=1, y0=1, x1=0, y1=0;
+    for (const i of FACE_OVAL) {
+      const x=P[3*i], y=P[3*i+1];
+      if (x<x0) x0=x; if (x>x1) x1=x;
+      if (y<y0) y0=y; if (y>y1) y1=y;
+    }
+    const b = this.active;
+    if (b && (x0 < b.x+ROI_EDGE*b.w || x1 > b.x+(1-ROI_EDGE)*b.w ||
+              y0 < b.y+ROI_EDGE*b.h || y1 > b.y+(1-ROI_EDGE)*b.h)) {
+      this.box = null;   // face left the crop: low confidence, re-detect
+      return;
+    }
+    // Square in pixels, so the resize to roiSize×roiSize keeps the aspect.
+    const side = Math.max((x1-x0)*W, (y1-y0)*H) * ROI_PAD;
+    if (side >= Math.min(W, H)) { this.box = null; return; }
+    const w = side/W, h = side/H;
+    const clamp = (v, hi)=>Math.max(0, Math.min(hi, v));
+    this.box = { x:clamp((x0+x1)/2 - w/2, 1-w), y:clamp((y0+y1)/2 - h/2, 1-h), w, h };
+  },
+
+  // Share of frames that ran on a crop since the last call.
+  takeRatio() {
+    const n = this.cropped + this.full;
+    const r = n ? this.cropped/n : 0;
+    this.cropped = 0; this.full = 0;
+    return r;
+  },
+};
@@ -0,0 +1,52 @@
+// ── Sprite cache ──────────────────────────────────────────────────────────────
+// Pre-rendered gradients (sphere, glow, trail dot) keyed by quantized radius
+// and colour. A Map keeps insertion order, so re-inserting on hit makes it an
+// LRU; the oldest sprites are evicted once the pixel memory passes the cap.
+
+const SPRITE_CACHE_BYTES = 32 * 1024 * 1024;
+
+function makeCanvas(w, h) {
+  if (typeof OffscreenCanvas !== "undefined") return new OffscreenCanvas(w, h);
+  const c = document.createElement("canvas");
+  c.width = w; c.height = h;
+  return c;
+}
+
+const Sprites = {
+  lru    : new Map(),     // key → {canvas, bytes}
+  bytes  : 0,
+  hits   : 0,
+  misses : 0,
+
+  get(key, w, h, paint) {
+    let s = this.lru.get(key);
+    if (s) {
+      this.lru.delete(key); this.lru.set(key, s);
+      this.hits++;
+      return s.canvas;
+    }
+    const canvas = makeCanvas(w, h);
+    paint(canvas.getContext("2d"));
+    s = { canvas, bytes: w*h*4 };
+    this.lru.set(key, s);
+    this.bytes += s.bytes;
+    this.misses++;
+    while (this.bytes > SPRITE_CACHE_BYTES && this.lru.size > 1) {
+      const [oldKey, old] = this.lru.entries().next().value;
+      this.lru.delete(oldKey);
+      this.bytes -= old.bytes;
+    }
+    return canvas;
+  },
+
+  clear() {
+    this.lru.clear();
+    this.bytes = 0;
+  },
+};
+
+// Quantizers: 2px radius buckets, 8 levels of slack per colour channel.
+// The error is below what the eye can see on a moving, shaded ball.
+const quantR   = r => Math.max(2, Math.round(r/2)*2);
+const quantCh  = v => Math.min(255, Math.round(v/8)*8);
+const quantRgb = ({r,g,b}) => ({ r:quantCh(r), g:quantCh(g), b:quantCh(b) });
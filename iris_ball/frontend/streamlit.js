@@ -0,0 +1,25 @@
+// ── Minimal Streamlit component protocol ──────────────────────────────────────
+// Hand-rolled so the page needs no bundler: the parent app posts
+// "streamlit:render" with the Python kwargs, and we post back ready / height /
+// value messages. See streamlit-component-lib for the reference client.
+const Streamlit = (() => {
+  const listeners = [];
+
+  function send(type, data) {
+    window.parent.postMessage(Object.assign({ isStreamlitMessage:true, type }, data), "*");
+  }
+
+  window.addEventListener("message", ev=>{
+    const msg = ev.data;
+    if (!msg || msg.type !== "streamlit:render") return;
+    listeners.forEach(fn=>fn(msg.args || {}));
+  });
+
+  return {
+    ready             : ()=>send("streamlit:componentReady", { apiVersion:1 }),
+    onRender          : fn=>listeners.push(fn),
+    setFrameHeight    : h=>send("streamlit:setFrameHeight", { height:h }),
+    setComponentValue : v=>send("streamlit:setComponentValue",
+                                { value:v, dataType:v instanceof Uint8Array ? "bytes" : "json" }),
+  };
+})();
@@ -0,0 +1,269 @@
+"""Vectorized gaze/blink math over landmark sequences.
+
+NumPy port of the per-frame JavaScript in ``frontend/core.js``: EAR per eye,
+blink events with the same cooldown, the iris-line roll, the amplified gaze
+vector with its direction label, and the ball smoothing (exponential lerp or
+the speed-adaptive One Euro filter, see :func:`one_euro`). It works
+on whole ``(frames, 478, 3)`` arrays of normalized FaceMesh landmarks in one
+call. Frames without a face are all-NaN and are skipped the same way the live
+page skips them.
+
+Long recordings can be processed in chunks: pass the ``state`` returned by
+one :func:`analyze` call into the next and the results are identical to a
+single call over the concatenated frames.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .landmarks import L_EAR_PTS, LEFT_IRIS, R_EAR_PTS, RIGHT_IRIS
+
+WIDTH, HEIGHT = 640, 480
+
+EAR_THRESH     = 0.18
+BLINK_COOLDOWN = 18         # face frames before another blink can register
+CENTER_RADIUS  = 0.25
+
+DIRECTIONS = ("center", "left", "right", "up", "down")
+CENTER, LEFT, RIGHT, UP, DOWN = range(len(DIRECTIONS))
+
+# Ball colour per direction (core.js DIR_COLORS); "center" uses the picker colour.
+DIR_COLORS = {
+    "left" : "#ff4422",
+    "right": "#2288ff",
+    "up"   : "#ffdd00",
+    "down" : "#00dd66",
+}
+
+_SMOOTH_BLOCK = 256
+
+SMOOTHERS = ("lerp", "oneeuro")
+
+# One Euro (core.js ONE_EURO_*): min cutoff is ONE_EURO_HZ/smoothing Hz, so
+# the "smoothing" slider keeps its meaning; beta is per unit/s of gaze.
+# Values and PRED_GAIN picked with benchmarks/bench_smoothing.py.
+ONE_EURO_HZ      = 7.0
+ONE_EURO_BETA    = 3.0
+ONE_EURO_DCUTOFF = 1.0
+PRED_GAIN        = 0.5       # share of the latency covered by extrapolation
+PRED_MAX_S       = 0.06
+
+
+@dataclass
+class GazeState:
+    """Carry-over between chunks: smoothed ball, filter state and blink cooldown."""
+
+    ball: np.ndarray = field(default_factory=lambda: np.array([WIDTH / 2, HEIGHT / 2, 0.0]))
+    cooldown: int = 0
+    blinks: int = 0
+    euro: tuple | None = None  # (value, derivative, t) of the last One Euro sample
+
+
+@dataclass
+class GazeSeries:
+    """Per-frame results of :func:`analyze`; NaN where no face was found.
+
+    ``direction`` uses ``len(DIRECTIONS)`` for those frames, which
+    :attr:`labels` turns into "".
+    """
+
+    ear: np.ndarray          # (F, 2) left, right
+    gaze: np.ndarray         # (F, 2) amplified nx, ny in [-1, 1]
+    direction: np.ndarray    # (F,) int8 index into DIRECTIONS
+    roll: np.ndarray         # (F,) radians
+    ball: np.ndarray         # (F, 3) smoothed bx, by (px) and bz
+    blink_frames: np.ndarray  # frame indices where a blink registered
+    state: GazeState
+
+    @property
+    def labels(self):
+        """Direction names, with "" for frames without a face."""
+        names = np.array(DIRECTIONS + ("",))
+        return names[self.direction]
+
+
+def ear(lms, pts, width=WIDTH, height=HEIGHT):
+    """Eye aspect ratio (Soukupova) for every frame, in pixel space."""
+    p = lms[:, pts, :2] * np.array([width, height], dtype=lms.dtype)
+    d = np.linalg.norm(p[:, [0, 2, 4]] - p[:, [1, 3, 5]], axis=-1)
+    return (d[:, 0] + d[:, 1]) / (2 * d[:, 2] + 1e-6)
+
+
+def iris_centers(lms):
+    """(F, 2, 2) mean iris position, [left, right] × [x, y], normalized."""
+    return np.stack([lms[:, LEFT_IRIS, :2].mean(axis=1),
+                     lms[:, RIGHT_IRIS, :2].mean(axis=1)], axis=1)
+
+
+def roll(lms):
+    """Angle of the right→left iris line (normalized coordinates, as in JS)."""
+    c = iris_centers(lms)
+    d = c[:, 0] - c[:, 1]
+    return np.arctan2(d[:, 1], d[:, 0])
+
+
+def gaze_vector(lms, amplify=2.6):
+    """Mirrored, amplified iris midpoint offset, clipped to [-1, 1]."""
+    mid = iris_centers(lms).mean(axis=1)
+    nx = (0.5 - mid[:, 0]) * amplify
+    ny = (mid[:, 1] - 0.5) * amplify
+    return np.clip(np.stack([nx, ny], axis=1), -1, 1)
+
+
+def gaze_direction(gaze):
+    """Direction index per frame for an (F, 2) gaze array (see DIRECTIONS)."""
+    nx, ny = gaze[:, 0], gaze[:, 1]
+    ax, ay = np.abs(nx), np.abs(ny)
+    horiz = np.where(nx < 0, LEFT, RIGHT)
+    vert = np.where(ny < 0, UP, DOWN)
+    out = np.where(ax > ay, horiz, vert)
+    out = np.where((ax < CENTER_RADIUS) & (ay < CENTER_RADIUS), CENTER, out)
+    return out.astype(np.int8)
+
+
+def ball_target(gaze, width=WIDTH, height=HEIGHT):
+    """Target (bx, by, bz) for each gaze sample, before smoothing."""
+    tx = (gaze[:, 0] + 1) / 2 * width
+    ty = (gaze[:, 1] + 1) / 2 * height
+    tz = np.maximum(0, 1 - np.hypot(gaze[:, 0], gaze[:, 1]) * 1.6)
+    return np.stack([tx, ty, tz], axis=1)
+
+
+def smooth(x, alpha, y0):
+    """Exponential smoothing ``y[t] = y[t-1] + alpha*(x[t] - y[t-1])``.
+
+    The recurrence is evaluated in blocks: inside a block it is one matmul
+    with a lower-triangular decay matrix, and only the block carries are
+    chained in Python, so a million frames take a few thousand small steps.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    if n == 0:
+        return x.copy()
+    b = min(_SMOOTH_BLOCK, n)
+    decay = 1.0 - alpha
+    k = np.arange(b)
+    powers = decay ** k                                   # decay^0 .. decay^(b-1)
+    lag = k[:, None] - k[None, :]
+    kernel = np.where(lag >= 0, alpha * decay ** np.maximum(lag, 0), 0.0)
+
+    pad = (-n) % b
+    xb = np.concatenate([x, np.repeat(x[-1:], pad, axis=0)]).reshape(-1, b, *x.shape[1:])
+    local = kernel @ xb.reshape(len(xb), b, -1)           # response with zero carry-in
+    local = local.reshape(xb.shape)
+    carry_gain = (decay * powers).reshape(b, *([1] * (x.ndim - 1)))
+
+    out = np.empty_like(xb)
+    carry = np.asarray(y0, dtype=np.float64)
+    for i in range(len(xb)):
+        out[i] = local[i] + carry_gain * carry
+        carry = out[i, -1]
+    return out.reshape(-1, *x.shape[1:])[:n]
+
+
+def one_euro(x, t, min_cutoff, beta=ONE_EURO_BETA, d_cutoff=ONE_EURO_DCUTOFF, state=None):
+    """One Euro filter (Casiez et al. 2012) over ``x`` (F, C) sampled at ``t`` (s).
+
+    A first-order low-pass whose cutoff grows with the filtered speed:
+    ``min_cutoff + beta*|dx|``, per channel. Still gaze gets smoothed hard,
+    saccades pass with little lag. The recurrence depends on its own output,
+    so unlike :func:`smooth` it runs frame by frame. Returns the filtered
+    values, their filtered derivatives (units/s) and the state for the next
+    chunk.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.empty_like(x)
+    dy = np.empty_like(x)
+    if state is None:
+        if not len(x):
+            return y, dy, None
+        prev, dprev, tprev = x[0], np.zeros(x.shape[1:]), t[0] - 1.0 / 30
+    else:
+        prev, dprev, tprev = state
+    tau_d = 1.0 / (2 * np.pi * d_cutoff)
+    for i in range(len(x)):
+        dt = max(t[i] - tprev, 1e-3)
+        a_d = 1.0 / (1.0 + tau_d / dt)
+        dprev = dprev + a_d * ((x[i] - prev) / dt - dprev)
+        tau = 1.0 / (2 * np.pi * (min_cutoff + beta * np.abs(dprev)))
+        prev = prev + (x[i] - prev) / (1.0 + tau / dt)
+        tprev = t[i]
+        y[i], dy[i] = prev, dprev
+    return y, dy, (prev, dprev, tprev)
+
+
+def blink_events(ear_avg, cooldown=0, thresh=EAR_THRESH, gap=BLINK_COOLDOWN):
+    """Frames (positions in ``ear_avg``) where a blink registers.
+
+    Same rule as the page: below ``thresh`` and at least ``gap`` frames since
+    the previous blink. Only the candidates are scanned, jumping with
+    ``searchsorted``, so the loop runs once per blink. Returns the events and
+    the cooldown left at the end.
+    """
+    cand = np.flatnonzero(ear_avg < thresh)
+    events = []
+    i = np.searchsorted(cand, cooldown)
+    while i < len(cand):
+        f = cand[i]
+        events.append(f)
+        i = np.searchsorted(cand, f + gap, side="left")
+    events = np.asarray(events, dtype=np.int64)
+    n = len(ear_avg)
+    left = max(0, (events[-1] + gap - n) if len(events) else cooldown - n)
+    return events, left
+
+
+def analyze(lms, amplify=2.6, smoothing=7, state=None, width=WIDTH, height=HEIGHT,
+            smoother="lerp", t=None, latency=0.0):
+    """Run the full per-frame pipeline over ``lms`` (F, 478, 3).
+
+    ``amplify`` and ``smoothing`` take the values the page uses
+    (``CFG.amplify`` is the slider divided by 10). With ``smoother="oneeuro"``
+    gaze, bz and roll go through :func:`one_euro` at frame times ``t``
+    (seconds, default 30 fps), then extrapolated along the filtered speed
+    over part of ``latency`` (capture→screen, seconds), as the page does.
+    """
+    lms = np.asarray(lms)
+    state = GazeState() if state is None else state
+    n = len(lms)
+    valid = np.isfinite(lms[:, LEFT_IRIS[0], 0])
+    idx = np.flatnonzero(valid)
+    face = lms if len(idx) == n else lms[idx]
+
+    ear_lr = np.stack([ear(face, L_EAR_PTS, width, height),
+                       ear(face, R_EAR_PTS, width, height)], axis=1)
+    gz = gaze_vector(face, amplify)
+    rl = roll(face)
+    euro = state.euro
+    if smoother == "oneeuro":
+        if t is None:
+            t = np.arange(n) / 30.0 + (euro[2] + 1 / 30.0 if euro is not None else 0.0)
+        tf = np.asarray(t, dtype=np.float64)[idx]
+        target = ball_target(gz, width, height)
+        raw = np.column_stack([gz, target[:, 2], rl])
+        y, dy, euro = one_euro(raw, tf, ONE_EURO_HZ / smoothing, state=euro)
+        y += dy * min(latency * PRED_GAIN, PRED_MAX_S)
+        ball = np.column_stack([(np.clip(y[:, :2], -1, 1) + 1) / 2 * [width, height],
+                                np.clip(y[:, 2], 0, 1)])
+        rl = y[:, 3]
+    else:
+        ball = smooth(ball_target(gz, width, height), 1.0 / smoothing, state.ball)
+    events, left = blink_events(ear_lr.mean(axis=1), state.cooldown)
+
+    def scatter(values, fill):
+        out = np.full((n,) + values.shape[1:], fill, dtype=values.dtype)
+        out[idx] = values
+        return out
+
+    new_state = GazeState(ball=ball[-1] if len(ball) else state.ball,
+                          cooldown=int(left), blinks=state.blinks + len(events), euro=euro)
+    return GazeSeries(
+        ear=scatter(ear_lr, np.nan),
+        gaze=scatter(gz, np.nan),
+        direction=scatter(gaze_direction(gz), len(DIRECTIONS)),
+        roll=scatter(rl, np.nan),
+        ball=scatter(ball, np.nan),
+        blink_frames=idx[events],
+        state=new_state,
+    )
@@ -0,0 +1,109 @@
+"""Gaze heatmaps: NumPy twin of ``frontend/heatmap.js``.
+
+    python -m iris_ball.heatmap gravacoes/20250101-120000-123-a1b2c3.irb --half-life 30
+
+The page accumulates where the gaze went in a fixed ``HEAT_H × HEAT_W`` grid:
+each face sample (the amplified, mirrored gaze target before any smoothing)
+adds one unit split bilinearly over its four nearest cells, and with a
+half-life older samples weigh ``2**(-age/half_life)``. :func:`accumulate`
+builds the same grid from a whole gaze array in one ``np.bincount``, and
+:func:`from_landmarks` from recorded landmarks, so a recording gives the
+heatmap the live page showed. :func:`from_report` reads the page's export.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from . import recording
+from .gaze import gaze_vector
+from .landmarks import LEFT_IRIS, expand_used
+
+HEAT_W = 64
+HEAT_H = 48
+HEAT_ALPHA = 0.55
+
+# heatmap.js Heat.buildLut: value → RGBA stops.
+_STOPS = np.array([[0, 0, 0, 0], [0, 60, 255, 0.35], [0, 220, 255, 0.6],
+                   [255, 230, 0, 0.85], [255, 40, 0, 1]])
+
+
+def accumulate(gaze, t=None, half_life=0.0, shape=(HEAT_H, HEAT_W)):
+    """(h, w) grid for gaze samples (F, 2) in [-1, 1]; NaN rows are skipped.
+
+    With ``half_life`` (s) > 0, samples are weighted by their age relative
+    to the last one, ``t`` in seconds (default 30 fps).
+    """
+    gaze = np.asarray(gaze, dtype=np.float64)
+    h, w = shape
+    ok = np.isfinite(gaze).all(axis=1)
+    if t is None:
+        t = np.arange(len(gaze)) / 30.0
+    t = np.asarray(t, dtype=np.float64)[ok]
+    gaze = gaze[ok]
+    if not len(gaze):
+        return np.zeros(shape)
+    weight = np.exp2((t - t[-1]) / half_life) if half_life > 0 else np.ones(len(gaze))
+
+    gx = (gaze[:, 0] + 1) / 2 * w - 0.5
+    gy = (gaze[:, 1] + 1) / 2 * h - 0.5
+    x0, y0 = np.floor(gx), np.floor(gy)
+    fx, fy = gx - x0, gy - y0
+    xa, xb = np.clip(x0, 0, w - 1), np.clip(x0 + 1, 0, w - 1)
+    ya, yb = np.clip(y0, 0, h - 1), np.clip(y0 + 1, 0, h - 1)
+    idx = np.concatenate([ya * w + xa, ya * w + xb, yb * w + xa, yb * w + xb]).astype(np.int64)
+    wts = np.concatenate([weight * (1 - fx) * (1 - fy), weight * fx * (1 - fy),
+                          weight * (1 - fx) * fy, weight * fx * fy])
+    return np.bincount(idx, wts, minlength=h * w).reshape(h, w)
+
+
+def from_landmarks(lms, t=None, amplify=2.6, half_life=0.0, shape=(HEAT_H, HEAT_W)):
+    """Heatmap of a (F, 478, 3) landmark sequence, all-NaN frames skipped.
+
+    ``amplify`` is the page's ``CFG.amplify`` (slider / 10).
+    """
+    lms = np.asarray(lms)
+    valid = np.isfinite(lms[:, LEFT_IRIS[0], 0])
+    gaze = np.full((len(lms), 2), np.nan)
+    gaze[valid] = gaze_vector(lms[valid], amplify)
+    return accumulate(gaze, t, half_life, shape)
+
+
+def from_report(value):
+    """Grid of the ``"heatmap"`` entry the page reports, as an (h, w) array."""
+    return np.asarray(value["data"], dtype=np.float64).reshape(value["h"], value["w"])
+
+
+def colorize(grid):
+    """(h, w, 4) uint8 RGBA with the page's colour ramp, scaled to the maximum."""
+    top = grid.max() if grid.size else 0
+    p = (np.round(grid * (255 / top)) if top > 0 else np.zeros_like(grid)) / 255
+    p = p * (len(_STOPS) - 1)
+    j = np.minimum(len(_STOPS) - 2, np.floor(p).astype(np.int64))
+    f = (p - j)[..., None]
+    rgba = _STOPS[j] + (_STOPS[j + 1] - _STOPS[j]) * f
+    rgba[..., 3] *= HEAT_ALPHA * 255
+    return np.clip(np.round(rgba), 0, 255).astype(np.uint8)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", type=Path, help=".irb landmark recording")
+    parser.add_argument("--out", type=Path, help="grid as .npy (default: next to the recording)")
+    parser.add_argument("--half-life", type=float, default=0.0, help="seconds, 0 = no decay")
+    parser.add_argument("--amplify", type=float, default=2.6)
+    args = parser.parse_args(argv)
+
+    t, sub = recording.load(args.recording)
+    grid = from_landmarks(expand_used(sub), t, args.amplify, args.half_life)
+    out = args.out or args.recording.with_suffix(".heat.npy")
+    np.save(out, grid)
+    row, col = np.unravel_index(np.argmax(grid), grid.shape)
+    print(f"{out}: {grid.sum():.1f} amostras, pico na célula ({col}, {row}) de {HEAT_W}×{HEAT_H}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
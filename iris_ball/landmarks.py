@@ -0,0 +1,31 @@
+"""MediaPipe FaceMesh landmark indices used by Iris Ball.
+
+Kept in sync with the constants at the top of ``frontend/core.js``.
+"""
+
+import numpy as np
+
+N_LANDMARKS = 478          # FaceMesh with refineLandmarks (468 + 10 iris)
+
+LEFT_IRIS  = [474, 475, 476, 477]
+RIGHT_IRIS = [469, 470, 471, 472]
+FACE_OVAL  = [10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288, 397, 365,
+              379, 378, 400, 377, 152, 148, 176, 149, 150, 136, 172, 58, 132, 93,
+              234, 127, 162, 21, 54, 103, 67, 109]
+LEFT_EYE   = [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398]
+RIGHT_EYE  = [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246]
+
+# EAR points: top1, bot1, top2, bot2, left, right
+L_EAR_PTS = [386, 374, 387, 373, 362, 263]
+R_EAR_PTS = [159, 145, 160, 144, 33, 133]
+
+# Every index the app reads, sorted; the subset a recording needs to keep.
+USED = np.unique(np.concatenate([LEFT_IRIS, RIGHT_IRIS, FACE_OVAL, LEFT_EYE, RIGHT_EYE,
+                                 L_EAR_PTS, R_EAR_PTS]))
+
+
+def expand_used(sub):
+    """(F, len(USED), 3) back to the full (F, 478, 3) layout, NaN elsewhere."""
+    full = np.full((len(sub), N_LANDMARKS, 3), np.nan, dtype=np.float32)
+    full[:, USED] = sub
+    return full
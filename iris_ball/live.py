@@ -0,0 +1,169 @@
+"""Live binary channel from the page (``frontend/live.js``).
+
+While ``cfg["live"]`` is on, the page batches one record per processed
+camera frame into windows of ~500 ms and posts them to a zero-height sink
+instance of the component (:func:`iris_ball.component.live_sink`), which
+returns every unacknowledged batch concatenated as ``bytes``. Rendering the
+sink inside an ``st.fragment`` keeps those values from rerunning the whole
+script. A batch is:
+
+    header  b"IRL1", uint32 stream, uint32 seq, float64 t0 (epoch ms),
+            uint16 n, uint8 fps, uint8 0, uint16 k, uint32 m
+    frames  n × FRAME_DTYPE (16 bytes)
+    lms     m bytes of zigzag LEB128 varints: for each frame with a face,
+            k × 3 int16 landmarks (``landmarks.USED``, quantized like .irb)
+            as deltas from the previous face in the batch (absolute first)
+
+``stream`` changes when the page reloads, which restarts ``seq``.
+"""
+
+import struct
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from .gaze import DIRECTIONS
+from .landmarks import USED
+from .recording import QSCALE
+
+MAGIC = b"IRL1"
+HEADER = struct.Struct("<4sIIdHBBHI")
+EAR_Q = 500
+FACE = 1
+
+FRAME_DTYPE = np.dtype([
+    ("dt", "<u2"),          # ms since t0
+    ("flags", "u1"),
+    ("dir", "u1"),          # index into DIRECTIONS, len(DIRECTIONS) without a face
+    ("ear", "u1", 2),       # left, right × EAR_Q
+    ("bx", "<u2"),
+    ("by", "<u2"),
+    ("bz", "u1"),           # × 255
+    ("blinks", "u1"),       # blinks registered on this frame
+    ("latency", "<u2"),     # newest capture→screen sample, ms
+    ("faces", "u1"),
+    ("pad", "u1"),
+])
+
+LIVE_HISTORY = 120          # batches kept by LiveFeed (~1 min)
+
+
+@dataclass
+class Batch:
+    stream: int
+    seq: int
+    t0: float               # epoch ms
+    fps: int
+    frames: np.ndarray      # FRAME_DTYPE records
+    lms: np.ndarray         # (faces, k, 3) float32, or None when not sent
+    size: int               # encoded bytes
+
+    @property
+    def t(self):
+        """Capture time of every frame, epoch seconds."""
+        return (self.t0 + self.frames["dt"]) / 1000.0
+
+
+def varints(buf):
+    """All zigzag LEB128 varints in ``buf`` as int64, without a Python loop."""
+    b = np.frombuffer(buf, dtype=np.uint8)
+    if not len(b):
+        return np.zeros(0, np.int64)
+    ends = np.flatnonzero(b < 0x80)
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    pos = np.arange(len(b)) - np.repeat(starts, ends - starts + 1)
+    z = np.add.reduceat((b & 0x7F).astype(np.int64) << (7 * pos), starts)
+    return (z >> 1) ^ -(z & 1)
+
+
+def parse(buf):
+    """Split a sink value into :class:`Batch` objects, oldest first."""
+    buf = memoryview(buf)
+    out, off = [], 0
+    while off + HEADER.size <= len(buf):
+        begin = off
+        magic, stream, seq, t0, n, fps, _, k, m = HEADER.unpack_from(buf, off)
+        if magic != MAGIC:
+            raise ValueError("lote ao vivo inválido")
+        off += HEADER.size
+        frames = np.frombuffer(buf, dtype=FRAME_DTYPE, count=n, offset=off)
+        off += n * FRAME_DTYPE.itemsize
+        lms = None
+        if k:
+            if k != len(USED):
+                raise ValueError(f"lote com {k} pontos, esperado {len(USED)}")
+            q = varints(buf[off:off + m]).reshape(-1, k, 3)
+            lms = np.cumsum(q, axis=0).astype(np.float32) * (1 / QSCALE)
+        off += m
+        out.append(Batch(stream, seq, t0, fps, frames, lms, off - begin))
+    return out
+
+
+class LiveFeed:
+    """Running totals and a bounded history built from sink values.
+
+    Keep one per session (``st.session_state``). :meth:`ingest` skips batches
+    it has already seen, since the sink resends until acknowledged; the ones
+    it did add are in ``fresh`` until the next call.
+    """
+
+    def __init__(self, history=LIVE_HISTORY):
+        self.stream = None
+        self.seq = -1
+        self.batches = deque(maxlen=history)
+        self.frames = 0
+        self.blinks = 0
+        self.bytes = 0
+        self.last_lms = None
+        self.fresh = []
+
+    def ingest(self, value):
+        """Add the new batches in ``value``; returns the ack for the sink."""
+        self.fresh = []
+        if not value:
+            return None
+        for batch in parse(value):
+            if batch.stream != self.stream:
+                self.stream, self.seq = batch.stream, -1
+            if batch.seq <= self.seq:
+                continue
+            self.seq = batch.seq
+            self.batches.append(batch)
+            self.fresh.append(batch)
+            self.frames += len(batch.frames)
+            self.blinks += int(batch.frames["blinks"].sum())
+            self.bytes += batch.size
+            if batch.lms is not None and len(batch.lms):
+                self.last_lms = batch.lms[-1]
+        return {"stream": self.stream, "seq": self.seq}
+
+    def recent(self, seconds=10):
+        """Frame records of the batches started in the last ``seconds``, and
+        the time they span (s)."""
+        if not self.batches:
+            return np.zeros(0, FRAME_DTYPE), 0.0
+        last = self.batches[-1]
+        keep = [b for b in self.batches if last.t0 - b.t0 < seconds * 1000]
+        end = last.t0 + (int(last.frames["dt"][-1]) if len(last.frames) else 0)
+        return np.concatenate([b.frames for b in keep]), (end - keep[0].t0) / 1000
+
+    def summary(self, seconds=10):
+        """Blink rate, direction shares, EAR and latency over the last ``seconds``."""
+        f, span = self.recent(seconds)
+        span = max(span, 1.0)
+        face = (f["flags"] & FACE) != 0
+        dirs = np.bincount(f["dir"][face], minlength=len(DIRECTIONS))[:len(DIRECTIONS)]
+        lat = f["latency"][f["latency"] > 0]
+        tracking = bool(len(f) and face[-1])
+        return {
+            "tracking" : tracking,
+            "direction": DIRECTIONS[f["dir"][-1]] if tracking else "",
+            "faces"    : int(f["faces"][-1]) if len(f) else 0,
+            "blinkRate": float(f["blinks"].sum()) / span * 60,
+            "dirShare" : dict(zip(DIRECTIONS, (dirs / max(1, dirs.sum())).tolist())),
+            "ear"      : (f["ear"][face].mean(axis=1) / EAR_Q).tolist(),
+            "latencyP50": float(np.percentile(lat, 50)) if len(lat) else None,
+            "latencyP95": float(np.percentile(lat, 95)) if len(lat) else None,
+            "fps"      : self.batches[-1].fps if self.batches else 0,
+        }
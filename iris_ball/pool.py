@@ -0,0 +1,240 @@
+"""Process-pool FaceMesh backend for many concurrent server sessions.
+
+With one FaceMesh per session thread (``server.FaceMeshPool``) every stream
+shares the GIL and, in practice, one core. :class:`InferencePool` runs the
+models in worker processes instead:
+
+* frames are written straight into a shared-memory ring of fixed slots, and
+  only the slot index crosses the process boundary, so 640×480×3 arrays are
+  never pickled;
+* each worker builds its engine once and keeps it for its lifetime;
+* landmarks come back through a second shared block as ``(faces, 478, 3)``
+  float32, copied out before the slot is freed;
+* when every slot is in flight :meth:`InferencePool.submit` waits (up to a
+  timeout) or refuses, which is the backpressure the session's one-slot
+  ``LatestFrame`` turns into dropped stale frames;
+* a worker whose engine fails to build, or that dies, marks the pool failed:
+  every pending future gets the error and later submits raise.
+
+The pool duck-types ``FaceMeshPool`` (``acquire``/``release``), so
+``server.IrisProcessor`` works with either.
+"""
+
+import atexit
+import concurrent.futures
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+from multiprocessing.shared_memory import SharedMemory
+
+import cv2
+import numpy as np
+
+from .facemesh import NO_FACES, FaceMesh
+from .landmarks import N_LANDMARKS
+
+FRAME_SHAPE = (480, 640, 3)
+
+# Shared graphs see interleaved streams, so tracking between calls is off.
+DEFAULT_ENGINE = partial(FaceMesh, static=True)
+
+
+class PoolBusy(Exception):
+    """Every slot is in flight; the caller should drop the frame."""
+
+
+def _worker(engine, max_faces, frames_name, lms_name, shape, slots, tasks, results):
+    frames = SharedMemory(name=frames_name)
+    lms = SharedMemory(name=lms_name)
+    frame_buf = np.ndarray((slots, *shape), np.uint8, frames.buf)
+    lms_buf = np.ndarray((slots, max_faces, N_LANDMARKS, 3), np.float32, lms.buf)
+    try:
+        mesh = engine(max_faces=max_faces)
+    except Exception as exc:                      # surfaced by the parent on submit
+        results.put((None, -1, f"{type(exc).__name__}: {exc}"))
+        return
+    try:
+        while (slot := tasks.get()) is not None:
+            try:
+                faces = mesh.process(frame_buf[slot])[:max_faces]
+                lms_buf[slot, :len(faces)] = faces
+                results.put((slot, len(faces), None))
+            except Exception as exc:
+                results.put((slot, -1, f"{type(exc).__name__}: {exc}"))
+    finally:
+        del frame_buf, lms_buf
+        frames.close()
+        lms.close()
+
+
+class _PooledMesh:
+    """What ``acquire`` hands a session: a FaceMesh-like front for the pool."""
+
+    backend = "process"
+
+    def __init__(self, pool, timeout):
+        self.pool = pool
+        self.timeout = timeout
+
+    def process(self, rgb, timestamp_ms=None):
+        try:
+            fut = self.pool.submit(rgb, timeout=self.timeout)
+        except PoolBusy:
+            return NO_FACES
+        try:
+            return fut.result(timeout=self.pool.result_timeout)
+        except concurrent.futures.TimeoutError:
+            self.pool.check_workers()                 # a dead worker never answers
+            raise
+
+
+class InferencePool:
+    """FaceMesh in ``workers`` processes fed through a shared-memory ring.
+
+    Sessions wait at most ``result_timeout`` seconds for a frame's landmarks;
+    past that they check the workers and raise ``TimeoutError``.
+    """
+
+    def __init__(self, workers=None, slots=None, max_faces=1, shape=FRAME_SHAPE,
+                 engine=DEFAULT_ENGINE, result_timeout=10.0):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.slots = slots or 2 * self.workers
+        self.shape = tuple(shape)
+        self.max_faces = max_faces
+        self.result_timeout = result_timeout
+        self.error = None
+        self.busy = 0
+
+        self._frames_shm = SharedMemory(create=True, size=self.slots * int(np.prod(shape)))
+        self._lms_shm = SharedMemory(create=True,
+                                     size=self.slots * max_faces * N_LANDMARKS * 3 * 4)
+        self._frame_buf = np.ndarray((self.slots, *shape), np.uint8, self._frames_shm.buf)
+        self._lms_buf = np.ndarray((self.slots, max_faces, N_LANDMARKS, 3), np.float32,
+                                   self._lms_shm.buf)
+
+        self._free = queue.Queue()
+        for slot in range(self.slots):
+            self._free.put(slot)
+        self._pending = {}
+        self._lock = threading.Lock()
+
+        ctx = mp.get_context("spawn")
+        self._tasks = ctx.SimpleQueue()
+        self._results = ctx.SimpleQueue()
+        self._procs = [
+            ctx.Process(target=_worker, daemon=True, name=f"iris-pool-{i}",
+                        args=(engine, max_faces, self._frames_shm.name, self._lms_shm.name,
+                              self.shape, self.slots, self._tasks, self._results))
+            for i in range(self.workers)
+        ]
+        for p in self._procs:
+            p.start()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="iris-pool-results",
+                                            daemon=True)
+        self._dispatcher.start()
+        self._closed = False
+        atexit.register(self.close)
+
+    # ── Session side ─────────────────────────────────────────────────────────
+    def submit(self, rgb, timeout=None):
+        """Queue one RGB frame; returns a Future of ``(faces, 478, 3)``.
+
+        Waits up to ``timeout`` seconds for a free slot (``None`` waits
+        forever, ``0`` never) and raises :class:`PoolBusy` otherwise.
+        """
+        if self.error:
+            raise RuntimeError(f"inference worker failed: {self.error}")
+        try:
+            slot = self._free.get(timeout=timeout) if timeout != 0 else self._free.get_nowait()
+        except queue.Empty:
+            self.busy += 1
+            raise PoolBusy from None
+        dst = self._frame_buf[slot]
+        if rgb.shape == self.shape:
+            np.copyto(dst, rgb)
+        else:                         # landmarks are normalized, any size works
+            cv2.resize(rgb, self.shape[1::-1], dst=dst, interpolation=cv2.INTER_AREA)
+        fut = Future()
+        with self._lock:
+            if self.error:                # failed while we copied; nobody would answer
+                self._free.put(slot)
+                raise RuntimeError(f"inference worker failed: {self.error}")
+            self._pending[slot] = fut
+        self._tasks.put(slot)
+        return fut
+
+    def infer(self, rgb, timeout=None):
+        return self.submit(rgb, timeout).result()
+
+    def acquire(self, timeout=1.0):
+        return _PooledMesh(self, timeout)
+
+    def release(self, mesh):
+        pass
+
+    @property
+    def in_flight(self):
+        return self.slots - self._free.qsize()
+
+    def check_workers(self):
+        """Fail the pool if a worker process has exited; returns ``self.error``."""
+        if not self._closed and not self.error:
+            dead = [p for p in self._procs if not p.is_alive()]
+            if dead:
+                self._fail(f"{dead[0].name} exited with code {dead[0].exitcode}")
+        return self.error
+
+    # ── Results ──────────────────────────────────────────────────────────────
+    def _fail(self, err):
+        """Mark the pool failed and hand ``err`` to every pending future."""
+        with self._lock:
+            self.error = self.error or err
+            pending, self._pending = self._pending, {}
+        for slot, fut in pending.items():
+            self._free.put(slot)
+            fut.set_exception(RuntimeError(f"inference worker failed: {err}"))
+
+    def _dispatch(self):
+        while (msg := self._results.get()) is not None:
+            slot, n, err = msg
+            if slot is None:
+                self._fail(err)
+                continue
+            with self._lock:
+                fut = self._pending.pop(slot, None)
+            if fut is None:               # already failed by _fail
+                continue
+            out = None if err else self._lms_buf[slot, :n].copy()
+            self._free.put(slot)
+            if err:
+                fut.set_exception(RuntimeError(err))
+            else:
+                fut.set_result(out)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._procs:
+            self._tasks.put(None)
+        deadline = time.monotonic() + 5
+        for p in self._procs:
+            p.join(max(0.0, deadline - time.monotonic()))
+            if p.is_alive():
+                p.terminate()
+        self._results.put(None)
+        self._dispatcher.join(timeout=1)
+        del self._frame_buf, self._lms_buf
+        for shm in (self._frames_shm, self._lms_shm):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
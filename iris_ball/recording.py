@@ -0,0 +1,145 @@
+"""Compact binary landmark recordings (``.irb``).
+
+The page records only the landmarks the app reads (``landmarks.USED``) and
+streams them to Python in chunks through the component value; see
+``frontend/recorder.js``. A file is a small header followed by fixed-size
+little-endian frame records:
+
+    header  b"IRB1", uint16 n, n × uint16 landmark index
+    record  uint32 t (ms since the recording started), uint16 flags,
+            n × 3 int16 x, y, z quantized by QSCALE (zero when no face)
+
+Fixed-size records make decoding a single ``np.frombuffer``. At 30 fps a
+minute of tracking is about 0.8 MB.
+"""
+
+import base64
+import re
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from .landmarks import N_LANDMARKS, USED
+
+MAGIC = b"IRB1"
+QSCALE = 8192               # 1/8192 of the frame (~0.08 px at 640), range ±4
+FACE = 1                    # flags bit: landmarks present
+
+RECORDINGS_DIR = Path("gravacoes")
+
+# Recording ids as recorder.js makes them: UTC time to the millisecond plus a
+# random suffix, e.g. 20250101-120000-123-a1b2c3.
+REC_ID = re.compile(r"\d{8}-\d{6}-\d{3}-[0-9a-f]{6}")
+
+
+def record_dtype(n):
+    return np.dtype([("t", "<u4"), ("flags", "<u2"), ("lms", "<i2", (n, 3))])
+
+
+def header(indices=USED):
+    indices = np.asarray(indices, dtype="<u2")
+    return MAGIC + struct.pack("<H", len(indices)) + indices.tobytes()
+
+
+def parse_header(buf):
+    """``(indices, offset of the first record)``."""
+    if bytes(buf[:4]) != MAGIC:
+        raise ValueError("não é uma gravação .irb")
+    (n,) = struct.unpack_from("<H", buf, 4)
+    indices = np.frombuffer(buf, dtype="<u2", count=n, offset=6).astype(np.int64)
+    return indices, 6 + 2 * n
+
+
+def encode(t, lms, indices=USED):
+    """Records for ``t`` (s) and ``lms`` (F, len(indices), 3), NaN rows = no face."""
+    t, lms = np.asarray(t), np.asarray(lms)
+    rec = np.zeros(len(t), dtype=record_dtype(len(indices)))
+    rec["t"] = np.round((t - t[0]) * 1000) if len(t) else 0
+    face = np.isfinite(lms[:, 0, 0])
+    rec["flags"] = np.where(face, FACE, 0)
+    q = np.round(np.nan_to_num(lms) * QSCALE)
+    rec["lms"] = np.clip(q, -32768, 32767)
+    return rec.tobytes()
+
+
+def decode(buf):
+    """``(t, lms)`` with t in seconds and lms (F, len(USED), 3) float32, NaN without a face."""
+    buf = memoryview(buf)
+    indices, offset = parse_header(buf)
+    dt = record_dtype(len(indices))
+    n = (len(buf) - offset) // dt.itemsize           # a torn last record is dropped
+    rec = np.frombuffer(buf, dtype=dt, count=n, offset=offset)
+    lms = rec["lms"].astype(np.float32) * (1 / QSCALE)
+    lms[(rec["flags"] & FACE) == 0] = np.nan
+    if not np.array_equal(indices, USED):
+        full = np.full((n, N_LANDMARKS, 3), np.nan, dtype=np.float32)
+        full[:, indices] = lms
+        lms = full[:, USED]
+    return rec["t"] / 1000.0, lms
+
+
+def load(path):
+    return decode(Path(path).read_bytes())
+
+
+def save(path, t, lms):
+    Path(path).write_bytes(header() + encode(t, lms))
+
+
+class ChunkWriter:
+    """Appends the chunks of one page recording to ``<directory>/<id>.irb``.
+
+    The page resends every chunk until it is acknowledged, so chunks whose
+    ``seq`` was already written are ignored. ``rec_id`` comes from the page,
+    so anything but a ``REC_ID`` is refused, and the file must be new: an
+    existing one is never appended to.
+    """
+
+    def __init__(self, directory, rec_id, indices):
+        if not isinstance(rec_id, str) or not REC_ID.fullmatch(rec_id):
+            raise ValueError(f"id de gravação inválido: {rec_id!r}")
+        directory = Path(directory)
+        self.path = directory / f"{rec_id}.irb"
+        if self.path.resolve().parent != directory.resolve():
+            raise ValueError(f"id de gravação inválido: {rec_id!r}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.indices = indices
+        self.next = 0
+        self.frames = 0
+        self.created = False
+
+    def write(self, chunks):
+        dt = record_dtype(len(self.indices))
+        for chunk in sorted(chunks, key=lambda c: c["seq"]):
+            if chunk["seq"] < self.next:
+                continue
+            data = base64.b64decode(chunk["data"])
+            with open(self.path, "ab" if self.created else "xb") as f:
+                if not self.created:
+                    f.write(header(self.indices))
+                    self.created = True
+                f.write(data)
+            self.frames += len(data) // dt.itemsize
+            self.next = chunk["seq"] + 1
+        return self.next - 1
+
+
+def receive(report, writers, directory=RECORDINGS_DIR):
+    """Store the ``"recording"`` part of a component value.
+
+    ``writers`` persists across reruns (e.g. in ``st.session_state``).
+    Returns the ack to pass back to the page, or None. Raises ValueError for
+    an id that is not a ``REC_ID``.
+    """
+    rec = report.get("recording")
+    if not rec:
+        return None
+    writer = writers.get(rec["id"])
+    if writer is None:
+        writer = writers[rec["id"]] = ChunkWriter(directory, rec["id"], rec["indices"])
+    return {"id": rec["id"], "seq": writer.write(rec["chunks"])}
+
+
+def list_recordings(directory=RECORDINGS_DIR):
+    return sorted(Path(directory).glob("*.irb"), reverse=True)
@@ -0,0 +1,666 @@
+"""Annotated replay videos rendered offline, like the live page.
+
+    python -m iris_ball.replay gravacao.mp4 --landmarks resultados/gravacao.parts \\
+        --out gravacao_iris.mp4 --workers 8
+
+NumPy/OpenCV port of the three canvas layers in ``frontend/core.js``:
+mirrored frame with mesh and iris overlay and ground shadow, the DOF blur
+(``drawBlurredBg``, "filter" backend) with its vignette, and the ball layer
+with shockwaves, trail, glow and the shaded sphere (``drawShocks``,
+``drawTrail``, ``drawGlow``, ``drawSphere``). Gradients follow the canvas
+two-circle radial gradient, and sprites are cached per quantized radius and
+colour as in ``sprites.js``.
+
+The landmarks come from ``python -m iris_ball.batch --keep-parts`` (a
+``.parts`` directory) or any ``.npz`` with ``t`` and ``lms`` in seconds of
+the video. Page recordings (``.irb``) are not accepted: their times start
+when the recording did and no video is saved with them. The ball
+path, directions, roll and blinks are computed once for the whole stream
+with :func:`iris_ball.gaze.analyze`. The only other state (colour lerp,
+blink spring, trail, shockwaves) fades within about a second. So the video
+is cut at keyframes into chunks that a process pool renders independently,
+each after a landmark-only warm-up of ``--warmup`` frames. The chunks are
+then joined with ``av`` without re-encoding. Replays run at the page's
+30 Hz simulation step, one step per video frame. Audio is not copied.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import lru_cache
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from . import gaze
+from .batch import decode_range, start_pts
+from .gaze import DIR_COLORS, DIRECTIONS
+from .landmarks import FACE_OVAL, LEFT_EYE, LEFT_IRIS, RIGHT_EYE, RIGHT_IRIS, USED, expand_used
+
+# Sidebar defaults, as in core.js CFG.
+DEFAULT_CFG = {
+    "ballRadius" : 52,
+    "smoothing"  : 7,
+    "smoother"   : "oneeuro",
+    "amplify"    : 2.6,
+    "popEffect"  : 35,
+    "blurAmount" : 9,
+    "ballColor"  : "#2277ff",
+    "blinkBoost" : 0.6,
+    "orientColor": True,
+    "trailOn"    : True,
+    "shockOn"    : True,
+    "showMesh"   : True,
+    "showIris"   : True,
+    "showShadow" : True,
+    "showGlow"   : True,
+}
+
+CHUNK_SECONDS = 10.0
+WARMUP_FRAMES = 45          # 1.5 s at 30 Hz: colour lerp, spring and trail have settled
+BLUR_COVER = 0.92           # blur.js
+
+
+def hex_rgb(h):
+    return np.array([int(h[1:3], 16), int(h[3:5], 16), int(h[5:7], 16)], dtype=np.float32)
+
+
+def _quant_r(r):
+    return max(2, round(r / 2) * 2)
+
+
+def _quant_rgb(c):
+    return tuple(int(min(255, round(v / 8) * 8)) for v in c)
+
+
+# ── Canvas primitives ─────────────────────────────────────────────────────────
+# Layers are float32 premultiplied RGBA in [0, 1]; pixel centres sit at +0.5
+# like the canvas.
+
+def _grid(h, w, x0=0, y0=0):
+    ys, xs = np.mgrid[y0:y0 + h, x0:x0 + w].astype(np.float32)
+    return xs + 0.5, ys + 0.5
+
+
+def _gradient_t(xs, ys, x0, y0, r0, x1, y1, r1):
+    """``t`` of createRadialGradient(x0,y0,r0, x1,y1,r1) per pixel, NaN if undefined."""
+    cdx, cdy, dr = x1 - x0, y1 - y0, r1 - r0
+    pdx, pdy = xs - x0, ys - y0
+    a = cdx * cdx + cdy * cdy - dr * dr
+    b = pdx * cdx + pdy * cdy + r0 * dr
+    c = pdx * pdx + pdy * pdy - r0 * r0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if abs(a) < 1e-9:
+            t = c / (2 * b)
+        else:
+            sq = np.sqrt(b * b - a * c)
+            t1, t2 = (b + sq) / a, (b - sq) / a
+            hi, lo = np.maximum(t1, t2), np.minimum(t1, t2)
+            t = np.where(r0 + hi * dr >= 0, hi, lo)
+        return np.where(r0 + t * dr >= 0, t, np.nan)
+
+
+def _gradient(t, stops):
+    """Premultiplied RGBA for gradient positions ``t`` and ``[(offset, rgba)]``."""
+    offs = [o for o, _ in stops]
+    cols = np.array([c for _, c in stops], dtype=np.float32)
+    tc = np.clip(np.nan_to_num(t, nan=0.0), 0, 1)
+    out = np.stack([np.interp(tc, offs, cols[:, k]) for k in range(4)], axis=-1)
+    out[..., :3] *= out[..., 3:] / 255
+    out[np.isnan(t)] = 0
+    return out.astype(np.float32)
+
+
+def _rgba(r, g, b, a=1.0):
+    return (float(r), float(g), float(b), float(a))
+
+
+def _disc(xs, ys, cx, cy, r):
+    return np.clip(r - np.hypot(xs - cx, ys - cy) + 0.5, 0, 1)
+
+
+def _ring(xs, ys, cx, cy, r, width):
+    d = np.abs(np.hypot(xs - cx, ys - cy) - r)
+    return np.clip(width / 2 + 0.5 - d, 0, min(1.0, width))
+
+
+def _ellipse(xs, ys, cx, cy, rx, ry):
+    d = np.hypot((xs - cx) / rx, (ys - cy) / ry)
+    return np.clip((1 - d) * min(rx, ry) + 0.5, 0, 1)
+
+
+def _over(dst, src, alpha=1.0):
+    """Source-over of premultiplied ``src`` onto ``dst`` (RGBA, or opaque RGB) in place."""
+    if alpha != 1.0:
+        src = src * alpha
+    dst *= 1 - src[..., 3:]
+    dst += src[..., :dst.shape[-1]]
+
+
+def _fill(dst, cov, paint):
+    """Fill coverage ``cov`` with a constant premultiplied colour or a paint image."""
+    if isinstance(paint, tuple):
+        r, g, b, a = paint
+        paint = np.array([r / 255 * a, g / 255 * a, b / 255 * a, a], dtype=np.float32)
+    _over(dst, paint * cov[..., None])
+
+
+def _blit(layer, sprite, cx, cy, w, h, alpha=1.0, angle=0.0):
+    """drawImage of ``sprite`` scaled to w×h, centred at (cx, cy), rotated by ``angle``."""
+    if w < 0.5 or h < 0.5 or alpha <= 0:
+        return None
+    cos, sin = np.cos(angle), np.sin(angle)
+    ex = (abs(cos) * w + abs(sin) * h) / 2
+    ey = (abs(sin) * w + abs(cos) * h) / 2
+    H, W = layer.shape[:2]
+    x0, y0 = max(0, int(np.floor(cx - ex))), max(0, int(np.floor(cy - ey)))
+    x1, y1 = min(W, int(np.ceil(cx + ex))), min(H, int(np.ceil(cy + ey)))
+    if x1 <= x0 or y1 <= y0:
+        return None
+    sh, sw = sprite.shape[:2]
+    sx, sy = w / sw, h / sh
+    # sprite centre → (cx, cy), in pixel-centre index space for warpAffine
+    a = np.array([[cos * sx, -sin * sy], [sin * sx, cos * sy]])
+    c = np.array([cx - x0, cy - y0]) - a @ np.array([sw / 2, sh / 2])
+    m = np.hstack([a, (c + a @ [0.5, 0.5] - 0.5)[:, None]]).astype(np.float32)
+    patch = cv2.warpAffine(sprite, m, (x1 - x0, y1 - y0), flags=cv2.INTER_LINEAR,
+                           borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+    _over(layer[y0:y1, x0:x1], patch, alpha)
+    return x0, y0, x1, y1
+
+
+# ── Sprites ───────────────────────────────────────────────────────────────────
+# Same keys and shapes as core.js, painted once and reused.
+
+TRAIL_SPRITE_R = 64
+GLOW_SPRITE_R = 128
+
+
+@lru_cache(maxsize=64)
+def trail_sprite(rgb):
+    R = TRAIL_SPRITE_R
+    xs, ys = _grid(2 * R, 2 * R)
+    t = _gradient_t(xs, ys, R, R, 0, R, R, R)
+    return _gradient(t, [(0, _rgba(*rgb, 0.8)), (0.5, _rgba(*rgb, 0.3)), (1, _rgba(*rgb, 0))])
+
+
+@lru_cache(maxsize=256)
+def glow_sprite(rgb, zq):
+    R = GLOW_SPRITE_R
+    alpha = 0.22 + zq * 0.18
+    inner = R * 0.5 / (2.2 + zq * 1.4)
+    xs, ys = _grid(2 * R, 2 * R)
+    t = _gradient_t(xs, ys, R, R, inner, R, R, R)
+    paint = _gradient(t, [(0, _rgba(*rgb, round(alpha, 2))),
+                          (0.4, _rgba(*rgb, round(alpha * 0.4, 2))),
+                          (1, _rgba(*rgb, 0))])
+    out = np.zeros((2 * R, 2 * R, 4), np.float32)
+    _fill(out, _disc(xs, ys, R, R, R), paint)
+    return out
+
+
+@lru_cache(maxsize=256)
+def sphere_sprite(rq, rgb):
+    """paintSphere: ambient, diffuse, rim, Fresnel and clipped highlights."""
+    cr, cg, cb = rgb
+    r = rq
+    c = rq + int(np.ceil(rq * 0.03)) + 2
+    xs, ys = _grid(2 * c, 2 * c)
+    out = np.zeros((2 * c, 2 * c, 4), np.float32)
+    body = _disc(xs, ys, c, c, r)
+    lo = lambda v, k: max(0, v - k)                                 # noqa: E731
+    hi = lambda v, k: min(255, v + k)                               # noqa: E731
+
+    _fill(out, body, _rgba(lo(cr, 100), lo(cg, 100), lo(cb, 100)))
+
+    lx, ly = c - r * 0.55, c - r * 0.55
+    t = _gradient_t(xs, ys, lx, ly, r * 0.01, c, c, r * 1.05)
+    _fill(out, body, _gradient(t, [
+        (0,    _rgba(hi(cr, 55), hi(cg, 55), hi(cb, 55))),
+        (0.45, _rgba(cr, cg, cb)),
+        (0.75, _rgba(lo(cr, 60), lo(cg, 60), lo(cb, 60))),
+        (1,    _rgba(lo(cr, 110), lo(cg, 110), lo(cb, 110))),
+    ]))
+
+    t = _gradient_t(xs, ys, c + r * 0.4, c + r * 0.4, r * 0.3, c, c, r * 1.02)
+    _fill(out, body, _gradient(t, [
+        (0,    _rgba(0, 0, 0, 0)),
+        (0.7,  _rgba(0, 0, 0, 0)),
+        (0.88, _rgba(lo(cr, 30), lo(cg, 10), hi(cb, 80), 0.55)),
+        (1,    _rgba(0, 0, 0, 0)),
+    ]))
+
+    _fill(out, _ring(xs, ys, c, c, r, r * 0.045), _rgba(200, 220, 255, 0.35))
+
+    # Highlights, clipped to the ball
+    sx1, sy1 = lx + r * 0.06, ly + r * 0.06
+    t = _gradient_t(xs, ys, sx1, sy1, 0, sx1, sy1, r * 0.42)
+    _fill(out, body * _disc(xs, ys, sx1, sy1, r * 0.42), _gradient(t, [
+        (0, _rgba(255, 255, 255, 0.98)), (0.18, _rgba(255, 255, 255, 0.72)),
+        (0.45, _rgba(255, 255, 255, 0.18)), (1, _rgba(255, 255, 255, 0)),
+    ]))
+    t = _gradient_t(xs, ys, lx + r * 0.1, ly + r * 0.1, 0, lx, ly, r * 0.75)
+    _fill(out, body * _disc(xs, ys, lx, ly, r * 0.75), _gradient(t, [
+        (0, _rgba(255, 255, 255, 0.35)), (0.5, _rgba(255, 255, 255, 0.08)),
+        (1, _rgba(255, 255, 255, 0)),
+    ]))
+    tx, ty = lx + r * 0.02, ly + r * 0.02
+    t = _gradient_t(xs, ys, tx, ty, 0, tx, ty, r * 0.12)
+    _fill(out, body * _disc(xs, ys, tx, ty, r * 0.12), _gradient(t, [
+        (0, _rgba(255, 255, 255, 1)), (0.4, _rgba(255, 255, 255, 0.6)),
+        (1, _rgba(255, 255, 255, 0)),
+    ]))
+    return out
+
+
+@lru_cache(maxsize=128)
+def ao_sprite(rq):
+    w, h = int(np.ceil(rq * 1.4)) + 2, int(np.ceil(rq * 0.44)) + 2
+    ex, ey = w / 2, h / 2
+    xs, ys = _grid(h, w)
+    t = _gradient_t(xs, ys, ex, ey, rq * 0.1, ex, ey, rq * 0.7)
+    out = np.zeros((h, w, 4), np.float32)
+    _fill(out, _ellipse(xs, ys, ex, ey, rq * 0.7, rq * 0.22),
+          _gradient(t, [(0, _rgba(0, 0, 0, 0.28)), (1, _rgba(0, 0, 0, 0))]))
+    return out
+
+
+@lru_cache(maxsize=8)
+def vignette(w, h):
+    xs, ys = _grid(h, w)
+    t = _gradient_t(xs, ys, w / 2, h / 2, h * 0.2, w / 2, h / 2, h * 0.85)
+    return _gradient(t, [(0, _rgba(0, 0, 0, 0)), (1, _rgba(0, 0, 10, 0.72))])
+
+
+@lru_cache(maxsize=8)
+def blur_weights(w, h):
+    """Blur layer (BLUR_COVER blurred frame, vignette over it) composited on the
+    video, folded into ``vig + blurred*k_blur + video*k_video``."""
+    v = vignette(w, h)
+    va = v[..., 3:]
+    k_blur = BLUR_COVER * (1 - va)
+    return v[..., :3], k_blur, 1 - va - k_blur
+
+
+# ── Scene ─────────────────────────────────────────────────────────────────────
+
+@dataclass
+class Track:
+    """Per-frame inputs of the replay, NaN/invalid where no face was found."""
+
+    t: np.ndarray            # (F,) frame time, s
+    lms: np.ndarray          # (F, len(USED), 3) landmarks the overlays read
+    valid: np.ndarray        # (F,) bool
+    ball: np.ndarray         # (F, 3) smoothed bx, by, bz
+    direction: np.ndarray    # (F,) index into DIRECTIONS
+    roll: np.ndarray         # (F,)
+    blink: np.ndarray        # (F,) bool
+
+    def slice(self, a, b):
+        return Track(*(getattr(self, f)[a:b] for f in self.__dataclass_fields__))
+
+
+class Scene:
+    """The per-frame state of core.js (onLandmarks + simStep) and its drawing."""
+
+    def __init__(self, cfg, width, height):
+        self.cfg = {**DEFAULT_CFG, **(cfg or {})}
+        self.w, self.h = width, height
+        self.color = hex_rgb(self.cfg["ballColor"])
+        self.target = self.color.copy()
+        self.direction = gaze.CENTER
+        self.ball = np.array([width / 2, height / 2, 0.0])
+        self.prev = self.ball[:2].copy()
+        self.roll = 0.0
+        self.lms = None
+        self.scale, self.scale_v = 1.0, 0.0
+        self.shocks = []          # [x, y, r, max_r, alpha, rgb]
+        self.trail = []           # [x, y, r, alpha, rgb]
+
+    def radius(self):
+        cfg = self.cfg
+        return cfg["ballRadius"] * (1 + self.ball[2] * cfg["popEffect"] / 100) * self.scale
+
+    def step(self, track, i):
+        """Advance one frame: landmarks of frame ``i`` then one SIM_DT step."""
+        cfg = self.cfg
+        if track.valid[i]:
+            if track.blink[i]:
+                self.scale_v = 0.55 * cfg["blinkBoost"] + 0.05
+                if cfg["shockOn"]:
+                    self.shocks.append([*self.ball[:2], 0.0, cfg["ballRadius"] * 3.5, 0.9,
+                                        self.color.copy()])
+            self.roll = float(track.roll[i])
+            d = int(track.direction[i])
+            if d != self.direction:
+                self.direction = d
+                if cfg["orientColor"]:
+                    self.target = hex_rgb(DIR_COLORS.get(DIRECTIONS[d], cfg["ballColor"]))
+            self.ball = track.ball[i].astype(np.float64)
+            self.lms = track.lms[i]
+        else:
+            self.lms = None
+
+        # simStep
+        self.color = np.round(self.color + (self.target - self.color) * 0.08)
+        self.scale += self.scale_v
+        self.scale_v += (1.0 - self.scale) * 0.28
+        self.scale_v *= 0.72
+        self.scale = max(0.5, self.scale)
+
+        speed = np.hypot(*(self.ball[:2] - self.prev))
+        self.prev = self.ball[:2].copy()
+        if speed > 1.5 and cfg["trailOn"]:
+            self.trail.append([*self.ball[:2], self.radius() * 0.65, 0.55, self.color.copy()])
+            if len(self.trail) > 22:
+                self.trail.pop(0)
+            for p in self.trail:
+                p[3] *= 0.80
+                p[2] *= 0.94
+            self.trail = [p for p in self.trail if p[3] > 0.03]
+
+        self.shocks = [s for s in self.shocks if s[4] > 0.01]
+        for s in self.shocks:
+            s[2] += (s[3] - s[2]) * 0.12
+            s[4] *= 0.84
+
+    # ── Drawing ──────────────────────────────────────────────────────────────
+    def render(self, rgb):
+        """Composite the three layers over mirrored ``rgb``; returns uint8 RGB."""
+        cfg, w, h = self.cfg, self.w, self.h
+        video = cv2.flip(rgb, 1)
+        bx, by, bz = self.ball
+        r = self.radius()
+        if self.lms is not None:
+            self._draw_mesh(video)
+        out = video.astype(np.float32) * (1 / 255)       # opaque layers stay RGB
+        self._draw_shadow(out, bx, by, r, bz)
+
+        blur_px = cfg["blurAmount"] * (0.2 + bz * 0.8)
+        if blur_px > 0:
+            vig, k_blur, k_video = blur_weights(w, h)
+            blurred = cv2.GaussianBlur(out, (0, 0), blur_px * 0.4)
+            out *= k_video
+            out += blurred * k_blur
+            out += vig
+
+        # The ball layer is only composited where something was drawn.
+        ball = np.zeros((h, w, 4), np.float32)
+        boxes = self._draw_shocks(ball)
+        for x, y, tr, a, col in self.trail:
+            boxes.append(_blit(ball, trail_sprite(_quant_rgb(col)), x, y, 2 * tr, 2 * tr, a))
+        if cfg["showGlow"]:
+            zq = round(bz * 20) / 20
+            glow_r = r * (2.2 + bz * 1.4)
+            boxes.append(_blit(ball, glow_sprite(_quant_rgb(self.color), zq), bx, by,
+                               2 * glow_r, 2 * glow_r))
+        rq = _quant_r(r)
+        k = r / rq
+        sprite = sphere_sprite(rq, _quant_rgb(self.color))
+        sw = sprite.shape[1] * k
+        boxes.append(_blit(ball, sprite, bx, by, sw, sw, angle=self.roll * 0.18))
+        ao = ao_sprite(rq)
+        boxes.append(_blit(ball, ao, bx, by + r * 0.82, ao.shape[1] * k, ao.shape[0] * k))
+        boxes = [b for b in boxes if b is not None]
+        if boxes:
+            x0, y0 = min(b[0] for b in boxes), min(b[1] for b in boxes)
+            x1, y1 = max(b[2] for b in boxes), max(b[3] for b in boxes)
+            _over(out[y0:y1, x0:x1], ball[y0:y1, x0:x1])
+        np.clip(out, 0, 1, out=out)
+        return (out * 255 + 0.5).astype(np.uint8)
+
+    def _draw_mesh(self, video):
+        # As in core.js the overlay uses raw (unmirrored) landmark x.
+        pos = {i: k for k, i in enumerate(USED)}
+        pts = self.lms[:, :2] * (self.w, self.h)
+
+        def poly(idx, rgba, width):
+            p = np.round(pts[[pos[i] for i in idx]] * 16).astype(np.int32)
+            x0, y0 = np.maximum(0, p.min(axis=0) // 16 - 2)
+            x1, y1 = p.max(axis=0) // 16 + 3
+            roi = video[y0:y1, x0:x1]
+            if roi.size == 0:
+                return
+            over = roi.copy()
+            cv2.polylines(over, [p - (x0 * 16, y0 * 16)], True, rgba[:3], max(1, round(width)),
+                          cv2.LINE_AA, shift=4)
+            roi[:] = cv2.addWeighted(over, rgba[3], roi, 1 - rgba[3], 0)
+
+        if self.cfg["showMesh"]:
+            poly(FACE_OVAL, (60, 80, 180, 0.4), 1.2)
+            poly(LEFT_EYE, (0, 200, 180, 0.5), 1)
+            poly(RIGHT_EYE, (0, 200, 180, 0.5), 1)
+        if self.cfg["showIris"]:
+            for i in LEFT_IRIS + RIGHT_IRIS:
+                x, y = pts[pos[i]]
+                cv2.circle(video, (round(x * 16), round(y * 16)), 56, (0, 255, 170), -1,
+                           cv2.LINE_AA, shift=4)
+
+    def _draw_shadow(self, video, cx, cy, r, z):
+        if not self.cfg["showShadow"]:
+            return
+        sy, sx = cy + r * 0.9 + z * 18, cx + r * 0.15
+        alpha = 0.45 - z * 0.3
+        if alpha <= 0:
+            return
+        # ctx.scale(1, 0.25); arc(sx, 4*sy) filled with a gradient centred on
+        # (sx, sy) in the scaled space.
+        R = r * 1.3
+        x0, x1 = max(0, int(sx - R) - 1), min(self.w, int(sx + R) + 2)
+        y0, y1 = max(0, int(sy - R / 4) - 1), min(self.h, int(sy + R / 4) + 2)
+        if x1 <= x0 or y1 <= y0:
+            return
+        xs, ys = _grid(y1 - y0, x1 - x0, x0, y0)
+        ys4 = ys * 4
+        t = _gradient_t(xs, ys4, sx, sy, 0, sx, sy, R)
+        paint = _gradient(t, [(0, _rgba(0, 0, 0, 0.9)), (0.5, _rgba(0, 0, 0, 0.35)),
+                              (1, _rgba(0, 0, 0, 0))])
+        cov = np.clip(R - np.hypot(xs - sx, ys4 - 4 * sy) + 0.5, 0, 1)
+        _over(video[y0:y1, x0:x1], paint * cov[..., None], alpha)
+
+    def _draw_shocks(self, ball):
+        boxes = []
+        for x, y, r, _, a, col in self.shocks:
+            width = 3.5 * a
+            pad = int(r + width + 30)
+            x0, y0 = max(0, int(x) - pad), max(0, int(y) - pad)
+            x1, y1 = min(self.w, int(x) + pad), min(self.h, int(y) + pad)
+            if x1 <= x0 or y1 <= y0:
+                continue
+            xs, ys = _grid(y1 - y0, x1 - x0, x0, y0)
+            ring = _ring(xs, ys, x, y, r, width)
+            rgb = col / 255
+            # shadowBlur 18 → Gaussian sigma 9, shadow colour alpha 0.8
+            glow = cv2.GaussianBlur(ring, (0, 0), 9) * 0.8
+            roi = ball[y0:y1, x0:x1]
+            _over(roi, np.dstack([glow[..., None] * rgb, glow]), a)
+            _over(roi, np.dstack([ring[..., None] * rgb, ring]), a)
+            boxes.append((x0, y0, x1, y1))
+        return boxes
+
+
+# ── Track ─────────────────────────────────────────────────────────────────────
+
+def load_landmarks(path):
+    """``(t, lms)`` from a batch ``.parts`` directory or a single ``.npz``."""
+    path = Path(path)
+    if path.suffix == ".irb":
+        raise ValueError("gravações .irb não têm vídeo correspondente; "
+                         "use os landmarks do batch (.parts ou .npz)")
+    files = sorted(path.glob("*.npz")) if path.is_dir() else [path]
+    ts, lms = [], []
+    for f in files:
+        with np.load(f) as z:
+            ts.append(z["t"])
+            sub = z["lms"]
+            lms.append(sub if sub.shape[1] == len(USED) else sub[:, USED])
+    return np.concatenate(ts), np.concatenate(lms).astype(np.float32)
+
+
+def build_track(t, lms, width, height, cfg=None, block=20_000):
+    """Run :func:`gaze.analyze` over the stream in blocks and keep what drawing needs."""
+    cfg = {**DEFAULT_CFG, **(cfg or {})}
+    n = len(t)
+    ball = np.empty((n, 3))
+    direction = np.empty(n, np.int8)
+    roll = np.empty(n)
+    blink = np.zeros(n, bool)
+    state = None
+    for a in range(0, n, block):
+        res = gaze.analyze(expand_used(lms[a:a + block]), amplify=cfg["amplify"],
+                           smoothing=cfg["smoothing"], state=state, width=width, height=height,
+                           smoother=cfg["smoother"], t=t[a:a + block])
+        state = res.state
+        ball[a:a + block] = res.ball
+        direction[a:a + block] = res.direction
+        roll[a:a + block] = res.roll
+        blink[a + res.blink_frames] = True
+    valid = np.isfinite(ball[:, 0])
+    return Track(t, lms, valid, ball, direction, roll, blink)
+
+
+# ── Chunked rendering ─────────────────────────────────────────────────────────
+
+def keyframe_times(path):
+    """Presentation times of the video keyframes, from the demuxer only.
+
+    Measured from the first frame, like :func:`iris_ball.batch.decode_range`.
+    """
+    import av
+
+    with av.open(str(path)) as container:
+        stream = container.streams.video[0]
+        start = start_pts(stream)
+        return sorted(float((p.pts - start) * stream.time_base) for p in container.demux(stream)
+                      if p.is_keyframe and p.pts is not None)
+
+
+def plan_chunks(t, keyframes, chunk_seconds=CHUNK_SECONDS):
+    """Frame index ranges ``[(a, b), ...]`` that each start on a keyframe."""
+    starts = [0]
+    for kf in keyframes:
+        i = int(np.searchsorted(t, kf - 1e-6))
+        if 0 < i < len(t) and t[i] - t[starts[-1]] >= chunk_seconds:
+            starts.append(i)
+    return list(zip(starts, starts[1:] + [len(t)]))
+
+
+def _render_chunk(video, track, warm, cfg, size, rate, part):
+    """Worker: warm up on ``warm`` landmark-only frames, render the rest to ``part``."""
+    import av
+
+    w, h = size
+    scene = Scene(cfg, w, h)
+    for i in range(warm):
+        scene.step(track, i)
+    tmp = part.with_name(part.stem + ".tmp" + part.suffix)
+    n = 0
+    with av.open(str(tmp), "w") as out:
+        stream = out.add_stream("libx264", rate=rate)
+        stream.width, stream.height, stream.pix_fmt = w, h, "yuv420p"
+        # No B-frames: pts == dts, so chunks concatenate with a plain offset.
+        stream.options = {"bf": "0", "crf": "18"}
+        t0, t1 = track.t[warm], track.t[-1]
+        for t, rgb in decode_range(video, t0, t1, last=True):
+            i = min(len(track.t) - 1, int(np.searchsorted(track.t, t - 1e-6)))
+            while warm + n <= i:                  # also covers a dropped decode frame
+                scene.step(track, warm + n)
+                n += 1
+            frame = av.VideoFrame.from_ndarray(scene.render(rgb), format="rgb24")
+            for packet in stream.encode(frame):
+                out.mux(packet)
+        for packet in stream.encode():
+            out.mux(packet)
+    os.replace(tmp, part)
+    return n
+
+
+def concat(parts, out):
+    """Join same-format chunks into ``out`` by remuxing their packets."""
+    import av
+
+    with av.open(str(parts[0])) as first, av.open(str(out), "w") as dst:
+        ostream = dst.add_stream_from_template(first.streams.video[0])
+        offset = 0
+        for part in parts:
+            with av.open(str(part)) as src:
+                stream = src.streams.video[0]
+                scale = Fraction(stream.time_base) / Fraction(ostream.time_base)
+                end = 0
+                for packet in src.demux(stream):
+                    if packet.dts is None:
+                        continue
+                    pts, dts = int(packet.pts * scale), int(packet.dts * scale)
+                    end = max(end, pts + int((packet.duration or 0) * scale))
+                    packet.pts, packet.dts = pts + offset, dts + offset
+                    packet.time_base = ostream.time_base
+                    packet.stream = ostream
+                    dst.mux(packet)
+                offset += end
+
+
+def render_replay(video, landmarks, out, workers=None, chunk_seconds=CHUNK_SECONDS,
+                  warmup=WARMUP_FRAMES, cfg=None, keep_parts=False, log=print):
+    """Render the annotated replay of ``video`` into ``out``. Resumable per chunk."""
+    import av
+
+    video, out = Path(video), Path(out)
+    with av.open(str(video)) as c:
+        stream = c.streams.video[0]
+        size = (stream.codec_context.width, stream.codec_context.height)
+        rate = stream.average_rate or Fraction(30)
+    t, lms = load_landmarks(landmarks)
+    track = build_track(t, lms, *size, cfg=cfg)
+    ranges = plan_chunks(t, keyframe_times(video), chunk_seconds)
+    parts_dir = out.with_name(out.name + ".parts")
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    parts = [parts_dir / f"{i:05d}.mp4" for i in range(len(ranges))]
+    todo = [i for i in range(len(ranges)) if not parts[i].is_file()]
+    log(f"{video.name}: {len(t)} quadros em {len(ranges)} blocos, "
+        f"{len(ranges) - len(todo)} do checkpoint")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for i in todo:
+            a, b = ranges[i]
+            w0 = max(0, a - warmup)
+            futures[pool.submit(_render_chunk, video, track.slice(w0, b), a - w0, cfg,
+                                size, rate, parts[i])] = i
+        for fut in as_completed(futures):
+            log(f"{video.name}: bloco {futures[fut]} ({fut.result()} quadros)")
+
+    concat(parts, out)
+    if not keep_parts:
+        shutil.rmtree(parts_dir)
+    log(f"{video.name}: → {out}")
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("video", type=Path)
+    parser.add_argument("--landmarks", type=Path, required=True,
+                        help="a .parts directory from iris_ball.batch --keep-parts "
+                             "or an .npz with t (s of the video) and lms")
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--chunk-seconds", type=float, default=CHUNK_SECONDS)
+    parser.add_argument("--warmup", type=int, default=WARMUP_FRAMES,
+                        help="landmark-only frames replayed before each chunk")
+    parser.add_argument("--keep-parts", action="store_true")
+    args = parser.parse_args(argv)
+
+    out = args.out or args.video.with_name(args.video.stem + "_iris.mp4")
+    render_replay(args.video, args.landmarks, out, workers=args.workers,
+                  chunk_seconds=args.chunk_seconds, warmup=args.warmup,
+                  keep_parts=args.keep_parts)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""Server-side processing mode (streamlit-webrtc).
+
+For thin clients the browser only streams its camera; FaceMesh, EAR, gaze
+and roll run here. ``recv`` never waits for inference: it drops the frame
+into a one-slot :class:`LatestFrame` and returns at once, either untouched
+(landmarks mode, results are read through :meth:`IrisProcessor.snapshot`) or
+annotated with the most recent result. A single worker thread always takes
+the newest frame, so a slow model skips stale frames instead of queueing
+latency.
+
+FaceMesh graphs are expensive to build, so they live in a process-wide
+:class:`FaceMeshPool` (``st.cache_resource``) and are handed back when a
+stream ends, ready for the next session or rerun. With many concurrent
+sessions, :func:`inference_pool` moves the models to worker processes
+instead (see ``iris_ball/pool.py``).
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+
+import av
+import cv2
+import numpy as np
+import streamlit as st
+from streamlit_webrtc import VideoProcessorBase
+
+from . import gaze
+from .gaze import DIR_COLORS
+from .facemesh import FaceMesh
+from .landmarks import FACE_OVAL, LEFT_EYE, LEFT_IRIS, RIGHT_EYE, RIGHT_IRIS
+
+OUTPUT_MODES = ("annotated", "landmarks")
+
+STATS_N = 120               # inference timings kept for the percentiles
+
+
+class LatestFrame:
+    """One-slot mailbox: ``put`` overwrites, ``get`` blocks for something new."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Newest item, or None after ``timeout`` seconds without one."""
+        with self._cond:
+            if self._item is None:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+
+class FaceMeshPool:
+    """Warm FaceMesh instances shared by every session of this process."""
+
+    def __init__(self, max_faces=1):
+        self.max_faces = max_faces
+        self._idle = queue.SimpleQueue()
+        self.created = 0
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            self.created += 1
+            return FaceMesh(max_faces=self.max_faces)
+
+    def release(self, mesh):
+        self._idle.put(mesh)
+
+    @property
+    def idle(self):
+        return self._idle.qsize()
+
+
+@st.cache_resource
+def face_mesh_pool():
+    return FaceMeshPool()
+
+
+@st.cache_resource
+def inference_pool(workers=None):
+    """Process-wide :class:`~iris_ball.pool.InferencePool` (many sessions)."""
+    from .pool import InferencePool
+
+    return InferencePool(workers=workers)
+
+
+def _bgr(hex_color):
+    h = hex_color.lstrip("#")
+    return int(h[4:6], 16), int(h[2:4], 16), int(h[0:2], 16)
+
+
+def annotate(img, lms, result, cfg):
+    """Mirror ``img`` (BGR) like the page does and draw mesh, iris and ball."""
+    img = cv2.flip(img, 1)
+    h, w = img.shape[:2]
+    pts = np.column_stack([(1 - lms[:, 0]) * w, lms[:, 1] * h])
+    if cfg.get("showMesh", True):
+        for idx in (FACE_OVAL, LEFT_EYE, RIGHT_EYE):
+            cv2.polylines(img, [pts[idx].astype(np.int32)], True, (170, 255, 0), 1, cv2.LINE_AA)
+    if cfg.get("showIris", True):
+        for x, y in pts[LEFT_IRIS + RIGHT_IRIS]:
+            cv2.circle(img, (int(x), int(y)), 2, (255, 255, 0), -1, cv2.LINE_AA)
+    bx, by, bz = result["ball"]
+    r = int(cfg.get("ballRadius", 52) * (1 + bz * cfg.get("popEffect", 35) / 100))
+    color = cfg.get("ballColor", "#2277ff")
+    if cfg.get("orientColor", True):
+        color = DIR_COLORS.get(result["direction"], color)
+    cv2.circle(img, (int(bx), int(by)), r, _bgr(color), -1, cv2.LINE_AA)
+    return img
+
+
+class IrisProcessor(VideoProcessorBase):
+    """streamlit-webrtc processor; ``cfg`` and ``output`` may change live."""
+
+    def __init__(self, pool, cfg=None, output="annotated"):
+        self.pool = pool
+        self.cfg = dict(cfg or {})
+        self.output = output
+        self._slot = LatestFrame()
+        self._lock = threading.Lock()
+        self._result = None
+        self._state = None
+        self._frames = 0
+        self._inferred = 0
+        self._errors = 0
+        self._error = None
+        self._infer_ms = deque(maxlen=STATS_N)
+        self._stop = threading.Event()
+        self._mesh = pool.acquire()
+        self._thread = threading.Thread(target=self._run, name="iris-infer", daemon=True)
+        self._thread.start()
+
+    # ── WebRTC side ──────────────────────────────────────────────────────────
+    def recv(self, frame):
+        img = frame.to_ndarray(format="bgr24")
+        self._frames += 1
+        self._slot.put((img, time.monotonic()))
+        with self._lock:
+            result = self._result
+        if self.output != "annotated" or result is None:
+            return frame
+        out = annotate(img, result["landmarks"], result, self.cfg)
+        return av.VideoFrame.from_ndarray(out, format="bgr24")
+
+    def on_ended(self):
+        self._stop.set()
+        self._thread.join(timeout=2)
+        self.pool.release(self._mesh)
+
+    # ── Inference thread ─────────────────────────────────────────────────────
+    def _run(self):
+        while not self._stop.is_set():
+            item = self._slot.get(timeout=0.2)
+            if item is None:
+                continue
+            img, t_in = item
+            t0 = time.perf_counter()
+            try:
+                faces = self._mesh.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB),
+                                           timestamp_ms=t_in * 1000)
+                h, w = img.shape[:2]
+                result = self._analyze(faces, w, h, t_in) if len(faces) else None
+            except Exception as exc:      # keep serving; snapshot() reports the last error
+                self._errors += 1
+                self._error = f"{type(exc).__name__}: {exc}"
+                continue
+            self._infer_ms.append((time.perf_counter() - t0) * 1000)
+            self._inferred += 1
+            if result is not None:
+                result["age"] = t_in
+            with self._lock:
+                self._result = result
+
+    def _analyze(self, faces, w, h, t_in):
+        s = gaze.analyze(faces[:1], amplify=self.cfg.get("amplify", 2.6),
+                         smoothing=self.cfg.get("smoothing", 7), state=self._state,
+                         width=w, height=h, smoother=self.cfg.get("smoother", "oneeuro"),
+                         t=[t_in])
+        self._state = s.state
+        return {
+            "landmarks": faces[0],
+            "ear"      : s.ear[0].tolist(),
+            "gaze"     : s.gaze[0].tolist(),
+            "direction": str(s.labels[0]),
+            "roll"     : float(s.roll[0]),
+            "ball"     : s.ball[0].tolist(),
+            "blink"    : len(s.blink_frames) > 0,
+        }
+
+    # ── Metrics ──────────────────────────────────────────────────────────────
+    def landmarks(self):
+        """(478, 3) landmarks of the newest result, or None."""
+        with self._lock:
+            return None if self._result is None else self._result["landmarks"]
+
+    def snapshot(self):
+        """Latest result (without the raw landmarks) plus pipeline counters."""
+        with self._lock:
+            result = self._result
+        ms = np.array(self._infer_ms) if self._infer_ms else np.zeros(1)
+        snap = {
+            "frames"  : self._frames,
+            "inferred": self._inferred,
+            "dropped" : self._slot.dropped,
+            "inferP50": float(np.percentile(ms, 50)),
+            "inferP95": float(np.percentile(ms, 95)),
+            "blinks"  : self._state.blinks if self._state else 0,
+            "backend" : self._mesh.backend,
+            "tracking": result is not None,
+            "errors"  : self._errors,
+            "error"   : self._error,
+        }
+        if result is not None:
+            snap.update({k: v for k, v in result.items() if k not in ("landmarks", "age")})
+            snap["ageMs"] = (time.monotonic() - result["age"]) * 1000
+        return snap
@@ -0,0 +1,77 @@
+import numpy as np
+
+from iris_ball import analytics
+from iris_ball.analytics import BLINKS, CHANGES, DIR0, FACES, FRAMES, AnalyticsStore
+from iris_ball.gaze import CENTER, LEFT
+
+T0 = 1_700_000_000.0
+
+
+def _ingest(store, name, t, direction=CENTER, blinks=0, ear=0.3):
+    n = len(t)
+    store.ingest(name, t, np.ones(n, bool), np.broadcast_to(direction, n),
+                 np.full(n, ear), np.broadcast_to(blinks, n))
+
+
+def test_dense_second_does_not_overflow():
+    store = AnalyticsStore(capacity=2)
+    _ingest(store, "a", T0 + np.arange(600) / 300)        # 300 frames per second
+    stats = store.query(2)
+    assert stats.counts[0, FRAMES] == 600
+    assert stats.active_s[0] == 2
+
+
+def test_query_counts_and_rates():
+    store = AnalyticsStore(capacity=2)
+    t = T0 + np.arange(60 * 30) / 30
+    direction = np.where((np.arange(len(t)) // 300) % 2, LEFT, CENTER)
+    _ingest(store, "a", t, direction, blinks=(np.arange(len(t)) % 150 == 0))
+    stats = store.query(60)
+    assert stats.sessions == ["a"]
+    assert stats.counts[0, FRAMES] == stats.counts[0, FACES] == len(t)
+    assert stats.counts[0, BLINKS] == 12
+    assert stats.counts[0, CHANGES] == 5
+    np.testing.assert_allclose(stats.blink_rate, [12])
+    np.testing.assert_allclose(stats.dwell[0, [CENTER, LEFT]], [0.5, 0.5])
+    assert stats.ear_hist[0].sum() == len(t)
+    assert store.query(10).counts[0, FRAMES] == 300
+
+
+def test_long_windows_use_minutes():
+    store = AnalyticsStore(capacity=1, seconds=60)
+    for minute in range(10):
+        _ingest(store, "a", T0 + minute * 60 + np.arange(30))
+    assert store.query(60).counts[0, FRAMES] == 30       # per-second ring
+    assert store.query(600).counts[0, FRAMES] == 300     # per-minute rollups
+
+
+def test_second_ring_laps():
+    store = AnalyticsStore(capacity=1, seconds=10)
+    _ingest(store, "a", T0 + np.arange(25))
+    assert store.query(10).counts[0, FRAMES] == 10
+
+
+def test_slots_grow_and_are_reused():
+    store = AnalyticsStore(capacity=2)
+    for i in range(5):
+        _ingest(store, f"s{i}", [T0 + i])
+    assert store.capacity == 8
+    store.close("s0")
+    _ingest(store, "new", [T0 + 9])
+    assert store.capacity == 8
+    assert store.slots["new"] == 0
+    assert set(store.query(60).sessions) == {"s1", "s2", "s3", "s4", "new"}
+
+
+def test_evict_idle_sessions(tmp_path):
+    spill = tmp_path / "analytics.bin"
+    store = AnalyticsStore(capacity=4, spill=spill)
+    _ingest(store, "old", T0 + np.arange(90))
+    _ingest(store, "fresh", T0 + np.arange(3))
+    store.touched[store.slots["old"]] -= 1000
+    assert store.evict(idle_s=120) == ["old"]
+    assert list(store.slots) == ["fresh"]
+    rec = analytics.read_spill(spill)
+    assert (rec["session"] == analytics.session_key("old")).all()
+    assert rec["counts"][:, FRAMES].sum() == 90
+    assert rec["counts"][:, DIR0 + CENTER].sum() == 90
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from iris_ball import gaze
+from iris_ball.landmarks import L_EAR_PTS, LEFT_IRIS, N_LANDMARKS, R_EAR_PTS, RIGHT_IRIS
+
+# calcEAR, getGazeDir and the roll/nx/ny lines of faceLandmarks in
+# frontend/core.js, run in Node over FRAMES: earL, earR, nx, ny, dir, roll.
+JS_REFERENCE = [
+    (0.385714304, 0.385714304, 0.0, -0.130000012, "center", 0.0),
+    (0.385714304, 0.385714304, -0.311999993, -0.130000012, "left", 0.0),
+    (0.038571287, 0.038571287, 0.0, -0.130000012, "center", 0.0),
+    (0.385714464, 0.385714304, 0.0, -0.649999995, "up", 0.197395563),
+    (0.308571411, 0.308571411, 0.129999983, -0.052000009, "center", 0.0),
+]
+
+
+def _eye(cx, cy, opening):
+    h = 0.02 * opening
+    return [(cx, cy - h), (cx, cy + h), (cx + 0.015, cy - 0.8 * h), (cx + 0.015, cy + 0.8 * h),
+            (cx - 0.035, cy), (cx + 0.035, cy)]
+
+
+def _face(shift=(0.0, 0.0), opening=1.0, tilt=0.0):
+    i = np.arange(N_LANDMARKS)
+    P = np.stack([0.5 + 0.25 * np.sin(0.37 * i), 0.5 + 0.25 * np.cos(0.53 * i),
+                  0.01 * np.sin(i)], axis=1)
+    for pts, ring, (cx, cy) in ((L_EAR_PTS, LEFT_IRIS, (0.6, 0.45 + tilt)),
+                                (R_EAR_PTS, RIGHT_IRIS, (0.4, 0.45 - tilt))):
+        P[pts, :2] = _eye(cx, cy, opening)
+        x, y = cx + shift[0], cy + shift[1]
+        P[ring, :2] = [(x + 0.01, y), (x, y - 0.01), (x - 0.01, y), (x, y + 0.01)]
+    return P.astype(np.float32)
+
+
+FRAMES = np.stack([_face(), _face((0.12, 0.0)), _face(opening=0.1), _face((0.0, -0.2), tilt=0.02),
+                   _face((-0.05, 0.03), 0.8)])
+
+
+def _js_blinks(ear_avg):
+    """The page's per-frame blink rule, one frame at a time."""
+    events, cooldown = [], 0
+    for i, e in enumerate(ear_avg):
+        if e < gaze.EAR_THRESH and cooldown <= 0:
+            events.append(i)
+            cooldown = gaze.BLINK_COOLDOWN
+        if cooldown > 0:
+            cooldown -= 1
+    return events
+
+
+def test_analyze_matches_js():
+    s = gaze.analyze(FRAMES, amplify=2.6)
+    ref = np.array([r[:4] + r[5:] for r in JS_REFERENCE])
+    np.testing.assert_allclose(s.ear, ref[:, :2], atol=1e-6)
+    np.testing.assert_allclose(s.gaze, ref[:, 2:4], atol=1e-6)
+    np.testing.assert_allclose(s.roll, ref[:, 4], atol=1e-6)
+    assert list(s.labels) == [r[4] for r in JS_REFERENCE]
+    assert list(s.blink_frames) == [2]
+
+
+def test_frames_without_face_are_skipped():
+    lms = np.concatenate([FRAMES[:2], np.full((1, N_LANDMARKS, 3), np.nan, np.float32), FRAMES[2:]])
+    s = gaze.analyze(lms)
+    assert s.labels[2] == ""
+    assert np.isnan(s.ear[2]).all() and np.isnan(s.ball[2]).all()
+    assert list(s.blink_frames) == [3]
+    np.testing.assert_allclose(s.gaze[[0, 1, 3, 4, 5]], gaze.analyze(FRAMES).gaze)
+
+
+def test_blinks_follow_the_cooldown():
+    rng = np.random.default_rng(0)
+    ear_avg = np.where(rng.random(2000) < 0.1, 0.1, 0.3)
+    events, _ = gaze.blink_events(ear_avg)
+    assert list(events) == _js_blinks(ear_avg)
+
+
+def test_smooth_is_the_lerp_recurrence():
+    rng = np.random.default_rng(1)
+    x = rng.random((1000, 3))
+    y, prev = np.empty_like(x), np.array([0.5, 0.5, 0.0])
+    for i in range(len(x)):
+        prev = prev + (x[i] - prev) / 7
+        y[i] = prev
+    np.testing.assert_allclose(gaze.smooth(x, 1 / 7, [0.5, 0.5, 0.0]), y, atol=1e-9)
+
+
+@pytest.mark.parametrize("smoother", gaze.SMOOTHERS)
+def test_chunks_match_one_call(smoother):
+    rng = np.random.default_rng(2)
+    lms = FRAMES[rng.integers(0, len(FRAMES), 300)]
+    whole = gaze.analyze(lms, smoother=smoother)
+    state, parts = None, []
+    for chunk in np.array_split(lms, 7):
+        part = gaze.analyze(chunk, state=state, smoother=smoother)
+        state = part.state
+        parts.append(part)
+    np.testing.assert_allclose(np.concatenate([p.ball for p in parts]), whole.ball, atol=1e-9)
+    assert state.blinks == len(whole.blink_frames)
@@ -0,0 +1,40 @@
+import numpy as np
+
+from iris_ball import heatmap
+
+
+def test_sample_splits_one_unit():
+    grid = heatmap.accumulate([[0.1, -0.3]])
+    assert grid.shape == (heatmap.HEAT_H, heatmap.HEAT_W)
+    assert np.isclose(grid.sum(), 1)
+    assert np.count_nonzero(grid) <= 4
+
+
+def test_nan_rows_are_skipped():
+    gaze = np.array([[0.0, 0.0], [np.nan, np.nan], [0.5, 0.5]])
+    np.testing.assert_allclose(heatmap.accumulate(gaze), heatmap.accumulate(gaze[[0, 2]]))
+    assert not heatmap.accumulate(np.full((3, 2), np.nan)).any()
+
+
+def test_half_life_decay():
+    # Same spot at t = 0, 30, 60 s: weights 1/4, 1/2, 1 with a 30 s half-life.
+    gaze = np.zeros((3, 2))
+    t = np.array([0.0, 30.0, 60.0])
+    assert np.isclose(heatmap.accumulate(gaze, t, half_life=30).sum(), 1.75)
+    assert np.isclose(heatmap.accumulate(gaze, t).sum(), 3)
+
+
+def test_decay_is_relative_to_the_last_sample():
+    a = heatmap.accumulate([[-0.5, 0.2], [0.4, -0.1]], [0.0, 10.0], half_life=5)
+    b = heatmap.accumulate([[-0.5, 0.2], [0.4, -0.1]], [100.0, 110.0], half_life=5)
+    np.testing.assert_allclose(a, b)
+    np.testing.assert_allclose(a.sum(), 1.25)
+
+
+def test_colorize_ramp():
+    grid = np.zeros((heatmap.HEAT_H, heatmap.HEAT_W))
+    grid[0, 0] = 2.0
+    rgba = heatmap.colorize(grid)
+    assert rgba.dtype == np.uint8
+    assert rgba[0, 0].tolist() == [255, 40, 0, round(heatmap.HEAT_ALPHA * 255)]
+    assert rgba[1:, 1:, 3].max() == 0
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from iris_ball import live
+from iris_ball.landmarks import USED
+from iris_ball.recording import QSCALE
+
+
+def _varint(v):
+    """One zigzag LEB128 varint, as Live.putVarint in frontend/live.js writes it."""
+    z = (v << 1) ^ (v >> 31)
+    out = bytearray()
+    while z >= 0x80:
+        out.append((z & 0x7F) | 0x80)
+        z >>= 7
+    out.append(z)
+    return bytes(out)
+
+
+def _batch(seq, lms, stream=7, t0=1.7e12):
+    """One encoded batch: a frame per face in ``lms`` (F, len(USED), 3)."""
+    frames = np.zeros(len(lms), live.FRAME_DTYPE)
+    frames["dt"] = np.arange(len(lms)) * 33
+    frames["flags"] = live.FACE
+    frames["blinks"][1::4] = 1
+    q = np.clip(np.round(lms * QSCALE), -32768, 32767).astype(np.int64).reshape(len(lms), -1)
+    deltas = np.diff(q, axis=0, prepend=0)
+    data = b"".join(_varint(int(v)) for v in deltas.ravel())
+    head = live.HEADER.pack(live.MAGIC, stream, seq, t0, len(lms), 30, 0, len(USED), len(data))
+    return head + frames.tobytes() + data, frames
+
+
+@pytest.mark.parametrize("value", [0, 1, -1, 63, -64, 64, 127, 128, -129, 32767, -32768,
+                                   2**31 - 1, -2**31])
+def test_varint_round_trip(value):
+    assert live.varints(_varint(value)).tolist() == [value]
+
+
+def test_varints_many():
+    values = np.random.default_rng(0).integers(-70000, 70000, 5000)
+    buf = b"".join(_varint(int(v)) for v in values)
+    np.testing.assert_array_equal(live.varints(buf), values)
+    assert live.varints(b"").shape == (0,)
+
+
+def test_parse_round_trip():
+    rng = np.random.default_rng(1)
+    lms = rng.uniform(-0.2, 1.2, (2, 12, len(USED), 3)).astype(np.float32)
+    first, frames = _batch(0, lms[0])
+    second, _ = _batch(1, lms[1])
+    batches = live.parse(first + second)
+    assert [b.seq for b in batches] == [0, 1]
+    assert batches[0].size == len(first)
+    np.testing.assert_array_equal(batches[0].frames, frames)
+    np.testing.assert_allclose(batches[0].t, (1.7e12 + frames["dt"]) / 1000)
+    for batch, want in zip(batches, lms):
+        np.testing.assert_allclose(batch.lms, want, atol=0.5 / QSCALE + 1e-7)
+
+
+def test_parse_rejects_garbage():
+    buf, _ = _batch(0, np.zeros((1, len(USED), 3), np.float32))
+    with pytest.raises(ValueError):
+        live.parse(b"XXXX" + buf[4:])
+
+
+def test_feed_skips_resent_batches():
+    lms = np.zeros((8, len(USED), 3), np.float32)
+    first, _ = _batch(0, lms)
+    second, _ = _batch(1, lms)
+    feed = live.LiveFeed()
+    assert feed.ingest(first) == {"stream": 7, "seq": 0}
+    assert feed.ingest(first + second) == {"stream": 7, "seq": 1}
+    assert len(feed.fresh) == 1
+    assert feed.frames == 16 and feed.blinks == 4
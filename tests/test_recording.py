@@ -0,0 +1,76 @@
+import base64
+
+import numpy as np
+import pytest
+
+from iris_ball import recording
+from iris_ball.landmarks import USED
+
+REC_ID = "20250101-120000-123-a1b2c3"
+
+
+def _sequence(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    t = 1000 + np.arange(n) / 30
+    lms = rng.uniform(0, 1, (n, len(USED), 3)).astype(np.float32)
+    lms[3::14] = np.nan                       # no face
+    return t, lms
+
+
+def test_encode_decode_round_trip():
+    t, lms = _sequence()
+    t2, lms2 = recording.decode(recording.header() + recording.encode(t, lms))
+    np.testing.assert_allclose(t2, np.round((t - t[0]) * 1000) / 1000)
+    assert np.isnan(lms2[[3, 17, 31]]).all()
+    face = np.isfinite(lms[:, 0, 0])
+    np.testing.assert_allclose(lms2[face], lms[face], atol=0.5 / recording.QSCALE + 1e-7)
+
+
+def test_decode_maps_other_indices():
+    t, lms = _sequence(5)
+    order = USED[::-1]
+    buf = recording.header(order) + recording.encode(t, lms[:, ::-1], order)
+    _, lms2 = recording.decode(buf)
+    np.testing.assert_allclose(lms2[[0, 1, 2, 4]], lms[[0, 1, 2, 4]], atol=0.5 / recording.QSCALE + 1e-7)
+
+
+def test_torn_record_is_dropped():
+    t, lms = _sequence(5)
+    buf = recording.header() + recording.encode(t, lms)
+    assert len(recording.decode(buf[:-3])[0]) == 4
+
+
+def test_save_load(tmp_path):
+    t, lms = _sequence()
+    path = tmp_path / f"{REC_ID}.irb"
+    recording.save(path, t, lms)
+    assert recording.load(path)[1].shape == lms.shape
+
+
+def _chunk(seq, t, lms):
+    return {"seq": seq, "data": base64.b64encode(recording.encode(t, lms)).decode()}
+
+
+def test_receive_writes_each_chunk_once(tmp_path):
+    t, lms = _sequence()
+    chunks = [_chunk(0, t[:20], lms[:20]), _chunk(1, t[20:], lms[20:])]
+    writers = {}
+    report = {"recording": {"id": REC_ID, "indices": list(USED), "chunks": chunks[:1]}}
+    assert recording.receive(report, writers, tmp_path) == {"id": REC_ID, "seq": 0}
+    report["recording"]["chunks"] = chunks               # chunk 0 resent with chunk 1
+    assert recording.receive(report, writers, tmp_path) == {"id": REC_ID, "seq": 1}
+    assert writers[REC_ID].frames == len(t)
+    assert recording.load(tmp_path / f"{REC_ID}.irb")[1].shape == lms.shape
+
+
+@pytest.mark.parametrize("rec_id", ["../../x", "20250101-120000", REC_ID.upper(), None])
+def test_bad_ids_are_refused(tmp_path, rec_id):
+    with pytest.raises(ValueError):
+        recording.ChunkWriter(tmp_path, rec_id, USED)
+
+
+def test_existing_file_is_never_reused(tmp_path):
+    t, lms = _sequence(2)
+    (tmp_path / f"{REC_ID}.irb").write_bytes(b"")
+    with pytest.raises(FileExistsError):
+        recording.ChunkWriter(tmp_path, REC_ID, USED).write([_chunk(0, t, lms)])